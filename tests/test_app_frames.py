@@ -0,0 +1,42 @@
+import glob
+import os
+import sys
+
+import pytest
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+if sys.platform.startswith('linux') and not os.environ.get('DISPLAY'):
+    pytest.skip("the app needs a display", allow_module_level=True)
+gui = pytest.importorskip('open3d.visualization.gui', exc_type=ImportError)
+vis_3d_app = pytest.importorskip('vis_3d_app', exc_type=ImportError)
+
+
+@pytest.fixture(scope='module')
+def window():
+    gui.Application.instance.initialize()
+    w = vis_3d_app.AppWindow(640, 480, frame_cache=vis_3d_app.FrameCache())
+    yield w
+    w.window.close()
+
+
+def _frames():
+    return sorted(glob.glob(os.path.join(DATA_DIR, '3D', '*.bin')))
+
+
+@pytest.mark.skipif(len(_frames()) < 3, reason="needs three frames in data/3D")
+def test_session_after_aggregated_frame_leaves_the_sequence(window, tmp_path):
+    window.settings.aggregate_frames = 3
+    window.load(_frames()[2])
+    assert window.current_frame_ids is not None
+    assert window.frame_index == 2
+    session_path = str(tmp_path / ('frame' + vis_3d_app.SESSION_EXTENSION))
+    window.save_session(session_path)
+
+    window.load(session_path)
+    assert window.current_frame_ids is None
+    assert window.frame_index == -1
+    assert window.frame_paths == []
+    assert window.frame_window is None
+    assert window.dataset is None
+    assert len(window.current_point_cloud.points) == len(window.current_points)
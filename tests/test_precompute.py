@@ -0,0 +1,83 @@
+import glob
+import os
+
+import numpy as np
+import pytest
+
+# utils/__init__.py imports open3d
+precompute = pytest.importorskip('utils.precompute', exc_type=ImportError)
+TASKS, PrecomputePool, _Segment, compute_frame = (
+    precompute.TASKS, precompute.PrecomputePool, precompute._Segment, precompute.compute_frame)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+SHM_DIR = '/dev/shm'
+
+
+def _frames():
+    return sorted(glob.glob(os.path.join(DATA_DIR, '3D', '*.bin')))
+
+
+def _label(bin_path):
+    frame_id = os.path.splitext(os.path.basename(bin_path))[0]
+    path = os.path.join(DATA_DIR, 'Label', frame_id + '.txt')
+    return path if os.path.exists(path) else None
+
+
+def _shared_blocks():
+    return {name for name in os.listdir(SHM_DIR) if name.startswith('psm_')}
+
+
+def _segment(array):
+    # Follows the base chain down to the object that owns the memory
+    base = array
+    while isinstance(base, np.ndarray):
+        base = base.base
+    return base
+
+
+pytestmark = [
+    pytest.mark.skipif(not _frames(), reason="no frames in data/3D"),
+    pytest.mark.skipif(not os.path.isdir(SHM_DIR), reason="no /dev/shm"),
+]
+
+
+def test_handoff_does_not_copy():
+    path = _frames()[0]
+    label_path = _label(path)
+    before = _shared_blocks()
+    pool = PrecomputePool(workers=1)
+    try:
+        assert pool.request(path, label_path)
+        shared = pool.result(path)
+        assert shared is not None
+        assert set(shared.arrays) == {'points'} | set(TASKS) - ({'box_ids'} if label_path is None else set())
+
+        segments = set()
+        for name, array in shared.arrays.items():
+            assert not array.flags.owndata, name
+            assert not array.flags.writeable, name
+            segment = _segment(array)
+            assert isinstance(segment, _Segment), name
+            segments.add(id(segment))
+        # All arrays of a frame are views into the one mapped block
+        assert len(segments) == 1
+
+        expected = compute_frame(path, label_path)
+        assert set(expected) == set(shared.arrays)
+        for name, array in expected.items():
+            np.testing.assert_array_equal(shared[name], array, err_msg=name)
+    finally:
+        pool.close()
+    assert _shared_blocks() - before == set()
+
+
+def test_close_frees_uncollected_frames():
+    paths = _frames()[:2]
+    before = _shared_blocks()
+    pool = PrecomputePool(workers=1)
+    for path in paths:
+        pool.request(path, _label(path))
+    # Done but never collected
+    pool._futures[paths[-1]][1].result()
+    pool.close()
+    assert _shared_blocks() - before == set()
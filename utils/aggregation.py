@@ -0,0 +1,138 @@
+import numpy as np
+
+
+class FrameWindow:
+    """Sliding window of consecutive point cloud frames kept in one buffer.
+
+    The window owns a preallocated float32 buffer split into ``size`` slots,
+    one per frame. Moving the window only loads the frames that are not
+    already resident and reuses the slots of the frames that dropped out, so
+    stepping one frame forward or backward costs a single frame load.
+    """
+
+    def __init__(self, size, slot_capacity=131072, num_features=4):
+        """
+        Args:
+            size: Number of frames (K) kept in the window.
+            slot_capacity: Initial number of points per slot. Slots grow
+                automatically if a frame has more points.
+            num_features: Number of float32 values per point (x, y, z,
+                intensity for KITTI).
+        """
+        assert size >= 1
+        self.size = size
+        self.num_features = num_features
+        self._capacity = slot_capacity
+        self._buffer = np.empty((size * slot_capacity, num_features),
+                                dtype=np.float32)
+        self._counts = np.zeros(size, dtype=np.int64)
+        self._slot_frames = [None] * size
+        self._next_slot = 0  # ring position used when no slot is free
+        self._order = []
+        self._points = np.empty_like(self._buffer)
+        self._frame_ids = np.empty(len(self._buffer), dtype=np.int32)
+
+    @property
+    def frames(self):
+        """Frame ids currently resident in the window (unordered)."""
+        return [f for f in self._slot_frames if f is not None]
+
+    def __contains__(self, frame_id):
+        return frame_id in self._slot_frames
+
+    def clear(self):
+        self._counts[:] = 0
+        self._slot_frames = [None] * self.size
+        self._next_slot = 0
+        self._order = []
+
+    def _grow(self, capacity):
+        old, old_capacity = self._buffer, self._capacity
+        self._capacity = capacity
+        self._buffer = np.empty((self.size * capacity, self.num_features),
+                                dtype=np.float32)
+        for slot in range(self.size):
+            n = self._counts[slot]
+            self._buffer[slot * capacity:slot * capacity + n] = \
+                old[slot * old_capacity:slot * old_capacity + n]
+        self._points = np.empty_like(self._buffer)
+        self._frame_ids = np.empty(len(self._buffer), dtype=np.int32)
+
+    def push(self, frame_id, points, slot=None):
+        """Copies the points of one frame into a slot of the window.
+
+        Args:
+            frame_id: Integer id of the frame (e.g. 11 for 000011.bin).
+            points: (N, num_features) array of points.
+            slot: Slot to overwrite. Defaults to the next slot in ring order.
+        """
+        if slot is None:
+            slot = self._next_slot
+            self._next_slot = (self._next_slot + 1) % self.size
+        n = len(points)
+        if n > self._capacity:
+            self._grow(max(n, 2 * self._capacity))
+        start = slot * self._capacity
+        self._buffer[start:start + n] = points[:, :self.num_features]
+        self._counts[slot] = n
+        self._slot_frames[slot] = frame_id
+
+    def update(self, frame_ids, load_fn):
+        """Makes the window hold exactly the given frames.
+
+        Frames that are already resident are kept as they are; only the
+        missing ones are loaded, into the slots of the frames that left the
+        window.
+
+        Args:
+            frame_ids: Sequence of at most ``size`` frame ids.
+            load_fn: Callable returning the (N, num_features) points of a
+                frame id.
+
+        Returns:
+            Number of frames that had to be loaded.
+        """
+        frame_ids = list(frame_ids)[-self.size:]
+        wanted = set(frame_ids)
+        free_slots = [
+            slot for slot, f in enumerate(self._slot_frames)
+            if f is None or f not in wanted
+        ]
+        loaded = 0
+        for frame_id in frame_ids:
+            if frame_id in self._slot_frames:
+                continue
+            slot = free_slots.pop(0)
+            self.push(frame_id, load_fn(frame_id), slot=slot)
+            loaded += 1
+        for slot in free_slots:
+            self._counts[slot] = 0
+            self._slot_frames[slot] = None
+        self._order = frame_ids
+        return loaded
+
+    def gather(self, order=None):
+        """Returns the resident frames as one contiguous point array.
+
+        The result is written into a buffer owned by the window, so it is
+        only valid until the next call that modifies the window.
+
+        Args:
+            order: Frame ids in the order they should appear. Defaults to the
+                order given to the last update().
+
+        Returns:
+            Tuple (points, frame_ids) of a (N, num_features) float32 array and
+            the (N,) int32 frame id of every point.
+        """
+        if order is None:
+            order = self._order
+        total = 0
+        for frame_id in order:
+            slot = self._slot_frames.index(frame_id)
+            n = self._counts[slot]
+            start = slot * self._capacity
+            self._points[total:total + n] = self._buffer[start:start + n]
+            self._frame_ids[total:total + n] = frame_id
+            total += n
+        return self._points[:total], self._frame_ids[:total]
@@ -0,0 +1,209 @@
+"""Bird's eye view rasters of point clouds, computed in numpy only.
+
+A frame is binned into a top-down grid with one np.bincount pass per
+channel: point density, maximum height and mean intensity. Label boxes are
+drawn as rotated rectangles. Nothing here needs a renderer, so BEV images
+can be made headless, e.g. as thumbnails for a whole dataset:
+
+    python -m utils.bev data -o bev/ [--frames 0-20] [--resolution 0.2]
+"""
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from .dataset import DatasetIndex, parse_frames
+from .iou import bev_corners
+from .kitti import box_arrays, load_bounding_boxes
+
+# x_min, x_max, y_min, y_max in meters, the KITTI detection range in front
+# of the sensor
+DEFAULT_EXTENT = (0.0, 70.4, -40.0, 40.0)
+DEFAULT_RESOLUTION = 0.1
+HEIGHT_RANGE = (-3.0, 1.0)
+# Cells with this many points or more get the full density value
+DENSITY_SATURATION = 64
+DEFAULT_BOX_COLOR = [1.0, 1.0, 1.0]
+
+
+class BEVGrid:
+    """A top-down grid over the x-y plane.
+
+    Image rows run from x_max (top) to x_min, columns from y_max (left) to
+    y_min, so forward is up and left is left.
+    """
+
+    def __init__(self, extent=DEFAULT_EXTENT, resolution=DEFAULT_RESOLUTION):
+        """
+        Args:
+            extent: (x_min, x_max, y_min, y_max) in meters.
+            resolution: Edge length of a cell in meters.
+        """
+        self.extent = tuple(float(v) for v in extent)
+        self.resolution = float(resolution)
+        x_min, x_max, y_min, y_max = self.extent
+        self.shape = (int(np.ceil((x_max - x_min) / self.resolution)),
+                      int(np.ceil((y_max - y_min) / self.resolution)))
+
+    def to_pixels(self, xy):
+        """Maps (..., 2) x, y coordinates to (..., 2) float row, column."""
+        xy = np.asarray(xy, dtype=np.float64)
+        _, x_max, _, y_max = self.extent
+        return np.stack([(x_max - xy[..., 0]) / self.resolution,
+                         (y_max - xy[..., 1]) / self.resolution], axis=-1)
+
+    def cells(self, points):
+        """Returns the flat cell index of the points inside the grid.
+
+        Returns:
+            Tuple of (M,) int64 cell indices and the (N,) bool mask of the
+            points they belong to.
+        """
+        points = np.asarray(points)
+        x, y = points[:, 0], points[:, 1]
+        x_min, x_max, y_min, y_max = self.extent
+        inside = (x > x_min) & (x <= x_max) & (y > y_min) & (y <= y_max)
+        # Inside the extent the offsets are positive, so truncation floors
+        rows = ((x_max - x[inside]) / self.resolution).astype(np.int64)
+        cols = ((y_max - y[inside]) / self.resolution).astype(np.int64)
+        np.minimum(rows, self.shape[0] - 1, out=rows)
+        np.minimum(cols, self.shape[1] - 1, out=cols)
+        return rows * self.shape[1] + cols, inside
+
+    def rasterize(self, points):
+        """Bins points into the density, height and intensity channels.
+
+        Args:
+            points: (N, 3) or (N, 4) array of x, y, z (and intensity).
+
+        Returns:
+            Dict of (H, W) maps: 'density' int32 point counts, 'height'
+            float32 maximum z (-inf where empty) and 'intensity' float32 mean
+            intensity.
+        """
+        points = np.asarray(points)
+        cells, inside = self.cells(points)
+        size = self.shape[0] * self.shape[1]
+        counts = np.bincount(cells, minlength=size)
+        height = np.full(size, -np.inf, dtype=np.float32)
+        np.maximum.at(height, cells, points[inside, 2])
+        intensity = np.zeros(size, dtype=np.float32)
+        if points.shape[1] > 3:
+            sums = np.bincount(cells, points[inside, 3], minlength=size)
+            np.divide(sums, counts, out=intensity, where=counts > 0, casting='unsafe')
+        return {
+            'density': counts.astype(np.int32).reshape(self.shape),
+            'height': height.reshape(self.shape),
+            'intensity': intensity.reshape(self.shape),
+        }
+
+    def image(self, maps, height_range=HEIGHT_RANGE, density_saturation=DENSITY_SATURATION):
+        """Encodes the maps as an (H, W, 3) uint8 image.
+
+        Red is the height in height_range, green the intensity and blue the
+        log density. Empty cells are black.
+        """
+        low, high = height_range
+        image = np.empty(self.shape + (3,), dtype=np.uint8)
+        # Empty cells have a height of -inf, which clips to 0
+        height = (maps['height'] - np.float32(low)) * np.float32(255 / (high - low))
+        image[..., 0] = np.clip(height, 0, 255)
+        image[..., 1] = np.clip(maps['intensity'] * np.float32(255), 0, 255)
+        # The density is a lookup of the clipped counts
+        lut = (np.log1p(np.arange(density_saturation + 1)) / np.log1p(density_saturation) * 255)
+        image[..., 2] = lut.astype(np.uint8)[np.minimum(maps['density'], density_saturation)]
+        return image
+
+    def draw_boxes(self, image, params, colors, thickness=1):
+        """Draws the outlines of boxes into an image in place.
+
+        Args:
+            image: (H, W, 3) uint8 image of this grid.
+            params: (B, 7) box parameters from box_arrays().
+            colors: (B, 3) colors in [0, 1].
+            thickness: Line width in pixels.
+        """
+        if len(params) == 0:
+            return image
+        corners = self.to_pixels(bev_corners(params))
+        ends = np.roll(corners, -1, axis=1)
+        # Sample every edge densely enough to leave no gaps
+        steps = int(np.ceil(np.abs(ends - corners).max())) + 1
+        t = np.linspace(0.0, 1.0, steps)[None, None, :, None]
+        samples = corners[:, :, None] + t * (ends - corners)[:, :, None]
+        pixels = np.floor(samples).astype(np.int64).reshape(len(params), -1, 2)
+        box_colors = np.broadcast_to((np.asarray(colors, dtype=np.float64)[:, None] * 255)
+                                     .astype(np.uint8), pixels.shape[:2] + (3,))
+        pixels, box_colors = pixels.reshape(-1, 2), box_colors.reshape(-1, 3)
+        for dr in range(thickness):
+            for dc in range(thickness):
+                p = pixels + [dr - thickness // 2, dc - thickness // 2]
+                inside = (p >= 0).all(axis=1) & (p[:, 0] < image.shape[0]) & \
+                    (p[:, 1] < image.shape[1])
+                image[p[inside, 0], p[inside, 1]] = box_colors[inside]
+        return image
+
+
+def render_bev(points, boxes=(), grid=None, category_colors=None, thickness=1):
+    """Renders a frame and its label boxes to a BEV image.
+
+    Args:
+        points: (N, 3) or (N, 4) points.
+        boxes: Box tuples from load_bounding_boxes().
+        grid: BEVGrid, the default extent and resolution if None.
+        category_colors: Dict of category to [0, 1] color, other categories
+            are drawn in DEFAULT_BOX_COLOR.
+        thickness: Box line width in pixels.
+
+    Returns:
+        (H, W, 3) uint8 image.
+    """
+    grid = BEVGrid() if grid is None else grid
+    image = grid.image(grid.rasterize(points))
+    params, categories = box_arrays(boxes)
+    category_colors = category_colors or {}
+    colors = [category_colors.get(c, DEFAULT_BOX_COLOR) for c in categories]
+    return grid.draw_boxes(image, params, np.array(colors).reshape(-1, 3), thickness)
+
+
+def _render_frame(job):
+    bin_path, label_path, out_path, extent, resolution = job
+    points = np.fromfile(bin_path, dtype=np.float32).reshape(-1, 4)
+    boxes = load_bounding_boxes(label_path) if label_path is not None else []
+    Image.fromarray(render_bev(points, boxes, BEVGrid(extent, resolution))).save(out_path)
+    return out_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render bird's eye view images of a dataset.")
+    parser.add_argument('data_dir', help="dataset root, e.g. data")
+    parser.add_argument('-o', '--output', required=True, help="directory for the PNG files")
+    parser.add_argument('--frames', default=None,
+                        help="frame numbers, e.g. 11, 0-20 or 3,5,8-10 (default: all)")
+    parser.add_argument('--extent', type=float, nargs=4, default=DEFAULT_EXTENT,
+                        metavar=('X_MIN', 'X_MAX', 'Y_MIN', 'Y_MAX'))
+    parser.add_argument('--resolution', type=float, default=DEFAULT_RESOLUTION,
+                        help="cell size in meters")
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help="number of worker processes")
+    args = parser.parse_args()
+
+    index = DatasetIndex.open(args.data_dir)
+    frame_ids = index.frame_ids
+    if args.frames is not None:
+        frame_ids = [f'{frame:06d}' for frame in parse_frames(args.frames)
+                     if f'{frame:06d}' in index]
+    os.makedirs(args.output, exist_ok=True)
+    jobs = [(index.path(frame_id), index.path(frame_id, 'label'),
+             os.path.join(args.output, frame_id + '.png'), args.extent, args.resolution)
+            for frame_id in frame_ids]
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        written = list(pool.map(_render_frame, jobs, chunksize=8))
+    print(f"[Info] Wrote {len(written)} images to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+import numpy as np
+
+
+class BoxRegistry:
+    """Boxes of one frame with integer category ids and per-category masks.
+
+    Every box gets a unique scene geometry name. For each category the points
+    inside any of its boxes are stored as a bitset packed with np.packbits, so
+    the points of any set of categories are found with a bitwise OR over a
+    few rows of N / 8 bytes.
+    """
+
+    def __init__(self, boxes, box_ids, num_points):
+        """
+        Args:
+            boxes: List of box tuples as returned by load_bounding_boxes().
+            box_ids: (N,) index of the box containing each point, -1 for none.
+            num_points: Number of points N of the frame.
+        """
+        self.categories = list(dict.fromkeys(box[-1] for box in boxes))
+        index = {name: i for i, name in enumerate(self.categories)}
+        self.box_categories = np.array([index[box[-1]] for box in boxes],
+                                       dtype=np.int16)
+        self.names = [f"box_{i}_{box[-1]}" for i, box in enumerate(boxes)]
+        self.num_points = num_points
+
+        # Category of the box containing each point, -1 outside all boxes.
+        # One gather over all points, the box lookup table has a trailing -1
+        # so that box id -1 maps to "no category".
+        lookup = np.append(self.box_categories, -1).astype(np.int16)
+        self.point_categories = lookup[np.asarray(box_ids, dtype=np.int64)]
+        self._masks = np.zeros(
+            (len(self.categories), (num_points + 7) // 8), dtype=np.uint8)
+        for category_id in range(len(self.categories)):
+            self._masks[category_id] = np.packbits(
+                self.point_categories == category_id)
+
+    def __len__(self):
+        return len(self.names)
+
+    def category_id(self, name):
+        return self.categories.index(name)
+
+    def box_category(self, box_index):
+        return self.categories[self.box_categories[box_index]]
+
+    def box_colors(self, category_colors, default=(0.5, 0.5, 0.5)):
+        """Returns the (B, 3) colors of the boxes by their category.
+
+        One palette row per category, gathered by the box category ids.
+        """
+        palette = np.array([category_colors.get(name, default) for name in self.categories],
+                           dtype=np.float64).reshape(-1, 3)
+        return palette[self.box_categories]
+
+    def mask(self, categories):
+        """Returns the (N,) bool mask of points inside boxes of categories."""
+        ids = [self.category_id(name) for name in categories
+               if name in self.categories]
+        if not ids:
+            return np.zeros(self.num_points, dtype=bool)
+        packed = np.bitwise_or.reduce(self._masks[ids], axis=0)
+        return np.unpackbits(packed, count=self.num_points).view(bool)
+
+    def colorize(self, point_colors, categories, category_colors):
+        """Colors the points of the given categories by their category.
+
+        Every category becomes one palette entry, so changing the color of a
+        category later is a single point_colors.set_color() call.
+
+        Args:
+            point_colors: utils.palette.PaletteColors that is modified in
+                place.
+            categories: Names of the categories to color.
+            category_colors: Dict mapping category names to RGB colors.
+
+        Returns:
+            Palette index of the first category, category i is at the
+            returned index + i.
+        """
+        mask = self.mask(categories)
+        offset = point_colors.extend([
+            category_colors.get(name, [0.5, 0.5, 0.5])
+            for name in self.categories
+        ])
+        point_colors.assign(mask, offset + self.point_categories[mask])
+        return offset
@@ -0,0 +1,122 @@
+"""Camera bookmarks and paths in Open3D's ViewTrajectory JSON format.
+
+This is the format of data/vis_setting.json and of the views that the legacy
+Open3D visualizer saves. Every keyframe holds lookat, front, up, zoom,
+field_of_view and the bounding box the zoom refers to. A path is replayed by
+interpolating interval steps between consecutive keyframes, which only
+depends on the file, so every replay visits exactly the same poses.
+"""
+
+import json
+
+import numpy as np
+
+DEFAULT_INTERVAL = 29
+
+
+def _normalize(v):
+    v = np.asarray(v, dtype=np.float64)
+    norm = np.linalg.norm(v)
+    return v / norm if norm > 0 else v
+
+
+def _max_extent(view):
+    extent = np.subtract(view["boundingbox_max"], view["boundingbox_min"])
+    return max(float(np.max(extent)), 1e-6)
+
+
+def view_to_pose(view):
+    """Converts a ViewTrajectory keyframe to a camera pose.
+
+    The eye is placed like Open3D's ViewControl does: at lookat + front *
+    distance, where distance follows from zoom, the bounding box extent and
+    the field of view.
+
+    Returns:
+        Tuple (center, eye, up, field_of_view).
+    """
+    fov = float(view.get("field_of_view", 60.0))
+    center = np.asarray(view["lookat"], dtype=np.float64)
+    distance = view["zoom"] * _max_extent(view) / np.tan(np.radians(fov) / 2)
+    eye = center + _normalize(view["front"]) * distance
+    return center, eye, _normalize(view["up"]), fov
+
+
+def pose_to_view(center, eye, up, field_of_view, bounds_min, bounds_max):
+    """Converts a camera pose to a ViewTrajectory keyframe, see view_to_pose()."""
+    view = {
+        "boundingbox_max": [float(v) for v in bounds_max],
+        "boundingbox_min": [float(v) for v in bounds_min],
+        "field_of_view": float(field_of_view),
+    }
+    offset = np.asarray(eye, dtype=np.float64) - np.asarray(center, dtype=np.float64)
+    distance = np.linalg.norm(offset)
+    front = _normalize(offset)
+    # Keep up orthogonal to the viewing direction
+    up = _normalize(np.asarray(up, dtype=np.float64) - np.dot(up, front) * front)
+    view.update({
+        "front": front.tolist(),
+        "lookat": [float(v) for v in center],
+        "up": up.tolist(),
+        "zoom": float(distance * np.tan(np.radians(field_of_view) / 2) / _max_extent(view)),
+    })
+    return view
+
+
+def load_trajectory(path):
+    """Reads a ViewTrajectory JSON file.
+
+    Returns:
+        Tuple (views, interval, is_loop) with the keyframe dicts.
+    """
+    with open(path) as f:
+        data = json.load(f)
+    if data.get("class_name") != "ViewTrajectory":
+        raise ValueError(f"{path} is not a ViewTrajectory file")
+    return (data["trajectory"], int(data.get("interval", DEFAULT_INTERVAL)),
+            bool(data.get("is_loop", False)))
+
+
+def save_trajectory(path, views, interval=DEFAULT_INTERVAL, is_loop=False):
+    """Writes keyframes as a ViewTrajectory JSON file."""
+    data = {
+        "class_name": "ViewTrajectory",
+        "interval": int(interval),
+        "is_loop": bool(is_loop),
+        "trajectory": list(views),
+        "version_major": 1,
+        "version_minor": 0,
+    }
+    with open(path, "w") as f:
+        json.dump(data, f, indent=4)
+
+
+def interpolate_poses(views, interval=DEFAULT_INTERVAL, is_loop=False):
+    """Expands keyframes to the poses of every replay step.
+
+    interval poses are inserted between consecutive keyframes. Look-at
+    points, distances and fields of view are interpolated linearly and the
+    viewing and up directions by normalized linear interpolation.
+
+    Returns:
+        List of (center, eye, up, field_of_view) tuples.
+    """
+    poses = [view_to_pose(view) for view in views]
+    if len(poses) < 2:
+        return poses
+    if is_loop:
+        poses = poses + poses[:1]
+    steps = []
+    for (c0, e0, u0, f0), (c1, e1, u1, f1) in zip(poses[:-1], poses[1:]):
+        d0, d1 = np.linalg.norm(e0 - c0), np.linalg.norm(e1 - c1)
+        front0, front1 = _normalize(e0 - c0), _normalize(e1 - c1)
+        for t in np.arange(interval + 1) / (interval + 1):
+            center = (1 - t) * c0 + t * c1
+            front = _normalize((1 - t) * front0 + t * front1)
+            up = _normalize((1 - t) * u0 + t * u1)
+            distance = (1 - t) * d0 + t * d1
+            steps.append((center, center + front * distance, up,
+                          (1 - t) * f0 + t * f1))
+    if not is_loop:
+        steps.append(poses[-1])
+    return steps
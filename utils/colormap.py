@@ -1,3 +1,6 @@
+import numpy as np
+
+
 class Colormap:
     """This class is used to create a color map for visualization of points."""
 
@@ -75,6 +78,49 @@ class Colormap:
 
         return [tex[int(u * n)] for u in u_array]
 
+    def calc_lut(self, size=256):
+        """Samples the colormap into a lookup table.
+
+        Args:
+            size: Number of entries in the table.
+
+        Returns:
+            A (size, 3) float32 array of colors for values evenly spaced in
+            [0, 1].
+        """
+        values = np.array([p.value for p in self.points], dtype=np.float64)
+        colors = np.array([p.color for p in self.points], dtype=np.float64)
+        x = np.linspace(0.0, 1.0, size)
+        return np.stack([np.interp(x, values, colors[:, c]) for c in range(3)],
+                        axis=1).astype(np.float32)
+
+    def colorize(self, values, range_min, range_max, lut=None):
+        """Maps an array of scalars to colors with one table lookup.
+
+        Args:
+            values: The array of scalar values.
+            range_min: The value mapped to the first color.
+            range_max: The value mapped to the last color.
+            lut: Optional table from calc_lut(), to avoid resampling it.
+
+        Returns:
+            A (N, 3) float32 array of colors.
+        """
+        if lut is None:
+            lut = self.calc_lut()
+        return lut[self.lut_indices(values, range_min, range_max, len(lut))]
+
+    @staticmethod
+    def lut_indices(values, range_min, range_max, size=256):
+        """Quantizes scalars to indices into a table from calc_lut().
+
+        Returns:
+            A (N,) array of indices, uint8 for tables of up to 256 entries.
+        """
+        range_width = max(range_max - range_min, 1e-12)
+        u = np.clip((np.asarray(values) - range_min) / range_width, 0.0, 1.0)
+        return (u * (size - 1)).astype(np.uint8 if size <= 256 else np.int64)
+
     # These are factory methods rather than class objects because
     # the user may modify the colormaps that are used.
     @staticmethod
@@ -99,3 +145,11 @@ class Colormap:
             Colormap.Point(0.875, [1.0, 0.5, 0.0]),
             Colormap.Point(1.000, [1.0, 0.0, 0.0])
         ])
+
+    @staticmethod
+    def make_from_colors(colors):
+        """Generate a colormap with the given colors evenly spaced."""
+        n = max(len(colors) - 1, 1)
+        return Colormap([
+            Colormap.Point(i / n, list(color)) for i, color in enumerate(colors)
+        ])
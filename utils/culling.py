@@ -0,0 +1,177 @@
+import time
+
+import numpy as np
+
+
+def frustum_planes(view_matrix, projection_matrix):
+    """Extracts the six frustum planes of an OpenGL style camera.
+
+    Args:
+        view_matrix: 4x4 world to camera matrix.
+        projection_matrix: 4x4 camera to clip space matrix.
+
+    Returns:
+        (6, 4) array of planes (a, b, c, d) with unit normals pointing into
+        the frustum, a point p is inside if a*x + b*y + c*z + d >= 0 for all.
+    """
+    m = np.asarray(projection_matrix, dtype=np.float64) @ \
+        np.asarray(view_matrix, dtype=np.float64)
+    planes = np.array([m[3] + m[0], m[3] - m[0],   # left, right
+                       m[3] + m[1], m[3] - m[1],   # bottom, top
+                       m[3] + m[2], m[3] - m[2]])  # near, far
+    return planes / np.linalg.norm(planes[:, :3], axis=1, keepdims=True)
+
+
+class BlockGrid:
+    """Points bucketed into a coarse voxel grid of blocks with bounding boxes.
+
+    Culling works on blocks instead of points: testing a few thousand block
+    AABBs against the frustum replaces testing millions of points.
+    """
+
+    def __init__(self, points, block_size=10.0):
+        """
+        Args:
+            points: (N, 3+) array of points.
+            block_size: Edge length of a block in meters.
+        """
+        xyz = np.asarray(points)[:, :3]
+        self.num_points = len(xyz)
+        self.block_size = block_size
+        keys = np.floor(xyz / block_size).astype(np.int64)
+        if len(keys):
+            # One linear key per block, sorting int64 is much faster than
+            # np.unique over rows
+            keys -= keys.min(axis=0)
+            keys = np.ravel_multi_index(keys.T, keys.max(axis=0) + 1)
+        _, self.point_blocks, counts = np.unique(keys, return_inverse=True,
+                                                 return_counts=True)
+        self.point_blocks = self.point_blocks.reshape(-1)
+        self.counts = counts
+        order = np.argsort(self.point_blocks, kind='stable')
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]]).astype(np.int64)
+        sorted_xyz = xyz[order]
+        self.mins = np.minimum.reduceat(sorted_xyz, starts, axis=0) if len(xyz) else np.zeros((0, 3))
+        self.maxs = np.maximum.reduceat(sorted_xyz, starts, axis=0) if len(xyz) else np.zeros((0, 3))
+
+    def __len__(self):
+        return len(self.counts)
+
+    def visible(self, planes, margin=0.0):
+        """Returns the (B,) bool mask of blocks intersecting the frustum.
+
+        Args:
+            planes: (6, 4) planes from frustum_planes().
+            margin: Distance in meters the frustum is grown by.
+        """
+        normals, offsets = planes[:, :3], planes[:, 3]
+        # The AABB corner furthest along each plane normal
+        corners = np.where(normals[None, :, :] >= 0, self.maxs[:, None, :],
+                           self.mins[:, None, :])
+        distance = np.einsum('bpk,pk->bp', corners, normals) + offsets
+        return (distance >= -margin).all(axis=1)
+
+    def distances(self, eye):
+        """Returns the distance of each block AABB to eye, 0 when inside."""
+        eye = np.asarray(eye, dtype=np.float64)
+        nearest = np.clip(eye, self.mins, self.maxs)
+        return np.linalg.norm(nearest - eye, axis=1)
+
+    def point_mask(self, block_mask):
+        """Expands a block mask to the (N,) mask of the points in those blocks."""
+        return block_mask[self.point_blocks]
+
+
+class FrustumCuller:
+    """Selects the blocks to upload for the current camera, with hysteresis.
+
+    Blocks are selected with a frustum grown by margin. A new selection is
+    only made once a block that is visible in the exact frustum is missing
+    from the uploaded one, or when the uploaded set holds more than
+    slack_ratio times the points that are needed. With a point budget, the
+    needed blocks are the nearest ones within budget_ratio of the budget, so
+    blocks at the edge of the budget do not flip on every move either.
+    Small camera movements therefore do not cause uploads.
+    """
+
+    def __init__(self, grid, point_budget=None, max_distance=None,
+                 margin=None, slack_ratio=3.0, budget_ratio=0.8):
+        """
+        Args:
+            grid: BlockGrid of the cloud.
+            point_budget: Maximum number of uploaded points, nearest blocks
+                are kept first. None for no limit.
+            max_distance: Blocks further away from the camera are culled.
+            margin: Frustum growth for the hysteresis (default: one block).
+            slack_ratio: Re-select once the uploaded points exceed the needed
+                points by this factor.
+            budget_ratio: Part of the budget that has to stay covered.
+        """
+        self.grid = grid
+        self.point_budget = point_budget
+        self.max_distance = max_distance
+        self.margin = grid.block_size if margin is None else margin
+        self.slack_ratio = slack_ratio
+        self.budget_ratio = budget_ratio
+        self.uploaded = None
+        self.refreshes = 0
+        self.last_time = 0.0
+        self.needed_points = 0
+
+    def _select(self, visible, eye, priority=None, budget=None):
+        distances = self.grid.distances(eye)
+        if self.max_distance is not None:
+            visible = visible & (distances <= self.max_distance)
+        budget = self.point_budget if budget is None else budget
+        if budget is not None and self.grid.counts[visible].sum() > budget:
+            # Blocks by priority, then the nearest ones, until the budget is
+            # used up
+            ids = np.flatnonzero(visible)
+            rank = np.zeros(len(ids), dtype=np.int8) if priority is None else priority[ids]
+            ids = ids[np.lexsort((distances[ids], rank))]
+            keep = ids[np.cumsum(self.grid.counts[ids]) <= budget]
+            visible = np.zeros_like(visible)
+            visible[keep] = True
+        return visible
+
+    def update(self, view_matrix, projection_matrix, eye):
+        """Culls for a camera.
+
+        Returns:
+            The new (N,) point mask to upload, or None if the uploaded blocks
+            still cover the view.
+        """
+        start = time.perf_counter()
+        planes = frustum_planes(view_matrix, projection_matrix)
+        budget = None if self.point_budget is None else self.budget_ratio * self.point_budget
+        visible = self.grid.visible(planes)
+        needed = self._select(visible, eye, budget=budget)
+        self.needed_points = int(self.grid.counts[needed].sum())
+        result = None
+        if self.uploaded is None or (needed & ~self.uploaded).any() or \
+                self.uploaded_points > self.slack_ratio * max(self.needed_points, 1):
+            # needed fits the budget and goes first, so it is always uploaded,
+            # then the rest of the view and then the margin
+            priority = np.where(needed, 0, np.where(visible, 1, 2)).astype(np.int8)
+            self.uploaded = self._select(self.grid.visible(planes, self.margin), eye, priority)
+            self.refreshes += 1
+            result = self.grid.point_mask(self.uploaded)
+        self.last_time = time.perf_counter() - start
+        return result
+
+    @property
+    def uploaded_points(self):
+        return 0 if self.uploaded is None else int(self.grid.counts[self.uploaded].sum())
+
+    def stats(self):
+        """Returns a dict of the counters shown in the statistics overlay."""
+        return {
+            'blocks': len(self.grid),
+            'uploaded_blocks': 0 if self.uploaded is None else int(self.uploaded.sum()),
+            'points': self.grid.num_points,
+            'uploaded_points': self.uploaded_points,
+            'needed_points': self.needed_points,
+            'point_budget': self.point_budget,
+            'refreshes': self.refreshes,
+            'cull_ms': 1000.0 * self.last_time,
+        }
@@ -0,0 +1,176 @@
+"""Index of the frames of a dataset directory.
+
+A dataset root holds one sub-directory per kind of file, in the layout of
+this repository (3D/, Label/, Image/, ...) or the KITTI one (velodyne/,
+label_2/, image_2/, calib/). Every file is keyed by its frame id, the file
+name without extension. The root is scanned once with os.scandir and the
+result is kept in a small JSON manifest in the root, which stays valid as
+long as the modification times of the scanned directories do not change.
+
+Run ``python -m utils.dataset DATA_DIR`` to build or refresh the manifest.
+"""
+
+import argparse
+import json
+import os
+
+MANIFEST_NAME = '.dataset_index.json'
+MANIFEST_VERSION = 1
+
+# Candidate sub-directories and file extensions of every kind of file.
+LAYOUT = {
+    'points': (('3D', 'velodyne'), ('.bin',)),
+    'label': (('Label', 'label_2'), ('.txt',)),
+    'prediction': (('Prediction',), ('.txt',)),
+    'semantic': (('Semantic', 'labels'), ('.label',)),
+    'image': (('Image', 'image_2'), ('.png', '.jpg')),
+    'calib': (('Calib', 'calib'), ('.txt',)),
+}
+
+
+def _scan(directory, extensions):
+    """Maps frame id to file name for the files of a directory."""
+    files = {}
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            frame_id, ext = os.path.splitext(entry.name)
+            if ext.lower() in extensions and entry.is_file():
+                files[frame_id] = entry.name
+    return files
+
+
+def find_root(path):
+    """Returns the dataset root of a point file, None if it is not in one.
+
+    The root is the parent of the directory holding the point file when that
+    directory is one of the point directories of LAYOUT.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    if os.path.basename(directory) in LAYOUT['points'][0]:
+        return os.path.dirname(directory)
+    return None
+
+
+def parse_frames(spec):
+    """Parses '11', '0-20' or '3,5,8-10' into a list of frame numbers."""
+    frames = []
+    for part in spec.split(','):
+        if '-' in part:
+            first, last = part.split('-', 1)
+            frames.extend(range(int(first), int(last) + 1))
+        else:
+            frames.append(int(part))
+    return frames
+
+
+class DatasetIndex:
+    """Paths of the points, labels, images, ... of every frame of a root."""
+
+    def __init__(self, root, directories, files):
+        """Use DatasetIndex.open() or DatasetIndex.build()."""
+        self.root = os.path.abspath(root)
+        # kind -> (sub-directory name, mtime_ns when scanned)
+        self.directories = directories
+        # kind -> {frame id: file name}
+        self.files = files
+        self.frame_ids = sorted(files.get('points', {}))
+        self._positions = {frame_id: i for i, frame_id in enumerate(self.frame_ids)}
+
+    def __len__(self):
+        return len(self.frame_ids)
+
+    def __contains__(self, frame_id):
+        return frame_id in self._positions
+
+    @classmethod
+    def build(cls, root):
+        """Scans root, one os.scandir per existing sub-directory."""
+        directories, files = {}, {}
+        for kind, (names, extensions) in LAYOUT.items():
+            for name in names:
+                directory = os.path.join(root, name)
+                if os.path.isdir(directory):
+                    directories[kind] = (name, os.stat(directory).st_mtime_ns)
+                    files[kind] = _scan(directory, extensions)
+                    break
+        return cls(root, directories, files)
+
+    @classmethod
+    def open(cls, root, save=True):
+        """Loads the manifest of root, rebuilding it if it is missing or stale.
+
+        Args:
+            root: Dataset root directory.
+            save: Write a rebuilt index back to the manifest.
+        """
+        manifest = os.path.join(root, MANIFEST_NAME)
+        try:
+            with open(manifest) as f:
+                data = json.load(f)
+            if data.get('version') == MANIFEST_VERSION:
+                index = cls(root, {k: tuple(v) for k, v in data['directories'].items()},
+                            data['files'])
+                if index.is_current():
+                    return index
+        except (OSError, ValueError, KeyError):
+            pass
+        index = cls.build(root)
+        if save:
+            try:
+                index.save()
+            except OSError:
+                # A read-only dataset still works, just without the manifest
+                pass
+        return index
+
+    def is_current(self):
+        """Checks that no scanned directory changed, disappeared or appeared."""
+        for name, _ in self.directories.values():
+            if not os.path.isdir(os.path.join(self.root, name)):
+                return False
+        for kind, (names, _) in LAYOUT.items():
+            for name in names:
+                directory = os.path.join(self.root, name)
+                if os.path.isdir(directory):
+                    scanned = self.directories.get(kind)
+                    if scanned is None or scanned[0] != name or \
+                            scanned[1] != os.stat(directory).st_mtime_ns:
+                        return False
+                    break
+        return True
+
+    def save(self):
+        with open(os.path.join(self.root, MANIFEST_NAME), 'w') as f:
+            json.dump({'version': MANIFEST_VERSION, 'directories': self.directories,
+                       'files': self.files}, f)
+
+    def path(self, frame_id, kind='points'):
+        """Returns the path of a file of a frame, None if there is none."""
+        name = self.files.get(kind, {}).get(frame_id)
+        if name is None:
+            return None
+        return os.path.join(self.root, self.directories[kind][0], name)
+
+    def position(self, frame_id):
+        """Returns the position of a frame in frame_ids, -1 if unknown."""
+        return self._positions.get(frame_id, -1)
+
+    def frames_with(self, *kinds):
+        """Returns the frame ids that have a file of every kind."""
+        return [frame_id for frame_id in self.frame_ids
+                if all(frame_id in self.files.get(kind, {}) for kind in kinds)]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build the frame index manifest of a dataset directory.")
+    parser.add_argument('data_dir', help="dataset root, e.g. data")
+    args = parser.parse_args()
+    index = DatasetIndex.build(args.data_dir)
+    index.save()
+    counts = ", ".join(f"{len(files)} {kind}" for kind, files in index.files.items())
+    print(f"[Info] Indexed {len(index)} frames in {args.data_dir}: {counts}")
+
+
+if __name__ == '__main__':
+    main()
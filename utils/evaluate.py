@@ -0,0 +1,110 @@
+"""Headless evaluation of predictions against KITTI labels.
+
+Every frame with a file in DATA_DIR/Label is matched against its file in the
+prediction directory (DATA_DIR/Prediction by default) in a worker process.
+A frame without a prediction file has no predictions, so its ground truth
+boxes count as misses, as in the KITTI devkit. The parent collects the
+scores and true positive flags per class and reports the average
+precision.
+
+Run ``python -m utils.evaluate DATA_DIR [--pred-dir DIR] [--mode bev]``.
+"""
+
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .dataset import DatasetIndex
+from .iou import average_precision, match_boxes
+from .kitti import box_arrays, load_bounding_boxes, load_predictions
+
+IGNORED_CATEGORIES = ('DontCare',)
+
+
+def frame_jobs(data_dir, pred_dir, mode):
+    index = DatasetIndex.open(data_dir)
+    return [(index.path(frame_id, 'label'), os.path.join(pred_dir, frame_id + '.txt'), mode)
+            for frame_id in index.frames_with('label')]
+
+
+def evaluate_frame(job):
+    """Map step: per-class scores, true positive flags and ground truth count."""
+    label_path, pred_path, mode = job
+    gt = [b for b in load_bounding_boxes(label_path)
+          if b[-1] not in IGNORED_CATEGORIES]
+    if os.path.isfile(pred_path):
+        pred, scores = load_predictions(pred_path)
+    else:
+        pred, scores = [], np.zeros(0, dtype=np.float32)
+    gt_params, gt_categories = box_arrays(gt)
+    pred_params, pred_categories = box_arrays(pred)
+    _, pred_match, _ = match_boxes(gt_params, gt_categories, pred_params,
+                                   pred_categories, scores, mode)
+    result = {}
+    for category in set(gt_categories) | set(pred_categories):
+        p = np.array([c == category for c in pred_categories], dtype=bool)
+        result[category] = (scores[p], pred_match[p] >= 0,
+                            sum(c == category for c in gt_categories))
+    return result
+
+
+def evaluate_dataset(data_dir, pred_dir=None, mode='3d', workers=None):
+    """Computes the AP of every class over all frames in parallel.
+
+    Returns:
+        Dict mapping category to a dict with 'ap', 'num_gt' and
+        'num_predictions'.
+    """
+    if pred_dir is None:
+        pred_dir = os.path.join(data_dir, 'Prediction')
+    collected = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for partial in pool.map(evaluate_frame,
+                                frame_jobs(data_dir, pred_dir, mode),
+                                chunksize=16):
+            for category, (scores, tp, num_gt) in partial.items():
+                entry = collected.setdefault(category, ([], [], [0]))
+                entry[0].append(scores)
+                entry[1].append(tp)
+                entry[2][0] += num_gt
+
+    summary = {}
+    for category, (scores, tp, num_gt) in sorted(collected.items()):
+        scores, tp = np.concatenate(scores), np.concatenate(tp)
+        summary[category] = {
+            'ap': average_precision(scores, tp, num_gt[0]),
+            'num_gt': num_gt[0],
+            'num_predictions': int(len(scores)),
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Evaluate predictions against KITTI style labels.")
+    parser.add_argument('data_dir', help="directory with Label/")
+    parser.add_argument('--pred-dir', default=None,
+                        help="prediction directory (default: DATA_DIR/Prediction)")
+    parser.add_argument('--mode', choices=('3d', 'bev'), default='3d',
+                        help="IoU used for matching")
+    parser.add_argument('-o', '--output', default=None,
+                        help="optional JSON summary path")
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help="number of worker processes")
+    args = parser.parse_args()
+
+    summary = evaluate_dataset(args.data_dir, args.pred_dir, args.mode,
+                               args.workers)
+    for category, stats in summary.items():
+        print(f"{category:>16}: AP {stats['ap'] * 100:6.2f}  "
+              f"({stats['num_gt']} gt, {stats['num_predictions']} predictions)")
+    if args.output is not None:
+        with open(args.output, 'w') as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
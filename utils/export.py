@@ -0,0 +1,175 @@
+import os
+import queue
+import shutil
+import subprocess
+import threading
+
+import numpy as np
+from PIL import Image
+
+
+def _to_array(image):
+    """Returns the (H, W, 3) uint8 RGB pixels of a rendered image."""
+    pixels = np.asarray(image)
+    if pixels.dtype != np.uint8:
+        pixels = (np.clip(pixels, 0, 1) * 255).astype(np.uint8)
+    if pixels.ndim == 2:
+        pixels = np.repeat(pixels[:, :, None], 3, axis=2)
+    return np.ascontiguousarray(pixels[:, :, :3])
+
+
+class ImageWriter:
+    """Writes frames as PNG or JPEG files, chosen by the path extension.
+
+    With numbered=True frame i is written to <path stem>_<i:05d><ext>, so
+    several frames can be encoded at the same time.
+    """
+
+    ordered = False
+
+    def __init__(self, path, numbered=False, png_compression=6, jpeg_quality=95):
+        self.path = path
+        self.numbered = numbered
+        self.png_compression = png_compression
+        self.jpeg_quality = jpeg_quality
+
+    def frame_path(self, index):
+        if not self.numbered:
+            return self.path
+        stem, ext = os.path.splitext(self.path)
+        return f"{stem}_{index:05d}{ext}"
+
+    def write(self, index, image):
+        path = self.frame_path(index)
+        picture = Image.fromarray(_to_array(image))
+        if path.lower().endswith((".jpg", ".jpeg")):
+            picture.save(path, quality=self.jpeg_quality)
+        else:
+            picture.save(path, compress_level=self.png_compression)
+
+    def close(self):
+        pass
+
+
+class VideoWriter:
+    """Pipes frames to a local ffmpeg that encodes them to an MP4 file.
+
+    Frames have to arrive in order, so the queue uses a single worker.
+    """
+
+    ordered = True
+
+    def __init__(self, path, fps=30, crf=18):
+        self.executable = shutil.which("ffmpeg")
+        if self.executable is None:
+            raise RuntimeError("ffmpeg was not found on the PATH, "
+                               "MP4 export needs a local ffmpeg")
+        self.path = path
+        self.fps = fps
+        self.crf = crf
+        self._process = None
+        self._size = None
+
+    def _start(self, width, height):
+        self._size = (width, height)
+        self._process = subprocess.Popen(
+            [self.executable, "-y", "-loglevel", "error",
+             "-f", "rawvideo", "-pix_fmt", "rgb24",
+             "-s", f"{width}x{height}", "-r", str(self.fps), "-i", "-",
+             # yuv420p needs even dimensions
+             "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2",
+             "-c:v", "libx264", "-pix_fmt", "yuv420p", "-crf", str(self.crf),
+             self.path],
+            stdin=subprocess.PIPE)
+
+    def write(self, index, image):
+        pixels = _to_array(image)
+        height, width = pixels.shape[:2]
+        if self._process is None:
+            self._start(width, height)
+        elif (width, height) != self._size:
+            raise ValueError(f"Frame {index} is {width}x{height}, "
+                             f"the video is {self._size[0]}x{self._size[1]}")
+        self._process.stdin.write(pixels.tobytes())
+
+    def close(self):
+        if self._process is not None:
+            self._process.stdin.close()
+            if self._process.wait() != 0:
+                raise RuntimeError(f"ffmpeg failed to write {self.path}")
+
+
+class ExportQueue:
+    """Encodes captured frames on worker threads.
+
+    At most max_pending frames are captured but not yet written. acquire()
+    blocks the producer until a slot frees up, so a long export runs at the
+    speed of the encoder without piling up frames in memory. The producer is
+    expected to be a background thread, never the GUI thread.
+    """
+
+    def __init__(self, writer, workers=2, max_pending=8):
+        """
+        Args:
+            writer: ImageWriter or VideoWriter. Writers with ordered = True
+                get a single worker.
+            workers: Number of encoding threads.
+            max_pending: Maximum number of frames held in memory.
+        """
+        self.writer = writer
+        self.written = 0
+        self.errors = []
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._jobs = queue.Queue()
+        self._lock = threading.Lock()
+        if writer.ordered:
+            workers = 1
+        self._threads = [threading.Thread(target=self._work, daemon=True)
+                         for _ in range(max(1, workers))]
+        for thread in self._threads:
+            thread.start()
+
+    def _work(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            index, image = job
+            try:
+                self.writer.write(index, image)
+                with self._lock:
+                    self.written += 1
+            except Exception as e:
+                with self._lock:
+                    self.errors.append(e)
+            finally:
+                self._slots.release()
+
+    def acquire(self, timeout=None):
+        """Waits for a free slot, returns False on timeout."""
+        return self._slots.acquire(timeout=timeout)
+
+    def put(self, index, image):
+        """Hands a captured frame to the workers, after acquire()."""
+        self._jobs.put((index, image))
+
+    def submit(self, index, image):
+        """acquire() and put() in one call, blocks while the queue is full."""
+        self.acquire()
+        self.put(index, image)
+
+    def close(self):
+        """Waits until all frames are written and closes the writer.
+
+        Returns:
+            The list of exceptions raised while writing.
+        """
+        for _ in self._threads:
+            self._jobs.put(None)
+        for thread in self._threads:
+            thread.join()
+        try:
+            self.writer.close()
+        except Exception as e:
+            self.errors.append(e)
+        return self.errors
@@ -0,0 +1,121 @@
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+def _nbytes(value):
+    """Approximate memory held by a cached value."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (list, tuple)):
+        return sum(_nbytes(v) for v in value)
+    if isinstance(value, dict):
+        return sum(_nbytes(v) for v in value.values())
+    if hasattr(value, '__dict__'):
+        return _nbytes(vars(value))
+    return 64
+
+
+def _freeze(value):
+    # Cached arrays are shared between windows, nobody may write into them
+    if isinstance(value, np.ndarray):
+        value.flags.writeable = False
+    elif isinstance(value, (list, tuple)):
+        for v in value:
+            _freeze(v)
+    return value
+
+
+class FrameCache:
+    """Least recently used cache of decoded frames and arrays derived from them.
+
+    Entries are keyed by the absolute file path and a kind, e.g. 'points' or
+    ('ground', 3). An entry is dropped when the file's modification time or
+    size changes. One cache can be shared by several windows so a frame that
+    is open in two of them is only read and processed once. Cached arrays are
+    made read-only.
+    """
+
+    def __init__(self, max_bytes=2 << 30):
+        """
+        Args:
+            max_bytes: Memory budget; least recently used entries are evicted
+                once it is exceeded.
+        """
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def _stamp(path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def get(self, path, kind, compute):
+        """Returns the cached value or computes and stores it.
+
+        Args:
+            path: File the value is derived from.
+            kind: Hashable name of the value.
+            compute: Function without arguments returning the value.
+        """
+        key = (os.path.abspath(path), kind)
+        stamp = self._stamp(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == stamp:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+        self.misses += 1
+        return self._store(key, stamp, compute())
+
+    def _store(self, key, stamp, value):
+        value = _freeze(value)
+        size = _nbytes(value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[2]
+            self._entries[key] = (stamp, value, size)
+            self.nbytes += size
+            while self.nbytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self.nbytes -= evicted
+        return value
+
+    def peek(self, path, kind):
+        """Returns the cached value, None if there is no current one."""
+        key = (os.path.abspath(path), kind)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != self._stamp(path):
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, path, kind, value):
+        """Stores a value computed elsewhere, e.g. by a worker process."""
+        return self._store((os.path.abspath(path), kind), self._stamp(path), value)
+
+    def invalidate(self, path=None):
+        """Drops the entries of one file, or everything."""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self.nbytes = 0
+                return
+            path = os.path.abspath(path)
+            for key in [k for k in self._entries if k[0] == path]:
+                self.nbytes -= self._entries.pop(key)[2]
@@ -0,0 +1,81 @@
+import numpy as np
+
+
+def fit_ground_plane(points,
+                     distance_threshold=0.2,
+                     sample_size=4096,
+                     iterations=100,
+                     max_tilt_deg=20.0,
+                     seed=0):
+    """Fits the ground plane with RANSAC on a random subsample.
+
+    All candidate planes are scored at once against the subsample, so the
+    cost is bounded by sample_size * iterations regardless of the cloud size.
+
+    Args:
+        points: (N, 3+) array of points.
+        distance_threshold: Maximum point to plane distance of an inlier.
+        sample_size: Number of points the plane is fitted on.
+        iterations: Number of RANSAC hypotheses.
+        max_tilt_deg: Planes tilted more than this against the xy-plane are
+            rejected, so walls are never picked as ground.
+        seed: Seed of the random generator.
+
+    Returns:
+        (4,) float64 array (a, b, c, d) of the plane a*x + b*y + c*z + d = 0
+        with a unit normal pointing up, or None if no plane was found.
+    """
+    xyz = np.asarray(points)[:, :3].astype(np.float64)
+    if len(xyz) < 3:
+        return None
+    rng = np.random.default_rng(seed)
+    if len(xyz) > sample_size:
+        xyz = xyz[rng.choice(len(xyz), sample_size, replace=False)]
+
+    tri = xyz[rng.integers(0, len(xyz), (iterations, 3))]
+    normals = np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0])
+    length = np.linalg.norm(normals, axis=1)
+    valid = length > 1e-9
+    normals[valid] /= length[valid, None]
+    normals[normals[:, 2] < 0] *= -1
+    valid &= normals[:, 2] >= np.cos(np.radians(max_tilt_deg))
+    if not valid.any():
+        return None
+    normals = normals[valid]
+    offsets = -(normals * tri[valid, 0]).sum(axis=1)
+
+    distances = np.abs(xyz @ normals.T + offsets)
+    scores = (distances < distance_threshold).sum(axis=0)
+    best = np.argmax(scores)
+
+    # Refine with a least squares fit on the inliers of the best hypothesis.
+    inliers = xyz[distances[:, best] < distance_threshold]
+    normal, offset = normals[best], offsets[best]
+    if len(inliers) >= 3:
+        centroid = inliers.mean(axis=0)
+        refined = np.linalg.svd(inliers - centroid)[2][-1]
+        if refined[2] < 0:
+            refined = -refined
+        if refined[2] >= np.cos(np.radians(max_tilt_deg)):
+            normal, offset = refined, -refined @ centroid
+    return np.append(normal, offset)
+
+
+def segment_ground(points, distance_threshold=0.2, **kwargs):
+    """Classifies every point as ground or not in one vectorized pass.
+
+    Args:
+        points: (N, 3+) array of points.
+        distance_threshold: Maximum point to plane distance of ground points.
+        **kwargs: Forwarded to fit_ground_plane().
+
+    Returns:
+        Tuple of the (N,) bool ground mask and the plane (see
+        fit_ground_plane()).
+    """
+    plane = fit_ground_plane(points, distance_threshold, **kwargs)
+    if plane is None:
+        return np.zeros(len(points), dtype=bool), None
+    xyz = np.asarray(points)[:, :3]
+    mask = np.abs(xyz @ plane[:3].astype(xyz.dtype) + plane[3]) < distance_threshold
+    return mask, plane
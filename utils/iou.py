@@ -0,0 +1,191 @@
+import numpy as np
+
+from .kitti import box_frames
+
+# KITTI IoU thresholds for a true positive, other classes use DEFAULT_IOU.
+IOU_THRESHOLDS = {'Car': 0.7, 'Van': 0.7, 'Truck': 0.7, 'Pedestrian': 0.5,
+                  'Cyclist': 0.5}
+DEFAULT_IOU = 0.5
+
+
+def bev_corners(params):
+    """Returns the (B, 4, 2) xy corners of boxes in counter-clockwise order."""
+    centers, rotations, extents = box_frames(params)
+    signs = np.array([[1, 1], [-1, 1], [-1, -1], [1, -1]], dtype=np.float64)
+    local = 0.5 * extents[:, None, :2] * signs[None]
+    return centers[:, None, :2] + np.einsum('bij,bkj->bki',
+                                            rotations[:, :2, :2], local)
+
+
+def _cross(o, a, b):
+    return (a[..., 0] - o[..., 0]) * (b[..., 1] - o[..., 1]) - \
+        (a[..., 1] - o[..., 1]) * (b[..., 0] - o[..., 0])
+
+
+def _inside(points, polygon):
+    """Tests (M, K, 2) points against (M, 4, 2) counter-clockwise polygons."""
+    a = polygon[:, None, :, :]
+    b = np.roll(polygon, -1, axis=1)[:, None, :, :]
+    return (_cross(a, b, points[:, :, None, :]) >= -1e-9).all(axis=2)
+
+
+def polygon_intersection_area(poly_a, poly_b):
+    """Intersection area of pairs of convex quadrilaterals.
+
+    The intersection polygon is made of the corners of each quad that lie in
+    the other one plus all edge crossings. These candidates are sorted by
+    angle around their centroid and the area follows from the shoelace
+    formula, all without a Python loop over the pairs.
+
+    Args:
+        poly_a: (M, 4, 2) counter-clockwise corners.
+        poly_b: (M, 4, 2) counter-clockwise corners.
+
+    Returns:
+        (M,) intersection areas.
+    """
+    m = len(poly_a)
+    if m == 0:
+        return np.zeros(0)
+
+    # Edge crossings, (M, 4, 4) for every edge of a against every edge of b.
+    p, r = poly_a[:, :, None, :], (np.roll(poly_a, -1, axis=1) - poly_a)[:, :, None, :]
+    q, s = poly_b[:, None, :, :], (np.roll(poly_b, -1, axis=1) - poly_b)[:, None, :, :]
+    denom = r[..., 0] * s[..., 1] - r[..., 1] * s[..., 0]
+    qp = q - p
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = (qp[..., 0] * s[..., 1] - qp[..., 1] * s[..., 0]) / denom
+        u = (qp[..., 0] * r[..., 1] - qp[..., 1] * r[..., 0]) / denom
+    crossing = (np.abs(denom) > 1e-12) & (t >= 0) & (t <= 1) & (u >= 0) & (u <= 1)
+    t = np.where(crossing, t, 0.0)
+    crossings = (p + t[..., None] * r).reshape(m, 16, 2)
+
+    candidates = np.concatenate([poly_a, poly_b, crossings], axis=1)
+    valid = np.concatenate([_inside(poly_a, poly_b), _inside(poly_b, poly_a),
+                            crossing.reshape(m, 16)], axis=1)
+    candidates = np.where(valid[..., None], candidates, 0.0)
+
+    count = valid.sum(axis=1)
+    centroid = candidates.sum(axis=1) / np.maximum(count, 1)[:, None]
+    offset = candidates - centroid[:, None, :]
+    angle = np.where(valid, np.arctan2(offset[..., 1], offset[..., 0]), np.inf)
+    order = np.argsort(angle, axis=1)
+    ordered = np.take_along_axis(candidates, order[..., None], axis=1)
+    ordered_valid = np.take_along_axis(valid, order, axis=1)
+    # Invalid slots repeat the first vertex so they add no area.
+    ordered = np.where(ordered_valid[..., None], ordered, ordered[:, :1, :])
+    nxt = np.roll(ordered, -1, axis=1)
+    area = 0.5 * np.abs(
+        (ordered[..., 0] * nxt[..., 1] - ordered[..., 1] * nxt[..., 0]).sum(axis=1))
+    return np.where(count >= 3, area, 0.0)
+
+
+def box_iou_matrix(params_a, params_b, mode='3d'):
+    """Computes the full IoU matrix between two sets of boxes.
+
+    Args:
+        params_a: (A, 7) box parameters as returned by box_arrays().
+        params_b: (B, 7) box parameters.
+        mode: '3d' for volume IoU or 'bev' for bird's-eye-view IoU.
+
+    Returns:
+        (A, B) float64 IoU matrix.
+    """
+    params_a = np.asarray(params_a, dtype=np.float64).reshape(-1, 7)
+    params_b = np.asarray(params_b, dtype=np.float64).reshape(-1, 7)
+    iou = np.zeros((len(params_a), len(params_b)))
+    if iou.size == 0:
+        return iou
+
+    # Only pairs whose bounding circles overlap can intersect.
+    radius_a = 0.5 * np.hypot(params_a[:, 4], params_a[:, 5])
+    radius_b = 0.5 * np.hypot(params_b[:, 4], params_b[:, 5])
+    distance = np.hypot(params_a[:, None, 0] - params_b[None, :, 0],
+                        params_a[:, None, 1] - params_b[None, :, 1])
+    ia, ib = np.nonzero(distance < radius_a[:, None] + radius_b[None, :])
+    if len(ia) == 0:
+        return iou
+
+    corners_a, corners_b = bev_corners(params_a), bev_corners(params_b)
+    inter = polygon_intersection_area(corners_a[ia], corners_b[ib])
+    area_a = params_a[:, 4] * params_a[:, 5]
+    area_b = params_b[:, 4] * params_b[:, 5]
+    if mode == 'bev':
+        union = area_a[ia] + area_b[ib] - inter
+    else:
+        # z is the bottom of the box and h its height
+        bottom = np.maximum(params_a[ia, 2], params_b[ib, 2])
+        top = np.minimum(params_a[ia, 2] + params_a[ia, 3],
+                         params_b[ib, 2] + params_b[ib, 3])
+        inter = inter * np.clip(top - bottom, 0, None)
+        union = area_a[ia] * params_a[ia, 3] + area_b[ib] * params_b[ib, 3] - inter
+    iou[ia, ib] = np.where(union > 0, inter / np.maximum(union, 1e-12), 0.0)
+    return iou
+
+
+def match_boxes(gt_params, gt_categories, pred_params, pred_categories,
+                pred_scores, mode='3d', thresholds=None):
+    """Greedily matches predictions to ground truth in order of score.
+
+    Args:
+        gt_params: (G, 7) ground truth box parameters.
+        gt_categories: G category names.
+        pred_params: (P, 7) predicted box parameters.
+        pred_categories: P category names.
+        pred_scores: (P,) prediction confidences.
+        mode: IoU mode, see box_iou_matrix().
+        thresholds: Dict of per-category IoU thresholds (default:
+            IOU_THRESHOLDS).
+
+    Returns:
+        Tuple (gt_match, pred_match, iou). gt_match and pred_match hold the
+        index of the matched box on the other side, -1 for misses and false
+        positives.
+    """
+    thresholds = IOU_THRESHOLDS if thresholds is None else thresholds
+    iou = box_iou_matrix(gt_params, pred_params, mode)
+    gt_categories = np.asarray(gt_categories)
+    pred_categories = np.asarray(pred_categories)
+    # A prediction can only match ground truth of its own class.
+    iou_same = np.where(gt_categories[:, None] == pred_categories[None, :],
+                        iou, 0.0)
+    required = np.array([thresholds.get(c, DEFAULT_IOU) for c in pred_categories])
+
+    gt_match = np.full(len(gt_categories), -1, dtype=np.int64)
+    pred_match = np.full(len(pred_categories), -1, dtype=np.int64)
+    for p in np.argsort(-np.asarray(pred_scores), kind='stable'):
+        if len(gt_match) == 0:
+            break
+        candidates = np.where(gt_match < 0, iou_same[:, p], 0.0)
+        g = int(np.argmax(candidates))
+        if candidates[g] >= required[p] and candidates[g] > 0:
+            gt_match[g] = p
+            pred_match[p] = g
+    return gt_match, pred_match, iou
+
+
+def average_precision(scores, true_positive, num_gt, recall_points=40):
+    """Interpolated average precision (KITTI R40 by default).
+
+    Args:
+        scores: (P,) confidences of all predictions of a class.
+        true_positive: (P,) bool flags of the predictions.
+        num_gt: Number of ground truth boxes of the class.
+        recall_points: Number of equally spaced recall positions.
+    """
+    if num_gt == 0:
+        return float('nan')
+    if len(scores) == 0:
+        return 0.0
+    order = np.argsort(-np.asarray(scores), kind='stable')
+    tp = np.cumsum(np.asarray(true_positive)[order])
+    fp = np.cumsum(~np.asarray(true_positive)[order])
+    recall = tp / num_gt
+    precision = tp / np.maximum(tp + fp, 1)
+    # Make precision monotonically decreasing from the right.
+    precision = np.maximum.accumulate(precision[::-1])[::-1]
+    levels = np.linspace(1.0 / recall_points, 1.0, recall_points)
+    idx = np.searchsorted(recall, levels, side='left')
+    values = np.where(idx < len(precision),
+                      precision[np.minimum(idx, len(precision) - 1)], 0.0)
+    return float(values.mean())
@@ -0,0 +1,126 @@
+import numpy as np
+
+# Colors handed out to label categories in order of first appearance.
+DEFAULT_CATEGORY_COLORS = [[1, 0, 0], [0, 1, 0], [0, 0, 1], [1, 1, 0],
+                           [1, 0, 1], [0, 1, 1]]
+
+
+def load_bounding_boxes(txt_path):
+    """Reads a KITTI label file.
+
+    Returns:
+        List of (x, y, z, h, w, l, rotation_y, category) tuples in the LiDAR
+        frame, with z at the bottom of the box.
+    """
+    boxes = []
+    with open(txt_path, 'r') as file:
+        for line in file:
+            data = line.split()
+            category = data[0]  # Get the category of the object
+            h, w, l = map(float, data[8:11])
+            y, z, x = map(float, data[11:14])
+            rotation_y = float(data[14])
+            boxes.append((x, -y, -z, h, w, l, rotation_y, category))
+    return boxes
+
+
+def load_predictions(txt_path):
+    """Reads a KITTI detection result file (label columns plus a score).
+
+    Returns:
+        Tuple of the box list in the load_bounding_boxes() format and a (B,)
+        float32 array of confidences. Files without a score column get a
+        confidence of 1.
+    """
+    boxes = load_bounding_boxes(txt_path)
+    scores = []
+    with open(txt_path, 'r') as file:
+        for line in file:
+            data = line.split()
+            scores.append(float(data[15]) if len(data) > 15 else 1.0)
+    return boxes, np.array(scores, dtype=np.float32)
+
+
+def load_label_attributes(txt_path):
+    """Reads the truncation and occlusion columns of a KITTI label file.
+
+    Returns:
+        Tuple of (B,) float32 truncation and (B,) int8 occlusion arrays, in
+        the same order as the boxes of load_bounding_boxes().
+    """
+    truncation, occlusion = [], []
+    with open(txt_path, 'r') as file:
+        for line in file:
+            data = line.split()
+            truncation.append(float(data[1]))
+            occlusion.append(int(float(data[2])))
+    return (np.array(truncation, dtype=np.float32),
+            np.array(occlusion, dtype=np.int8))
+
+
+def box_arrays(boxes):
+    """Splits box tuples into a (B, 7) float32 parameter array and categories.
+
+    The parameter columns are x, y, z, h, w, l, rotation_y, as returned by
+    load_bounding_boxes().
+    """
+    params = np.array([box[:7] for box in boxes], dtype=np.float32).reshape(-1, 7)
+    categories = [box[7] for box in boxes]
+    return params, categories
+
+
+def box_frames(params):
+    """Computes center, rotation and extent of every box.
+
+    This matches create_bounding_box_3d() in vis_3d_app.py: the center is lifted
+    by h / 2, the box is rotated by -rotation_y around z and the extent is
+    (w, l, h).
+
+    Args:
+        params: (B, 7) array from box_arrays().
+
+    Returns:
+        Tuple of (B, 3) centers, (B, 3, 3) rotations and (B, 3) extents.
+    """
+    params = np.asarray(params, dtype=np.float64).reshape(-1, 7)
+    x, y, z, h, w, l, ry = params.T
+    centers = np.stack([x, y, z + h / 2], axis=1)
+    c, s = np.cos(-ry), np.sin(-ry)
+    rotations = np.zeros((len(params), 3, 3))
+    rotations[:, 0, 0] = c
+    rotations[:, 0, 1] = -s
+    rotations[:, 1, 0] = s
+    rotations[:, 1, 1] = c
+    rotations[:, 2, 2] = 1
+    extents = np.stack([w, l, h], axis=1)
+    return centers, rotations, extents
+
+
+def points_in_boxes(points, params):
+    """Finds the box that contains each point.
+
+    Every box is tested against the points in its axis aligned bounds only,
+    so the cost is one vectorized pass per box over a small candidate set.
+    Where boxes overlap the later box wins, like the per-box coloring loop in
+    the app.
+
+    Args:
+        points: (N, 3+) array of points.
+        params: (B, 7) array from box_arrays().
+
+    Returns:
+        (N,) int16 array with the box index of every point, -1 for points
+        outside all boxes.
+    """
+    xyz = np.asarray(points)[:, :3]
+    box_ids = np.full(len(xyz), -1, dtype=np.int16)
+    centers, rotations, extents = box_frames(params)
+    for i in range(len(centers)):
+        half = 0.5 * extents[i]
+        reach = np.abs(rotations[i]) @ half
+        candidates = np.flatnonzero(
+            (np.abs(xyz - centers[i]) <= reach).all(axis=1))
+        local = (xyz[candidates] - centers[i]) @ rotations[i]
+        inside = (np.abs(local) <= half).all(axis=1)
+        box_ids[candidates[inside]] = i
+    return box_ids
@@ -1,5 +1,7 @@
 from colorsys import rgb_to_yiq
 
+import numpy as np
+
 
 class LabelLUT:
     """The class to manage look-up table for assigning colors to labels."""
@@ -29,6 +31,13 @@ class LabelLUT:
               [0.5, 0.5, 0.5], [0.625, 0.625, 0.625], [0.75, 0.75, 0.75],
               [0.875, 0.875, 0.875]]
 
+    # Color of label values that are not in the table
+    UnknownColor = [0.5, 0.5, 0.5]
+
+    # Dark/light partitions of Colors, keyed by class and mode. Emptied by
+    # set_colors().
+    _mode_colors = {}
+
     def __init__(self, label_to_names=None):
         """
         Args:
@@ -36,6 +45,7 @@ class LabelLUT:
                 labels (int) to class names (str).
         """
         self._next_color = 0
+        self._table = None
         self.labels = {}
         if label_to_names is not None:
             for val in sorted(label_to_names.keys()):
@@ -64,6 +74,56 @@ class LabelLUT:
                 color = self.Colors[self._next_color]
                 self._next_color += 1
         self.labels[value] = self.Label(name, value, color)
+        self._table = None
+
+    def color_table(self):
+        """Returns the dense color table of the labels.
+
+        Row v holds the color of label value v, values without a label get
+        UnknownColor. The last row is used for values outside the table. The
+        table is only rebuilt after add_label() changed the labels.
+
+        Returns:
+            A (max label + 2, 3) float32 array.
+        """
+        if self._table is None:
+            values = [v for v in self.labels if v >= 0]
+            size = (max(values) + 1 if values else 0) + 1
+            table = np.tile(np.asarray(self.UnknownColor, dtype=np.float32), (size, 1))
+            for value in values:
+                table[value] = self.labels[value].color
+            self._table = table
+        return self._table
+
+    def colorize(self, labels):
+        """Maps an array of integer labels to colors with one table lookup.
+
+        Args:
+            labels: Array of label values, e.g. the semantic labels of all
+                points of a frame.
+
+        Returns:
+            A float32 array of shape labels.shape + (3,).
+        """
+        table = self.color_table()
+        labels = np.asarray(labels)
+        unknown = len(table) - 1
+        # Negative and too large values map to the unknown row
+        index = np.where((labels >= 0) & (labels < unknown), labels, unknown)
+        return table[index]
+
+    @classmethod
+    def set_colors(cls, colors):
+        """Replaces the colors of the lookup table.
+
+        Colors must only be changed through here, so the partitions kept by
+        get_colors() are rebuilt.
+
+        Args:
+            colors: List of (R, G, B) colors.
+        """
+        cls.Colors = [list(color) for color in colors]
+        cls._mode_colors = {}
 
     @classmethod
     def get_colors(self, name='default', mode=None):
@@ -82,11 +142,21 @@ class LabelLUT:
         """
         if mode is None:
             return self.Colors
-        dark_colors = list(
-            filter(lambda col: rgb_to_yiq(*col)[0] < 0.5, self.Colors))
-        light_colors = list(
-            filter(lambda col: rgb_to_yiq(*col)[0] >= 0.5, self.Colors))
-        if mode == 'lightbg':
-            return dark_colors + light_colors
-        if mode == 'darkbg':
-            return light_colors + dark_colors
+        # The partitions only depend on Colors, so they are computed once per
+        # set_colors()
+        key = (self, mode)
+        colors = self._mode_colors.get(key)
+        if colors is None:
+            dark_colors = list(
+                filter(lambda col: rgb_to_yiq(*col)[0] < 0.5, self.Colors))
+            light_colors = list(
+                filter(lambda col: rgb_to_yiq(*col)[0] >= 0.5, self.Colors))
+            if mode == 'lightbg':
+                colors = dark_colors + light_colors
+            elif mode == 'darkbg':
+                colors = light_colors + dark_colors
+            else:
+                return None
+            self._mode_colors[key] = colors
+        # Copies, editing the result must not change the cached partition
+        return [list(color) for color in colors]
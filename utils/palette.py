@@ -0,0 +1,95 @@
+import numpy as np
+
+
+class PaletteColors:
+    """Point colors stored as palette indices and a small RGB palette.
+
+    Every point holds a uint8 index (uint16 once the palette grows past 256
+    entries) into a float palette. Recoloring everything that uses one
+    palette entry is O(palette size); full per-point colors only exist
+    transiently when expand() is called for upload.
+    """
+
+    def __init__(self, num_points, palette=None, indices=None):
+        """
+        Args:
+            num_points: Number of points.
+            palette: Optional (K, 3) RGB colors in [0, 1]. Defaults to grey.
+            indices: Optional (N,) palette index of every point. Defaults to 0.
+        """
+        if palette is None:
+            palette = [[0.5, 0.5, 0.5]]
+        self.palette = np.array(palette, dtype=np.float32).reshape(-1, 3)
+        if indices is None:
+            indices = np.zeros(num_points, dtype=self._index_dtype(len(self.palette)))
+        self.indices = np.asarray(indices).astype(
+            self._index_dtype(len(self.palette)), copy=False)
+        # (source start, source end, destination start, weight, color) of
+        # palette ranges derived by blend(), kept in sync by set_color()
+        self._blends = []
+
+    @staticmethod
+    def _index_dtype(palette_size):
+        return np.uint8 if palette_size <= 256 else np.uint16
+
+    def __len__(self):
+        return len(self.indices)
+
+    def extend(self, colors):
+        """Appends colors to the palette.
+
+        Returns:
+            Palette index of the first appended color.
+        """
+        offset = len(self.palette)
+        colors = np.asarray(colors, dtype=np.float32).reshape(-1, 3)
+        self.palette = np.concatenate([self.palette, colors])
+        dtype = self._index_dtype(len(self.palette))
+        if dtype != self.indices.dtype:
+            self.indices = self.indices.astype(dtype)
+        return offset
+
+    def assign(self, mask, palette_indices):
+        """Points palette_indices at the masked points.
+
+        Args:
+            mask: (N,) bool mask or integer indices of points.
+            palette_indices: Palette index or array of indices, one per
+                selected point.
+        """
+        self.indices[mask] = palette_indices
+
+    def set_color(self, index, color):
+        """Changes one palette entry, and any entry blended from it."""
+        self.palette[index] = color
+        for start, end, dest, weight, target in self._blends:
+            if start <= index < end:
+                self.palette[dest + index - start] = \
+                    (1 - weight) * self.palette[index] + weight * target
+
+    def blend(self, mask, color, weight):
+        """Blends the masked points towards color, e.g. to dim them.
+
+        The palette is duplicated once with the blended colors and the masked
+        points are moved to the copy.
+        """
+        end = len(self.palette)
+        color = np.asarray(color, dtype=np.float32)
+        offset = self.extend((1 - weight) * self.palette + weight * color)
+        self._blends.append((0, end, offset, weight, color))
+        self.indices[mask] += offset
+
+    def expand(self, mask=None, dtype=np.float32):
+        """Returns per-point RGB colors for upload.
+
+        Args:
+            mask: Optional bool mask or indices of the points to expand.
+            dtype: np.float32 / np.float64 for colors in [0, 1] or np.uint8
+                for 0..255.
+        """
+        indices = self.indices if mask is None else self.indices[mask]
+        if dtype == np.uint8:
+            palette = np.round(np.clip(self.palette, 0, 1) * 255).astype(np.uint8)
+        else:
+            palette = self.palette.astype(dtype, copy=False)
+        return palette[indices]
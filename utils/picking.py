@@ -0,0 +1,67 @@
+import threading
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+
+class PointPicker:
+    """Nearest point lookup for picking, backed by a lazily built KD-tree.
+
+    The tree is built in a background thread started by build_async(), or
+    by the first query if it was not called. Until it is ready, queries fall
+    back to a single vectorized distance pass, so a pick never blocks on the
+    build.
+    """
+
+    def __init__(self, points):
+        """
+        Args:
+            points: (N, 3+) array of the points that can be picked.
+        """
+        self._points = np.ascontiguousarray(np.asarray(points)[:, :3])
+        self._tree = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self):
+        return self._tree is not None
+
+    def build_async(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._build,
+                                                daemon=True)
+                self._thread.start()
+
+    def _build(self):
+        self._tree = cKDTree(self._points)
+
+    def query(self, xyz, max_distance=np.inf):
+        """Finds the point closest to xyz.
+
+        Args:
+            xyz: (3,) query position, e.g. an unprojected mouse position.
+            max_distance: Points further away than this are not picked.
+
+        Returns:
+            Tuple (index, distance). index is None if no point is within
+            max_distance.
+        """
+        self.build_async()
+        xyz = np.asarray(xyz, dtype=np.float64)
+        tree = self._tree
+        if tree is not None:
+            distance, index = tree.query(xyz, distance_upper_bound=max_distance)
+            if np.isinf(distance):
+                return None, distance
+            return int(index), float(distance)
+        if len(self._points) == 0:
+            return None, np.inf
+        distances = np.einsum('ij,ij->i', self._points - xyz,
+                              self._points - xyz)
+        index = int(np.argmin(distances))
+        distance = float(np.sqrt(distances[index]))
+        if distance > max_distance:
+            return None, distance
+        return index, distance
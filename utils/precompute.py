@@ -0,0 +1,265 @@
+"""Per-frame precomputation in worker processes.
+
+The heavy per-frame arrays (point-in-box ids, ground mask, normals and the
+range field the depth colormap is built from) are computed by a pool of
+worker processes, so they neither block the GUI thread nor hold its GIL.
+A worker writes all arrays of a frame into one multiprocessing.shared_memory
+block and only returns the block name and the array layout. The GUI process
+maps the block and wraps its arrays around the mapping without copying.
+"""
+
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from .ground import segment_ground
+from .kitti import box_arrays, load_bounding_boxes, points_in_boxes
+from .rangeimage import RangeImage
+
+TASKS = ('box_ids', 'ground', 'normals', 'range')
+NORMAL_NEIGHBORS = 30  # as Open3D's estimate_normals()
+NORMAL_CHUNK = 65536
+# Clouds of which a range image shows at least this fraction of the points
+# are single scans and get their normals from the image
+SCAN_COVERAGE = 0.5
+ALIGNMENT = 64
+
+
+def load_points(path):
+    return np.fromfile(path, dtype=np.float32).reshape(-1, 4)
+
+
+def estimate_normals(points, k=NORMAL_NEIGHBORS):
+    """Estimates unit normals from the k nearest neighbors of every point.
+
+    The normal is the direction of least variance of the neighborhood,
+    oriented towards the sensor at the origin.
+
+    Returns:
+        (N, 3) float32 array.
+    """
+    xyz = np.asarray(points, dtype=np.float64)[:, :3]
+    normals = np.zeros((len(xyz), 3), dtype=np.float32)
+    if len(xyz) < 3:
+        return normals
+    k = min(k, len(xyz))
+    tree = cKDTree(xyz)
+    for start in range(0, len(xyz), NORMAL_CHUNK):
+        # Chunked so the (chunk, k, 3) neighborhoods stay small
+        chunk = xyz[start:start + NORMAL_CHUNK]
+        _, neighbors = tree.query(chunk, k)
+        local = xyz[neighbors]
+        local -= local.mean(axis=1, keepdims=True)
+        covariance = np.einsum('nki,nkj->nij', local, local)
+        _, vectors = np.linalg.eigh(covariance)
+        normal = vectors[:, :, 0]
+        flip = np.einsum('ij,ij->i', normal, chunk) > 0
+        normal[flip] *= -1
+        normals[start:start + len(chunk)] = normal
+    return normals
+
+
+def compute_frame(bin_path, label_path=None, tasks=TASKS, reader=load_points):
+    """Computes the arrays of a frame in the current process.
+
+    Returns:
+        Dict of name to array, 'points' and the requested tasks.
+    """
+    points = reader(bin_path)
+    arrays = {'points': points}
+    if 'box_ids' in tasks and label_path is not None:
+        arrays['box_ids'] = points_in_boxes(points, box_arrays(load_bounding_boxes(label_path))[0])
+    if 'ground' in tasks:
+        arrays['ground'] = segment_ground(points)[0]
+    if 'normals' in tasks:
+        # Image neighbors of a scan instead of a KNN search, about 25 times
+        # faster
+        range_image = RangeImage(points)
+        if range_image.coverage >= SCAN_COVERAGE:
+            arrays['normals'] = range_image.normals()
+        else:
+            arrays['normals'] = estimate_normals(points)
+    if 'range' in tasks:
+        xyz = points[:, :3]
+        arrays['range'] = np.sqrt(np.einsum('ij,ij->i', xyz, xyz)).astype(np.float32)
+    return arrays
+
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _compute_shared(job):
+    """Worker side: computes a frame and writes it to a new shared block.
+
+    Returns:
+        (block name, [(array name, dtype, shape, offset), ...]).
+    """
+    arrays = compute_frame(*job)
+    layout, size = [], 0
+    for name, array in arrays.items():
+        offset = _align(size)
+        layout.append((name, array.dtype.str, array.shape, offset))
+        size = offset + array.nbytes
+    block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    try:
+        for name, dtype, shape, offset in layout:
+            np.ndarray(shape, dtype, buffer=block.buf, offset=offset)[...] = arrays[name]
+    except BaseException:
+        block.close()
+        block.unlink()
+        raise
+    block.close()
+    return block.name, layout
+
+
+class _Segment:
+    """A mapped shared block, exposed to numpy as a flat byte array.
+
+    Arrays sliced from it keep the segment as their base, so the mapping
+    stays open exactly as long as any of them is alive.
+    """
+
+    def __init__(self, name):
+        self._block = shared_memory.SharedMemory(name=name)
+        # The name is not needed any more, the memory is freed with the last
+        # mapping
+        self._block.unlink()
+        self._bytes = np.frombuffer(self._block.buf, dtype=np.uint8)
+        self.__array_interface__ = {
+            'shape': (self._block.size,),
+            'typestr': '|u1',
+            'data': (self._bytes.ctypes.data, False),
+            'version': 3,
+        }
+
+    def __del__(self):
+        # The view first, a block with exported buffers cannot be closed
+        self._bytes = None
+        self._block.close()
+
+
+class SharedFrame:
+    """The arrays of a frame computed by a worker, mapped without a copy.
+
+    The arrays are read-only views into the shared block.
+    """
+
+    def __init__(self, path, label_path, name, layout):
+        self.path = path
+        self.label_path = label_path
+        raw = np.asarray(_Segment(name))
+        self.arrays = {}
+        for array_name, dtype, shape, offset in layout:
+            dtype = np.dtype(dtype)
+            count = int(np.prod(shape))
+            array = raw[offset:offset + count * dtype.itemsize].view(dtype).reshape(shape)
+            array.flags.writeable = False
+            self.arrays[array_name] = array
+
+    def __contains__(self, name):
+        return name in self.arrays
+
+    def __getitem__(self, name):
+        return self.arrays[name]
+
+
+class PrecomputePool:
+    """Computes frames ahead of time in worker processes.
+
+    request() never blocks: at most max_pending frames are queued or being
+    computed, further requests are dropped until a slot frees up.
+    """
+
+    def __init__(self, workers=2, max_pending=4, tasks=TASKS, reader=load_points):
+        """
+        Args:
+            workers: Number of worker processes.
+            max_pending: Maximum number of frames requested but not yet
+                collected with result().
+            tasks: Arrays to compute, a subset of TASKS.
+            reader: Picklable function reading the (N, 4) points of a path.
+        """
+        self.workers = workers
+        self.max_pending = max_pending
+        self.tasks = tuple(tasks)
+        self.reader = reader
+        self._pool = None
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def __contains__(self, path):
+        return path in self._futures
+
+    def _executor(self):
+        if self._pool is None:
+            # Started before the workers so they share the tracker of the
+            # blocks they create, and spawned since the GUI process runs
+            # threads that a fork would copy in an unknown state
+            resource_tracker.ensure_running()
+            self._pool = ProcessPoolExecutor(self.workers,
+                                             multiprocessing.get_context('spawn'))
+        return self._pool
+
+    def request(self, path, label_path=None):
+        """Queues a frame, returns False if it is already queued or the queue is full."""
+        with self._lock:
+            if path in self._futures or len(self._futures) >= self.max_pending:
+                return False
+            self._futures[path] = (label_path, self._executor().submit(
+                _compute_shared, (path, label_path, self.tasks, self.reader)))
+        return True
+
+    def result(self, path, wait=True):
+        """Collects a requested frame.
+
+        Args:
+            path: Point file passed to request().
+            wait: Wait for a frame that is still being computed.
+
+        Returns:
+            SharedFrame, or None if the frame was not requested, is not done
+            and wait is False, or failed.
+        """
+        with self._lock:
+            entry = self._futures.get(path)
+            if entry is None or (not wait and not entry[1].done()):
+                return None
+            del self._futures[path]
+        label_path, future = entry
+        try:
+            name, layout = future.result()
+        except Exception as e:
+            print("[WARNING] Precomputing", path, "failed:", e)
+            return None
+        return SharedFrame(path, label_path, name, layout)
+
+    def finished(self):
+        """Collects every requested frame that is done, without waiting.
+
+        Returns:
+            List of SharedFrame.
+        """
+        with self._lock:
+            paths = [path for path, (_, future) in self._futures.items() if future.done()]
+        frames = (self.result(path, wait=False) for path in paths)
+        return [frame for frame in frames if frame is not None]
+
+    def close(self):
+        """Stops the workers and frees the blocks that were never collected."""
+        with self._lock:
+            futures = list(self._futures.values())
+            self._futures.clear()
+        for _, future in futures:
+            future.cancel()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        for _, future in futures:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                name, _ = future.result()
+                _Segment(name)
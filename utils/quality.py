@@ -0,0 +1,143 @@
+"""Adaptive level of detail for an interactive point cloud view.
+
+While the camera moves, only a subset of the points is drawn, with smaller
+points, and the full cloud comes back once the camera rests. The subset is
+a prefix of a random permutation computed once per cloud, so switching
+between both levels is a slice, never a resampling, and a larger budget
+only adds points to the ones already shown. The size of the subset follows
+the measured frame time: it shrinks when moving was slower than the target
+frame time and grows again when it was faster.
+"""
+
+import time
+
+import numpy as np
+
+TARGET_FRAME_MS = 33.0
+# Seconds without camera motion after which the full cloud is shown
+IDLE_DELAY = 0.3
+INITIAL_BUDGET = 1000000
+MIN_BUDGET = 100000
+MOVING_POINT_SIZE_SCALE = 0.5
+# Weight of a new frame time in the running average
+SMOOTHING = 0.3
+# Largest change of the budget from one camera motion to the next
+MAX_BUDGET_STEP = 2.0
+
+
+class AdaptiveQuality:
+    """Decides which points are drawn, driven by the camera of every tick.
+
+    Clouds with no more points than the budget are always drawn in full.
+    """
+
+    def __init__(self, num_points=0, target_ms=TARGET_FRAME_MS, idle_delay=IDLE_DELAY,
+                 budget=INITIAL_BUDGET, min_budget=MIN_BUDGET, seed=0):
+        """
+        Args:
+            num_points: Number of points of the cloud, see reset().
+            target_ms: Frame time to keep while the camera moves.
+            idle_delay: Seconds without motion before the full cloud is
+                drawn again.
+            budget: Number of points drawn while moving, until a frame time
+                has been measured.
+            min_budget: Lower bound of the budget.
+            seed: Seed of the permutation.
+        """
+        self.target_ms = target_ms
+        self.idle_delay = idle_delay
+        self.budget = int(budget)
+        self.min_budget = int(min_budget)
+        self.frame_ms = None
+        self._rng = np.random.default_rng(seed)
+        self.order = np.zeros(0, dtype=np.int64)
+        self.moving = False
+        self._last_view = None
+        self._last_frame = None
+        self._frames = 0
+        self.reset(num_points)
+
+    def __len__(self):
+        return len(self.order)
+
+    def reset(self, num_points):
+        """Prepares for a new cloud, the budget learned so far is kept."""
+        self.order = self._rng.permutation(num_points)
+        self.moving = False
+        self._last_view = None
+        self._last_frame = None
+
+    @property
+    def decimated(self):
+        """Whether only a subset of the points is drawn right now."""
+        return self.moving and len(self.order) > self.budget
+
+    def update(self, view, now=None):
+        """Feeds the camera of a tick.
+
+        Args:
+            view: 4x4 view matrix of the camera.
+            now: Time in seconds, time.monotonic() if None.
+
+        Returns:
+            True if the points to draw changed, i.e. the camera started
+            moving or came to rest.
+        """
+        now = time.monotonic() if now is None else now
+        view = np.array(view, dtype=np.float64)
+        moved = self._last_view is not None and not np.array_equal(view, self._last_view)
+        self._last_view = view
+        if moved:
+            # A moving camera redraws every tick, the time between two of
+            # them is the frame time of the subset. The first one also
+            # includes uploading the subset.
+            if self.decimated and self._frames > 0:
+                self._measure((now - self._last_frame) * 1000.0)
+            self._last_frame = now
+            if not self.moving:
+                self.moving = True
+                self._frames = 0
+                return self.decimated
+            self._frames += 1
+            return False
+        if self.moving and now - self._last_frame >= self.idle_delay:
+            was_decimated = self.decimated
+            self.moving = False
+            self._adapt_budget()
+            return was_decimated
+        return False
+
+    def _measure(self, frame_ms):
+        if self.frame_ms is None:
+            self.frame_ms = frame_ms
+        else:
+            self.frame_ms += SMOOTHING * (frame_ms - self.frame_ms)
+
+    def _adapt_budget(self):
+        # The draw time is about proportional to the number of points
+        if self.frame_ms is None or self.frame_ms <= 0:
+            return
+        scale = np.clip(self.target_ms / self.frame_ms, 1.0 / MAX_BUDGET_STEP, MAX_BUDGET_STEP)
+        self.budget = max(self.min_budget, int(self.budget * scale))
+        self.frame_ms = None
+
+    def subset(self, mask=None):
+        """Returns the indices of the points to draw while decimated.
+
+        Args:
+            mask: Optional (N,) bool mask of the points that would be drawn
+                in full, e.g. by a distance filter.
+
+        Returns:
+            (M,) int64 indices, in permutation order.
+        """
+        indices = self.order[:self.budget]
+        if mask is not None:
+            indices = indices[mask[indices]]
+        return indices
+
+    def point_size(self, size):
+        """Returns the point size to draw with."""
+        if not self.decimated:
+            return size
+        return max(1, int(round(size * MOVING_POINT_SIZE_SCALE)))
@@ -0,0 +1,158 @@
+import numpy as np
+
+from .colormap import Colormap
+
+# Vertical field of view of the Velodyne HDL-64E of KITTI, in degrees
+HDL64_FOV_UP = 3.0
+HDL64_FOV_DOWN = -25.0
+HDL64_HEIGHT = 64
+DEFAULT_WIDTH = 2048
+
+
+class RangeImage:
+    """A scan in spherical projection, one pixel per laser and azimuth step.
+
+    Rows are the elevation angles from fov_up (top) to fov_down, columns the
+    azimuth from behind on the left through forward in the middle. A pixel
+    holds the nearest point that falls into it. The point of every pixel and
+    the pixel of every point are kept, so per-pixel results map back to the
+    points and the image neighbors of a point replace a KNN search.
+    """
+
+    def __init__(self, points, height=HDL64_HEIGHT, width=DEFAULT_WIDTH,
+                 fov_up=HDL64_FOV_UP, fov_down=HDL64_FOV_DOWN):
+        """Projects the points in one vectorized pass.
+
+        Args:
+            points: (N, 3) or (N, 4) array of x, y, z (and intensity) in the
+                sensor frame.
+            height: Number of rows, the lasers of the sensor.
+            width: Number of columns.
+            fov_up: Elevation of the top row in degrees.
+            fov_down: Elevation of the bottom row in degrees.
+        """
+        points = np.asarray(points)
+        self.shape = (height, width)
+        self.fov_up, self.fov_down = fov_up, fov_down
+        xyz = points[:, :3].astype(np.float32)
+        depth = np.sqrt(np.einsum('ij,ij->i', xyz, xyz))
+        yaw = -np.arctan2(xyz[:, 1], xyz[:, 0])
+        pitch = np.arcsin(np.clip(xyz[:, 2] / np.maximum(depth, 1e-6), -1.0, 1.0))
+
+        up, down = np.radians(fov_up), np.radians(fov_down)
+        cols = (0.5 * (yaw / np.pi + 1.0) * width).astype(np.int64)
+        rows = ((1.0 - (pitch - down) / (up - down)) * height).astype(np.int64)
+        np.clip(cols, 0, width - 1, out=cols)
+        np.clip(rows, 0, height - 1, out=rows)
+
+        # (N,) flat pixel of every point, for back-mapping
+        self.pixel = rows * width + cols
+        size = height * width
+        # The nearest point of each pixel wins
+        nearest = np.full(size, np.inf, dtype=np.float32)
+        np.minimum.at(nearest, self.pixel, depth)
+        winners = np.flatnonzero(depth == nearest[self.pixel])
+        index = np.full(size, -1, dtype=np.int64)
+        index[self.pixel[winners]] = winners
+        # (H, W) index of the point shown in every pixel, -1 where empty
+        self.index = index.reshape(self.shape)
+        self.mask = self.index >= 0
+        self.range = np.where(np.isinf(nearest), 0, nearest).astype(np.float32).reshape(self.shape)
+        intensity = np.zeros(size, dtype=np.float32)
+        if points.shape[1] > 3:
+            intensity[self.mask.reshape(-1)] = points[index[index >= 0], 3]
+        self.intensity = intensity.reshape(self.shape)
+        self.xyz = np.zeros(self.shape + (3,), dtype=np.float32)
+        self.xyz[self.mask] = xyz[self.index[self.mask]]
+
+    def __len__(self):
+        return len(self.pixel)
+
+    @property
+    def coverage(self):
+        """Fraction of the points that are shown in a pixel.
+
+        A single scan projected at the sensor's resolution covers most of
+        its points, an aggregated or merged cloud only a small part.
+        """
+        return float(self.mask.sum()) / max(len(self.pixel), 1)
+
+    def back_map(self, image):
+        """Returns the per-point values of a per-pixel (H, W, ...) array.
+
+        Points hidden behind a nearer point of the same pixel get its value.
+        """
+        image = np.asarray(image)
+        return image.reshape((-1,) + image.shape[2:])[self.pixel]
+
+    def pixel_normals(self, smooth=(1, 2)):
+        """Estimates a unit normal per pixel from its image neighbors.
+
+        The normal is the cross product of the differences to the pixels
+        left/right and above/below, taken from the nearer side when one of
+        them is empty, averaged over a small window of pixels. It is
+        oriented towards the sensor.
+
+        Args:
+            smooth: Half size (rows, columns) of the averaging window.
+
+        Returns:
+            (H, W, 3) float32 array, zero where no normal could be found.
+        """
+        def difference(axis):
+            forward = np.roll(self.xyz, -1, axis=axis) - self.xyz
+            backward = self.xyz - np.roll(self.xyz, 1, axis=axis)
+            valid_forward = self.mask & np.roll(self.mask, -1, axis=axis)
+            valid_backward = self.mask & np.roll(self.mask, 1, axis=axis)
+            if axis == 0:
+                # Rows do not wrap around, columns do (full 360 degree scan)
+                valid_forward[-1] = False
+                valid_backward[0] = False
+            # The shorter of both differences, the other may jump to the
+            # background
+            use_forward = valid_forward & (~valid_backward | (
+                np.einsum('ijk,ijk->ij', forward, forward) <= np.einsum('ijk,ijk->ij', backward, backward)))
+            return np.where(use_forward[..., None], forward, backward), valid_forward | valid_backward
+
+        horizontal, valid_h = difference(1)
+        vertical, valid_v = difference(0)
+        normals = np.cross(horizontal, vertical)
+        length = np.linalg.norm(normals, axis=2)
+        valid = valid_h & valid_v & (length > 1e-9)
+        normals[valid] /= length[valid, None]
+        normals[~valid] = 0
+        flip = np.einsum('ijk,ijk->ij', normals, self.xyz) > 0
+        normals[flip] *= -1
+
+        # All normals face the sensor, so neighbors can simply be summed
+        rows, cols = smooth
+        summed = np.zeros_like(normals)
+        for dr in range(-rows, rows + 1):
+            shifted = np.roll(normals, dr, axis=0)
+            if dr > 0:
+                shifted[:dr] = 0
+            elif dr < 0:
+                shifted[dr:] = 0
+            for dc in range(-cols, cols + 1):
+                summed += np.roll(shifted, dc, axis=1)
+        length = np.linalg.norm(summed, axis=2)
+        valid = self.mask & (length > 1e-9)
+        summed[valid] /= length[valid, None]
+        summed[~valid] = 0
+        return summed.astype(np.float32)
+
+    def normals(self):
+        """Returns (N, 3) normals of the points, see pixel_normals()."""
+        return self.back_map(self.pixel_normals())
+
+    def image(self, max_range=80.0, colormap=None):
+        """Colors the ranges for display.
+
+        Returns:
+            (H, W, 3) uint8 image, empty pixels are black.
+        """
+        colormap = Colormap.make_rainbow() if colormap is None else colormap
+        lut = (colormap.calc_lut(256) * 255).astype(np.uint8)
+        image = lut[Colormap.lut_indices(self.range, 0.0, max_range)]
+        image[~self.mask] = 0
+        return image
@@ -0,0 +1,93 @@
+import numpy as np
+
+from .colormap import Colormap
+
+FIELDS = ("height", "range", "azimuth", "intensity")
+
+
+class ScalarFields:
+    """Per-point scalar fields of a frame, computed on first use and cached.
+
+    Switching the coloring between fields or colormaps only needs a table
+    lookup on the cached values.
+    """
+
+    def __init__(self, points, fields=None):
+        """
+        Args:
+            points: (N, 3) or (N, 4) array of x, y, z (and intensity).
+            fields: Dict of already computed (N,) fields by name.
+        """
+        self._points = points
+        self._fields = dict(fields) if fields else {}
+        self._ranges = {}
+
+    def __len__(self):
+        return len(self._points)
+
+    def get(self, name):
+        """Returns the (N,) float32 values of the field name."""
+        values = self._fields.get(name)
+        if values is None:
+            xyz = np.asarray(self._points)[:, :3]
+            if name == "height":
+                values = xyz[:, 2]
+            elif name == "range":
+                values = np.sqrt(np.einsum('ij,ij->i', xyz, xyz))
+            elif name == "azimuth":
+                values = np.degrees(np.arctan2(xyz[:, 1], xyz[:, 0]))
+            elif name == "intensity":
+                if np.asarray(self._points).shape[1] > 3:
+                    values = np.asarray(self._points)[:, 3]
+                else:
+                    values = np.zeros(len(xyz))
+            else:
+                raise ValueError(f"Unknown scalar field '{name}'")
+            values = np.ascontiguousarray(values, dtype=np.float32)
+            self._fields[name] = values
+        return values
+
+    def auto_range(self, name):
+        """Returns the (min, max) of the field, ignoring 1% outliers each side."""
+        value_range = self._ranges.get(name)
+        if value_range is None:
+            values = self.get(name)
+            if len(values) == 0:
+                value_range = (0.0, 1.0)
+            else:
+                low, high = np.percentile(values, [1, 99])
+                value_range = (float(low), float(high))
+            self._ranges[name] = value_range
+        return value_range
+
+    def _value_range(self, name, range_min, range_max):
+        auto_min, auto_max = self.auto_range(name)
+        range_min = auto_min if range_min is None else range_min
+        range_max = auto_max if range_max is None else range_max
+        return range_min, range_max
+
+    def indices(self, name, range_min=None, range_max=None, size=256):
+        """Quantizes a field to indices into a colormap table of size entries.
+
+        Returns:
+            (N,) uint8 array for tables of up to 256 entries.
+        """
+        return Colormap.lut_indices(self.get(name),
+                                    *self._value_range(name, range_min, range_max),
+                                    size)
+
+    def colorize(self, name, colormap, range_min=None, range_max=None, lut=None):
+        """Colors the points by a field.
+
+        Args:
+            name: One of FIELDS.
+            colormap: A utils.colormap.Colormap.
+            range_min: Value of the first color, automatic if None.
+            range_max: Value of the last color, automatic if None.
+            lut: Optional precomputed table of the colormap.
+
+        Returns:
+            (N, 3) float32 array of colors.
+        """
+        range_min, range_max = self._value_range(name, range_min, range_max)
+        return colormap.colorize(self.get(name), range_min, range_max, lut)
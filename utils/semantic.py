@@ -0,0 +1,102 @@
+import os
+
+import numpy as np
+
+# Class names of the SemanticKITTI label values
+SEMANTIC_KITTI_LABELS = {
+    0: 'unlabeled', 1: 'outlier', 10: 'car', 11: 'bicycle', 13: 'bus',
+    15: 'motorcycle', 16: 'on-rails', 18: 'truck', 20: 'other-vehicle',
+    30: 'person', 31: 'bicyclist', 32: 'motorcyclist', 40: 'road',
+    44: 'parking', 48: 'sidewalk', 49: 'other-ground', 50: 'building',
+    51: 'fence', 52: 'other-structure', 60: 'lane-marking', 70: 'vegetation',
+    71: 'trunk', 72: 'terrain', 80: 'pole', 81: 'traffic-sign',
+    99: 'other-object', 252: 'moving-car', 253: 'moving-bicyclist',
+    254: 'moving-person', 255: 'moving-motorcyclist', 256: 'moving-on-rails',
+    257: 'moving-bus', 258: 'moving-truck', 259: 'moving-other-vehicle',
+}
+
+EXTENSION = '.label'
+
+
+def semantic_label_path(bin_path):
+    """Finds the .label file of a point cloud, None if there is none.
+
+    Looked up next to the point directory as in SemanticKITTI
+    (sequences/XX/velodyne/N.bin -> sequences/XX/labels/N.label) and in the
+    Semantic/ directory of this repository's layout (3D/N.bin ->
+    Semantic/N.label).
+    """
+    directory, name = os.path.split(os.path.abspath(bin_path))
+    stem = os.path.splitext(name)[0] + EXTENSION
+    root = os.path.dirname(directory)
+    for candidate in (os.path.join(root, 'labels', stem),
+                      os.path.join(root, 'Semantic', stem)):
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+
+def load_semantic_labels(path, num_points=None):
+    """Reads the per-point semantic labels of a SemanticKITTI .label file.
+
+    Every point has a uint32 whose lower 16 bits are the semantic label and
+    upper 16 bits the instance id. The file is memory mapped and only the
+    semantic part is copied out.
+
+    Args:
+        path: Path of the .label file.
+        num_points: Expected number of points, checked if given.
+
+    Returns:
+        (N,) uint16 array of label values.
+    """
+    raw = np.memmap(path, dtype=np.uint32, mode='r')
+    if num_points is not None and len(raw) != num_points:
+        raise ValueError(f"{path} has {len(raw)} labels for {num_points} points")
+    return (raw & 0xFFFF).astype(np.uint16)
+
+
+class SemanticLabels:
+    """The semantic labels of a frame as a compact class index per point.
+
+    Only the label values that occur in the frame become classes. The points
+    of a class are looked up once and cached, so changing how one class is
+    shown only touches its points.
+    """
+
+    def __init__(self, labels):
+        """
+        Args:
+            labels: (N,) uint16 label values from load_semantic_labels().
+        """
+        labels = np.asarray(labels, dtype=np.uint16)
+        # Label values are 16 bit, so a bincount finds the present values
+        # and a lookup table ranks them without sorting the points.
+        present = np.bincount(labels, minlength=1 << 16) > 0
+        self.values = np.flatnonzero(present)
+        rank = np.cumsum(present) - 1
+        dtype = np.uint8 if len(self.values) <= 256 else np.uint16
+        self.class_index = rank[labels].astype(dtype)
+        self._index = {int(v): i for i, v in enumerate(self.values)}
+        self._points = {}
+
+    def __len__(self):
+        return len(self.class_index)
+
+    def class_id(self, value):
+        """Returns the class index of a label value."""
+        return self._index[value]
+
+    def points(self, value):
+        """Returns the (cached) indices of the points with a label value."""
+        points = self._points.get(value)
+        if points is None:
+            points = np.flatnonzero(self.class_index == self.class_id(value))
+            self._points[value] = points
+        return points
+
+    def mask(self, values):
+        """Returns the (N,) bool mask of the points with any of the values."""
+        selected = np.zeros(len(self.values), dtype=bool)
+        selected[[self._index[v] for v in values if v in self._index]] = True
+        return selected[self.class_index]
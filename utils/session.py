@@ -0,0 +1,197 @@
+"""Compact columnar file format for labeled frames.
+
+A session file stores everything the app needs to show a labeled frame
+without recomputation::
+
+    magic (8 bytes) | header size (uint32) | JSON header | padding | blocks
+
+The JSON header lists the categories and, for every block, its dtype, shape
+and byte offset. Blocks are raw little-endian arrays aligned to ALIGNMENT
+bytes so they can be memory-mapped directly:
+
+    points      float32 (N, 3)
+    intensity   float32 (N,)
+    box_ids     int16   (N,)   index of the containing box, -1 for none
+    boxes       float32 (B, 7) x, y, z, h, w, l, rotation_y
+    box_labels  uint8   (B,)   index into the category list
+    palette     uint8   (C, 3) RGB color of every category
+
+Run ``python -m utils.session DATA_DIR OUT_DIR`` to convert a dataset with
+3D/ and Label/ sub-directories.
+"""
+
+import argparse
+import json
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .dataset import DatasetIndex
+from .kitti import (DEFAULT_CATEGORY_COLORS, box_arrays, load_bounding_boxes,
+                    points_in_boxes)
+
+MAGIC = b'LVSESS01'
+ALIGNMENT = 64
+EXTENSION = '.lvs'
+
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def default_palette(categories):
+    """Returns the uint8 colors the app assigns to categories by default."""
+    colors = [
+        DEFAULT_CATEGORY_COLORS[i]
+        if i < len(DEFAULT_CATEGORY_COLORS) else [0.5, 0.5, 0.5]
+        for i in range(len(categories))
+    ]
+    return np.round(np.array(colors, dtype=np.float64).reshape(-1, 3) *
+                    255).astype(np.uint8)
+
+
+def save_session(path, points, boxes, box_ids=None, palette=None,
+                 categories=None):
+    """Writes a labeled frame to a session file.
+
+    Args:
+        path: Output path.
+        points: (N, 4) array of x, y, z, intensity.
+        boxes: List of box tuples as returned by load_bounding_boxes().
+        box_ids: Optional precomputed (N,) box index of every point.
+        palette: Optional (C, 3) float [0, 1] or uint8 colors, one per
+            category.
+        categories: Optional category names in palette order. Defaults to
+            the categories of the boxes in order of first appearance.
+    """
+    points = np.asarray(points, dtype=np.float32)
+    params, box_categories = box_arrays(boxes)
+    if categories is None:
+        categories = list(dict.fromkeys(box_categories))
+    if box_ids is None:
+        box_ids = points_in_boxes(points, params)
+    if palette is None:
+        palette = default_palette(categories)
+    palette = np.asarray(palette)
+    if palette.dtype != np.uint8:
+        palette = np.round(np.clip(palette, 0, 1) * 255).astype(np.uint8)
+
+    blocks = {
+        'points': np.ascontiguousarray(points[:, :3]),
+        'intensity': np.ascontiguousarray(points[:, 3]),
+        'box_ids': np.asarray(box_ids, dtype=np.int16),
+        'boxes': params,
+        'box_labels': np.array([categories.index(c) for c in box_categories],
+                               dtype=np.uint8),
+        'palette': palette.reshape(-1, 3),
+    }
+
+    # The header size depends on the offsets it contains, so lay out the
+    # blocks behind a generously padded header.
+    layout = {}
+    header = {'version': 1, 'categories': categories, 'blocks': layout}
+    reserve = _align(len(json.dumps(header)) + 128 * len(blocks) + 12)
+    offset = reserve
+    for name, array in blocks.items():
+        layout[name] = {
+            'dtype': array.dtype.str,
+            'shape': list(array.shape),
+            'offset': offset
+        }
+        offset = _align(offset + array.nbytes)
+    encoded = json.dumps(header).encode('utf-8')
+    assert len(MAGIC) + 4 + len(encoded) <= reserve
+
+    with open(path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<I', len(encoded)))
+        f.write(encoded)
+        for name, array in blocks.items():
+            f.seek(layout[name]['offset'])
+            f.write(array.tobytes())
+        f.truncate(offset)
+
+
+class Session:
+    """A memory-mapped session file. Arrays are read-only views of the file."""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a session file")
+            (size,) = struct.unpack('<I', f.read(4))
+            header = json.loads(f.read(size).decode('utf-8'))
+        self.path = path
+        self.categories = header['categories']
+        for name, block in header['blocks'].items():
+            shape = tuple(block['shape'])
+            if np.prod(shape) == 0:
+                array = np.empty(shape, dtype=block['dtype'])
+            else:
+                array = np.memmap(path,
+                                  dtype=block['dtype'],
+                                  mode='r',
+                                  offset=block['offset'],
+                                  shape=shape)
+            setattr(self, name, array)
+
+    def point_array(self):
+        """Returns the (N, 4) x, y, z, intensity array (this copies)."""
+        return np.column_stack([self.points, self.intensity])
+
+    def box_tuples(self):
+        """Returns the boxes in the load_bounding_boxes() tuple format."""
+        return [
+            tuple(float(v) for v in params) + (self.categories[label],)
+            for params, label in zip(self.boxes, self.box_labels)
+        ]
+
+
+def open_session(path):
+    return Session(path)
+
+
+def _convert_frame(job):
+    bin_path, label_path, out_path = job
+    points = np.fromfile(bin_path, dtype=np.float32).reshape(-1, 4)
+    boxes = load_bounding_boxes(label_path) if label_path is not None else []
+    save_session(out_path, points, boxes)
+    return out_path
+
+
+def convert_dataset(data_dir, out_dir, workers=None):
+    """Converts every frame of a dataset and its labels in parallel.
+
+    Args:
+        data_dir: Dataset root, see utils.dataset.
+        out_dir: Directory that receives one session file per frame.
+        workers: Number of worker processes (default: CPU count).
+
+    Returns:
+        List of written session paths.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    index = DatasetIndex.open(data_dir)
+    jobs = [(index.path(frame_id), index.path(frame_id, 'label'),
+             os.path.join(out_dir, frame_id + EXTENSION))
+            for frame_id in index.frame_ids]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_convert_frame, jobs, chunksize=8))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Convert a KITTI style dataset to session files.")
+    parser.add_argument('data_dir', help="directory with 3D/ and Label/")
+    parser.add_argument('out_dir', help="output directory")
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help="number of worker processes")
+    args = parser.parse_args()
+    written = convert_dataset(args.data_dir, args.out_dir, args.workers)
+    print(f"[Info] Wrote {len(written)} session files to {args.out_dir}")
+
+
+if __name__ == '__main__':
+    main()
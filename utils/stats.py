@@ -0,0 +1,170 @@
+"""Dataset-wide label statistics.
+
+Every frame of DATA_DIR with points and labels is processed by a worker process
+that counts the points inside each box and bins its attributes. Only the
+small per-frame histograms travel back to the parent, where they are summed
+into one report per category. Every box lands in a bin of every histogram:
+the occlusion histogram has its own bin for the -1 of DontCare boxes, so its
+counts add up to the number of boxes.
+
+Run ``python -m utils.stats DATA_DIR -o report.json [--csv report.csv]``.
+"""
+
+import argparse
+import csv
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .dataset import DatasetIndex
+from .kitti import (box_arrays, load_bounding_boxes, load_label_attributes,
+                    points_in_boxes)
+
+# Histogram bin edges, shared by all workers so partial results can be added.
+BINS = {
+    'points_per_box': [0, 1, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000,
+                       np.inf],
+    'range': [0, 10, 20, 30, 40, 50, 60, 70, 80, np.inf],
+    # -1 (DontCare) gets the first bin instead of falling outside
+    'occlusion': [-1, 0, 1, 2, 3, 4],
+    'length': [0, 1, 2, 3, 4, 5, 6, 8, 10, 15, np.inf],
+    'height': [0, 0.5, 1, 1.5, 2, 2.5, 3, 4, np.inf],
+}
+# Names of the bins of categorical histograms, as in the KITTI devkit
+BIN_LABELS = {
+    'occlusion': ['DontCare', 'fully visible', 'partly occluded', 'largely occluded', 'unknown'],
+}
+
+
+def frame_jobs(data_dir):
+    """Lists (bin_path, label_path) of every frame that has both files."""
+    index = DatasetIndex.open(data_dir)
+    return [(index.path(frame_id), index.path(frame_id, 'label'))
+            for frame_id in index.frames_with('label')]
+
+
+def frame_statistics(job):
+    """Map step: per-category histograms of a single frame."""
+    bin_path, label_path = job
+    points = np.fromfile(bin_path, dtype=np.float32).reshape(-1, 4)
+    boxes = load_bounding_boxes(label_path)
+    params, categories = box_arrays(boxes)
+    _, occlusion = load_label_attributes(label_path)
+    box_ids = points_in_boxes(points, params)
+    counts = np.bincount(box_ids[box_ids >= 0], minlength=len(boxes))
+
+    values = {
+        'points_per_box': counts,
+        'range': np.hypot(params[:, 0], params[:, 1]),
+        'occlusion': occlusion,
+        'length': params[:, 5],
+        'height': params[:, 3],
+    }
+    result = {}
+    categories = np.array(categories)
+    for category in np.unique(categories):
+        mask = categories == category
+        result[category] = {
+            'boxes': int(mask.sum()),
+            'points': int(counts[mask].sum()),
+            'frames': 1,
+            'histograms': {
+                name: np.histogram(v[mask], BINS[name])[0]
+                for name, v in values.items()
+            },
+        }
+    return result
+
+
+def merge_statistics(total, partial):
+    """Reduce step: adds the statistics of one frame to the running total."""
+    for category, stats in partial.items():
+        if category not in total:
+            total[category] = stats
+            continue
+        merged = total[category]
+        for key in ('boxes', 'points', 'frames'):
+            merged[key] += stats[key]
+        for name, counts in stats['histograms'].items():
+            merged['histograms'][name] += counts
+    return total
+
+
+def dataset_statistics(data_dir, workers=None):
+    """Computes label statistics over a whole dataset in parallel.
+
+    Args:
+        data_dir: Dataset root, see utils.dataset.
+        workers: Number of worker processes (default: CPU count).
+
+    Returns:
+        Dict mapping category to its statistics.
+    """
+    jobs = frame_jobs(data_dir)
+    total = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for partial in pool.map(frame_statistics, jobs, chunksize=16):
+            merge_statistics(total, partial)
+    return total
+
+
+def to_report(total):
+    """Converts statistics to a JSON serializable report."""
+    report = {}
+    for category in sorted(total):
+        stats = total[category]
+        report[category] = {
+            'boxes': stats['boxes'],
+            'frames': stats['frames'],
+            'mean_points_per_box': stats['points'] / max(stats['boxes'], 1),
+            'histograms': {
+                name: {
+                    # The open upper bin edge is written as null
+                    'edges': [None if np.isinf(e) else float(e)
+                              for e in BINS[name]],
+                    'counts': [int(c) for c in counts],
+                    **({'labels': BIN_LABELS[name]} if name in BIN_LABELS else {}),
+                } for name, counts in stats['histograms'].items()
+            },
+        }
+    return report
+
+
+def write_csv(report, path):
+    """Writes one row per category, histogram and bin."""
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['category', 'histogram', 'bin_min', 'bin_max', 'count'])
+        for category, stats in report.items():
+            for name, hist in stats['histograms'].items():
+                edges = hist['edges']
+                for i, count in enumerate(hist['counts']):
+                    writer.writerow(
+                        [category, name, edges[i], edges[i + 1], count])
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compute label statistics of a KITTI style dataset.")
+    parser.add_argument('data_dir', help="directory with 3D/ and Label/")
+    parser.add_argument('-o', '--output', default='label_stats.json',
+                        help="JSON report path")
+    parser.add_argument('--csv', default=None, help="optional CSV report path")
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help="number of worker processes")
+    args = parser.parse_args()
+
+    report = to_report(dataset_statistics(args.data_dir, args.workers))
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    if args.csv is not None:
+        write_csv(report, args.csv)
+    for category, stats in report.items():
+        print(f"{category:>16}: {stats['boxes']:6d} boxes in "
+              f"{stats['frames']:5d} frames, "
+              f"{stats['mean_points_per_box']:.1f} points per box")
+
+
+if __name__ == '__main__':
+    main()
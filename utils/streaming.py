@@ -0,0 +1,142 @@
+import numpy as np
+
+# 1M points of (x, y, z, intensity) float32 is 16 MiB per chunk.
+DEFAULT_CHUNK_POINTS = 1 << 20
+
+
+def iter_point_chunks(path, chunk_points=DEFAULT_CHUNK_POINTS, num_features=4):
+    """Reads a KITTI style .bin point cloud in fixed-size blocks.
+
+    Args:
+        path: Path of the .bin file.
+        chunk_points: Number of points read per block.
+        num_features: Number of float32 values per point.
+
+    Yields:
+        (M, num_features) float32 arrays with M <= chunk_points.
+    """
+    count = chunk_points * num_features
+    with open(path, 'rb') as f:
+        while True:
+            chunk = np.fromfile(f, dtype=np.float32, count=count)
+            if chunk.size == 0:
+                return
+            usable = chunk.size - chunk.size % num_features
+            yield chunk[:usable].reshape(-1, num_features)
+
+
+def filter_radius(chunks, max_value):
+    """Drops points where any of x, y or z exceeds max_value in magnitude.
+
+    This is the same filter as vis_3d.load_point_cloud, applied per chunk.
+    """
+    for chunk in chunks:
+        yield chunk[(np.abs(chunk[:, :3]) <= max_value).all(axis=1)]
+
+
+def filter_range(chunks, max_range):
+    """Drops points further than max_range from the sensor, per chunk."""
+    for chunk in chunks:
+        xyz = chunk[:, :3]
+        yield chunk[np.einsum('ij,ij->i', xyz, xyz) <= max_range * max_range]
+
+
+def downsample(chunks, every):
+    """Keeps every n-th point of the stream, independent of chunk borders."""
+    offset = 0
+    for chunk in chunks:
+        yield chunk[(-offset) % every::every]
+        offset = (offset + len(chunk)) % every
+
+
+class BoundedAccumulator:
+    """Collects points from a stream into a buffer of fixed capacity.
+
+    Points are appended until the buffer is full. After that, reservoir
+    sampling replaces retained points at random, so the result stays a
+    uniform sample of the whole stream while memory stays bounded.
+    """
+
+    def __init__(self, capacity, num_features=4, seed=0):
+        self.capacity = capacity
+        self._buffer = None
+        self._num_features = num_features
+        self._size = 0
+        self._seen = 0
+        self._rng = np.random.default_rng(seed)
+
+    def add(self, chunk):
+        if self._buffer is None:
+            # Grow lazily so small files do not allocate the full capacity.
+            self._buffer = np.empty(
+                (min(self.capacity, max(len(chunk), 1)), self._num_features),
+                dtype=np.float32)
+        n = len(chunk)
+        free = self.capacity - self._size
+        if free > 0:
+            take = min(free, n)
+            if self._size + take > len(self._buffer):
+                grown = np.empty((min(self.capacity,
+                                      max(2 * len(self._buffer),
+                                          self._size + take)),
+                                  self._num_features),
+                                 dtype=np.float32)
+                grown[:self._size] = self._buffer[:self._size]
+                self._buffer = grown
+            self._buffer[self._size:self._size + take] = chunk[:take]
+            self._size += take
+            self._seen += take
+            chunk = chunk[take:]
+            n = len(chunk)
+        if n > 0:
+            # Point with stream index t is kept with probability capacity / t.
+            t = self._seen + np.arange(1, n + 1)
+            slots = (self._rng.random(n) * t).astype(np.int64)
+            keep = slots < self.capacity
+            self._buffer[slots[keep]] = chunk[keep]
+            self._seen += n
+
+    @property
+    def seen(self):
+        """Number of points offered to the accumulator so far."""
+        return self._seen
+
+    def result(self):
+        if self._buffer is None:
+            return np.empty((0, self._num_features), dtype=np.float32)
+        return self._buffer[:self._size]
+
+
+def load_point_cloud_streaming(path,
+                               max_value=None,
+                               max_range=None,
+                               every=1,
+                               max_points=None,
+                               chunk_points=DEFAULT_CHUNK_POINTS):
+    """Loads a .bin point cloud with memory bounded by the chunk size.
+
+    Args:
+        path: Path of the .bin file.
+        max_value: Optional radius filter, see filter_radius().
+        max_range: Optional distance filter, see filter_range().
+        every: Keep every n-th point.
+        max_points: Upper bound of points kept. If the stream has more points
+            a uniform random subset is returned.
+        chunk_points: Number of points read per block.
+
+    Returns:
+        (N, 4) float32 array of points.
+    """
+    chunks = iter_point_chunks(path, chunk_points)
+    if max_value is not None:
+        chunks = filter_radius(chunks, max_value)
+    if max_range is not None:
+        chunks = filter_range(chunks, max_range)
+    if every > 1:
+        chunks = downsample(chunks, every)
+    if max_points is None:
+        return np.concatenate(list(chunks) or [np.empty((0, 4), np.float32)])
+    accumulator = BoundedAccumulator(max_points)
+    for chunk in chunks:
+        accumulator.add(chunk)
+    return accumulator.result()
@@ -0,0 +1,142 @@
+"""Bird's eye view thumbnails of the frames of a dataset, cached on disk.
+
+Thumbnails are rendered with utils/bev.py by worker processes and stored as
+small PNG files in a cache directory. The name of a file holds a digest of
+the modification time and size of the point and label files, so a changed
+frame gets a new thumbnail and the old one is removed when it is replaced.
+"""
+
+import glob
+import hashlib
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from .bev import DEFAULT_EXTENT, BEVGrid, render_bev
+from .kitti import load_bounding_boxes
+
+THUMBNAIL_DIR = '.thumbnails'
+THUMBNAIL_RESOLUTION = 0.8
+
+
+def _stamp(path):
+    if path is None:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _render_thumbnail(job):
+    """Worker side: renders a frame and writes it to the cache."""
+    bin_path, label_path, out_path, extent, resolution = job
+    points = np.fromfile(bin_path, dtype=np.float32).reshape(-1, 4)
+    boxes = load_bounding_boxes(label_path) if label_path is not None else []
+    image = render_bev(points, boxes, BEVGrid(extent, resolution))
+    # Written under a temporary name and renamed, readers never see a
+    # partial file
+    tmp_path = f"{out_path}.{os.getpid()}.tmp"
+    Image.fromarray(image).save(tmp_path, format='PNG')
+    os.replace(tmp_path, out_path)
+    stem = os.path.basename(out_path).rsplit('_', 1)[0]
+    for stale in glob.glob(os.path.join(os.path.dirname(out_path), glob.escape(stem) + '_*.png')):
+        if stale != out_path:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+    return out_path
+
+
+class ThumbnailCache:
+    """Thumbnails of point files, rendered in the background on request."""
+
+    def __init__(self, directory, extent=DEFAULT_EXTENT, resolution=THUMBNAIL_RESOLUTION,
+                 workers=2):
+        """
+        Args:
+            directory: Cache directory, thumbnails of another extent or
+                resolution are kept in their own sub-directory.
+            extent: (x_min, x_max, y_min, y_max) of the BEV in meters.
+            resolution: Meters per thumbnail pixel.
+            workers: Number of worker processes.
+        """
+        self.extent = tuple(float(v) for v in extent)
+        self.resolution = float(resolution)
+        self.shape = BEVGrid(self.extent, self.resolution).shape
+        settings = "_".join(f"{v:g}" for v in self.extent + (self.resolution,))
+        self.directory = os.path.join(directory, f"bev_{settings}")
+        self.workers = workers
+        self._pool = None
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def path(self, bin_path, label_path=None):
+        """Returns the cache file of the current version of a frame."""
+        digest = hashlib.md5(repr((_stamp(bin_path), _stamp(label_path))).encode()).hexdigest()[:12]
+        stem = os.path.splitext(os.path.basename(bin_path))[0]
+        return os.path.join(self.directory, f"{stem}_{digest}.png")
+
+    def load(self, bin_path, label_path=None):
+        """Returns the (H, W, 3) uint8 thumbnail, None if it is not cached."""
+        try:
+            with Image.open(self.path(bin_path, label_path)) as image:
+                return np.asarray(image.convert('RGB'))
+        except OSError:
+            return None
+
+    def request(self, bin_path, label_path=None, callback=None):
+        """Renders a thumbnail in the background unless it is cached or queued.
+
+        Args:
+            bin_path: Point file.
+            label_path: Label file whose boxes are drawn, or None.
+            callback: Called with bin_path from a worker thread once the
+                thumbnail is written.
+
+        Returns:
+            False if there was nothing to do.
+        """
+        out_path = self.path(bin_path, label_path)
+        with self._lock:
+            if out_path in self._pending or os.path.exists(out_path):
+                return False
+            if self._pool is None:
+                os.makedirs(self.directory, exist_ok=True)
+                # Spawned, the GUI process runs threads a fork would copy
+                self._pool = ProcessPoolExecutor(self.workers, multiprocessing.get_context('spawn'))
+            future = self._pool.submit(_render_thumbnail, (bin_path, label_path, out_path,
+                                                           self.extent, self.resolution))
+            self._pending[out_path] = future
+
+        def done(future):
+            with self._lock:
+                self._pending.pop(out_path, None)
+            if future.cancelled():
+                return
+            if future.exception() is not None:
+                print("[WARNING] Thumbnail of", bin_path, "failed:", future.exception())
+            elif callback is not None:
+                callback(bin_path)
+
+        future.add_done_callback(done)
+        return True
+
+    def cancel(self):
+        """Drops the queued requests, the ones being rendered still finish."""
+        with self._lock:
+            futures = list(self._pending.values())
+        for future in futures:
+            future.cancel()
+
+    def close(self):
+        self.cancel()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
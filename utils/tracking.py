@@ -0,0 +1,178 @@
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+from .iou import box_iou_matrix
+from .kitti import box_arrays, load_bounding_boxes
+
+# Boxes whose centers moved further between two frames are never associated
+MAX_CENTER_DISTANCE = 3.0
+# Share of the BEV IoU in the cost, the rest is the normalized center distance
+IOU_WEIGHT = 0.5
+IGNORED_CATEGORIES = ('DontCare',)
+# Stand-in for forbidden pairs, linear_sum_assignment needs finite costs
+_FORBIDDEN = 1e6
+
+
+def association_cost(params_a, categories_a, params_b, categories_b,
+                     max_distance=MAX_CENTER_DISTANCE, iou_weight=IOU_WEIGHT):
+    """Computes the cost of associating every box of a frame with every box
+    of the next one.
+
+    Args:
+        params_a: (A, 7) box parameters from box_arrays().
+        categories_a: A category names.
+        params_b: (B, 7) box parameters.
+        categories_b: B category names.
+        max_distance: Gate on the BEV center distance in meters.
+        iou_weight: Weight of 1 - BEV IoU against the center distance.
+
+    Returns:
+        (A, B) float64 costs in [0, 1], np.inf for pairs of different
+        categories or beyond the gate.
+    """
+    params_a = np.asarray(params_a, dtype=np.float64).reshape(-1, 7)
+    params_b = np.asarray(params_b, dtype=np.float64).reshape(-1, 7)
+    distance = np.hypot(params_a[:, None, 0] - params_b[None, :, 0],
+                        params_a[:, None, 1] - params_b[None, :, 1])
+    iou = box_iou_matrix(params_a, params_b, 'bev')
+    cost = (1 - iou_weight) * distance / max_distance + iou_weight * (1 - iou)
+    allowed = (distance <= max_distance) & \
+        (np.asarray(categories_a)[:, None] == np.asarray(categories_b)[None, :])
+    return np.where(allowed, cost, np.inf)
+
+
+def match_greedy(cost):
+    """Matches the pairs in order of increasing cost.
+
+    Returns:
+        Tuple of the (M,) row and column indices of the matched pairs.
+    """
+    rows, cols = [], []
+    used_rows = np.zeros(cost.shape[0], dtype=bool)
+    used_cols = np.zeros(cost.shape[1], dtype=bool)
+    order = np.argsort(cost, axis=None, kind='stable')
+    for r, c in zip(*np.unravel_index(order[np.isfinite(cost.ravel()[order])], cost.shape)):
+        if not used_rows[r] and not used_cols[c]:
+            used_rows[r] = used_cols[c] = True
+            rows.append(r)
+            cols.append(c)
+    return np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64)
+
+
+def match_hungarian(cost):
+    """Matches the pairs with the minimum total cost.
+
+    Returns:
+        Tuple of the (M,) row and column indices of the matched pairs.
+    """
+    if cost.size == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    rows, cols = linear_sum_assignment(np.where(np.isfinite(cost), cost, _FORBIDDEN))
+    keep = np.isfinite(cost[rows, cols])
+    return rows[keep], cols[keep]
+
+
+MATCHERS = {'greedy': match_greedy, 'hungarian': match_hungarian}
+
+
+class Tracks:
+    """Track ids of the label boxes of a sequence of frames.
+
+    Consecutive frames are associated in order, only as far as a frame is
+    asked for, and the results are kept, so stepping back and forth never
+    matches a pair of frames twice. A frame without a label file ends all
+    tracks. Boxes are in the sensor frame of their own frame, ego motion is
+    not compensated.
+    """
+
+    # (dataset root, label directory and its mtime, method) -> Tracks
+    _datasets = {}
+
+    def __init__(self, label_paths, method='hungarian', max_distance=MAX_CENTER_DISTANCE,
+                 iou_weight=IOU_WEIGHT):
+        """
+        Args:
+            label_paths: Label file of every frame of the sequence in order,
+                None for frames without labels.
+            method: 'hungarian' or 'greedy', see MATCHERS.
+            max_distance: See association_cost().
+            iou_weight: See association_cost().
+        """
+        self.label_paths = list(label_paths)
+        self.match = MATCHERS[method]
+        self.max_distance = max_distance
+        self.iou_weight = iou_weight
+        self.params = []
+        self.categories = []
+        self.track_ids = []
+        self.num_tracks = 0
+
+    def __len__(self):
+        return len(self.label_paths)
+
+    @classmethod
+    def for_dataset(cls, index, method='hungarian'):
+        """Returns the (cached) tracks of the frames of a DatasetIndex."""
+        key = (index.root, tuple(index.directories.get('label', ())), method)
+        tracks = cls._datasets.get(key)
+        if tracks is None:
+            tracks = cls([index.path(frame_id, 'label') for frame_id in index.frame_ids], method)
+            cls._datasets[key] = tracks
+        return tracks
+
+    def _associate_until(self, position):
+        while len(self.track_ids) <= position:
+            label_path = self.label_paths[len(self.track_ids)]
+            boxes = load_bounding_boxes(label_path) if label_path is not None else []
+            params, categories = box_arrays(boxes)
+            ids = np.full(len(params), -1, dtype=np.int64)
+            tracked = np.flatnonzero([c not in IGNORED_CATEGORIES for c in categories])
+            if self.track_ids:
+                previous = np.flatnonzero(self.track_ids[-1] >= 0)
+                cost = association_cost(self.params[-1][previous],
+                                        [self.categories[-1][i] for i in previous],
+                                        params[tracked], [categories[i] for i in tracked],
+                                        self.max_distance, self.iou_weight)
+                rows, cols = self.match(cost)
+                ids[tracked[cols]] = self.track_ids[-1][previous[rows]]
+            # Boxes without a predecessor start new tracks
+            new = tracked[ids[tracked] < 0]
+            ids[new] = self.num_tracks + np.arange(len(new))
+            self.num_tracks += len(new)
+            self.params.append(params)
+            self.categories.append(categories)
+            self.track_ids.append(ids)
+
+    def ids(self, position):
+        """Returns the (B,) track ids of the boxes of a frame, -1 if untracked.
+
+        The boxes are in the order of load_bounding_boxes().
+        """
+        self._associate_until(position)
+        return self.track_ids[position]
+
+    def trails(self, position, length=10):
+        """Builds the paths of the tracks over the frames up to position.
+
+        A path connects the bottom centers of the boxes of a track.
+
+        Args:
+            position: Position of the current frame in the sequence.
+            length: Number of frames a path reaches back.
+
+        Returns:
+            Tuple of (P, 3) vertices, (L, 2) line indices into them and the
+            (L,) track id of every line.
+        """
+        self._associate_until(position)
+        first = max(0, position - length + 1)
+        frames = range(first, position + 1)
+        centers = np.concatenate([self.params[i][:, :3] for i in frames]).astype(np.float64)
+        ids = np.concatenate([self.track_ids[i] for i in frames])
+        order = np.arange(len(ids))
+        # Vertices are in frame order, a stable sort by track keeps it
+        order = order[ids >= 0]
+        order = order[np.argsort(ids[order], kind='stable')]
+        same = ids[order[1:]] == ids[order[:-1]]
+        lines = np.stack([order[:-1][same], order[1:][same]], axis=1).reshape(-1, 2)
+        return centers.reshape(-1, 3), lines, ids[lines[:, 0]]
@@ -1,114 +1,225 @@
+"""Quick batch preview of KITTI frames.
+
+Shows a frame, or a range of frames one after another, in an Open3D window,
+or renders them without a window to images:
+
+    python vis_3d.py 000011
+    python vis_3d.py 0-20 --output previews/ --view data/vis_setting.json
+
+Frames are looked up in the dataset index of DATA_DIR (see utils/dataset.py),
+in the KITTI layout (velodyne/, label_2/) or the one of this repository (3D/,
+Label/).
+"""
+
+import argparse
+import os
+
 import numpy as np
 import open3d as o3d
-import json
 
-def load_point_cloud(bin_path, max_value=20):
-    points = np.fromfile(bin_path, dtype=np.float32).reshape(-1, 4)
-    # Filter points where any of x, y, or z exceeds max_value
-    points = points[(np.abs(points[:, :3]) <= max_value).all(axis=1)]
+from utils.camerapath import load_trajectory, view_to_pose
+from utils.dataset import DatasetIndex, parse_frames
+from utils.ground import segment_ground
+from utils.kitti import box_arrays, box_frames, load_bounding_boxes, points_in_boxes
+from utils.streaming import load_point_cloud_streaming
+
+CATEGORY_COLORS = {
+    'Car': [1, 0, 0],  # Red
+    'Pedestrian': [0, 0, 1],  # Blue
+    'Misc': [0, 1, 0]
+}
+DEFAULT_COLOR = [0.5, 0.5, 0.5]
+
+# Corner signs of a unit box and the 12 edges between the corners
+BOX_CORNERS = np.array([[-1, -1, -1], [1, -1, -1], [1, 1, -1], [-1, 1, -1],
+                        [-1, -1, 1], [1, -1, 1], [1, 1, 1], [-1, 1, 1]], dtype=np.float64)
+BOX_EDGES = np.array([[0, 1], [1, 2], [2, 3], [3, 0], [4, 5], [5, 6], [6, 7], [7, 4],
+                      [0, 4], [1, 5], [2, 6], [3, 7]])
+
+
+def load_point_cloud(bin_path, max_value=20, chunk_points=None, max_points=None, remove_ground=False):
+    if chunk_points is not None:
+        # Read in fixed-size blocks so huge merged maps never need to be
+        # resident in full
+        points = load_point_cloud_streaming(bin_path, max_value=max_value, max_points=max_points,
+                                            chunk_points=chunk_points)
+    else:
+        points = np.fromfile(bin_path, dtype=np.float32).reshape(-1, 4)
+        # Filter points where any of x, y, or z exceeds max_value
+        points = points[(np.abs(points[:, :3]) <= max_value).all(axis=1)]
+    if remove_ground:
+        # Plane is fitted on a subsample, then all points are classified at once
+        ground_mask, _ = segment_ground(points)
+        points = points[~ground_mask]
     return points
 
-def load_bounding_boxes(txt_path):
-    boxes = []
-    with open(txt_path, 'r') as file:
-        for line in file:
-            data = line.split()
-            category = data[0]  # Get the category of the object
-            h, w, l = map(float, data[8:11])
-            y, z, x = map(float, data[11:14])
-            rotation_y = float(data[14])
-            boxes.append((x, -y, -z, h, w, l, rotation_y, category))
-    return boxes
-
-def create_bounding_box(box):
-    x, y, z, h, w, l, ry, _ = box  # Ignore category here
-    z = z + h / 2  # Adjust the center for z-coordinate
-    bbox = o3d.geometry.OrientedBoundingBox(center=[x, y, z], R=o3d.geometry.get_rotation_matrix_from_axis_angle([0, ry, 0]), extent=[w, h, l])
-    return bbox
 
 def create_colormap(points, max_distance):
-    colors = np.zeros((points.shape[0], 3))
-    for i, point in enumerate(points):
-        # Normalize the X-coordinate to the range [-1, 1] and then scale to [0, 1]
-        x_normalized = (point[0] / max_distance + 1) / 2
-        # Apply the colormap: Blue for negative X, Red for positive X, White for near 0
-        colors[i] = [x_normalized, 0.5 * (1 - abs(x_normalized - 0.5)), 1 - x_normalized]
-    return colors
-
-def visualize_point_cloud(points, boxes, distance_threshold=5):
+    # Normalize the X-coordinate to the range [-1, 1] and then scale to [0, 1]
+    x_normalized = (np.asarray(points)[:, 0] / max(max_distance, 1e-6) + 1) / 2
+    # Apply the colormap: Blue for negative X, Red for positive X, White for near 0
+    return np.stack([x_normalized, 0.5 * (1 - np.abs(x_normalized - 0.5)), 1 - x_normalized], axis=1)
+
+
+def create_box_lines(params, colors):
+    """Builds one LineSet with the 12 edges of every box.
+
+    Args:
+        params: (B, 7) box parameters from box_arrays().
+        colors: (B, 3) box colors.
+    """
+    centers, rotations, extents = box_frames(params)
+    local = 0.5 * extents[:, None, :] * BOX_CORNERS[None]
+    corners = centers[:, None, :] + np.einsum('bij,bkj->bki', rotations, local)
+    lines = (BOX_EDGES[None] + 8 * np.arange(len(params))[:, None, None]).reshape(-1, 2)
+    line_set = o3d.geometry.LineSet()
+    line_set.points = o3d.utility.Vector3dVector(corners.reshape(-1, 3))
+    line_set.lines = o3d.utility.Vector2iVector(lines)
+    line_set.colors = o3d.utility.Vector3dVector(np.repeat(np.asarray(colors, dtype=np.float64),
+                                                           len(BOX_EDGES), axis=0))
+    return line_set
+
+
+def build_geometries(points, boxes, distance_threshold=None):
+    """Colors the points and builds the box lines of a frame.
+
+    Points inside a box get the color of its category, all others the red-blue
+    colormap along x. Box membership is computed for all boxes at once.
+
+    Args:
+        points: (N, 4) points.
+        boxes: Box tuples from load_bounding_boxes().
+        distance_threshold: Boxes whose center is further than this from the
+            sensor are neither drawn nor used for coloring. None for all.
+
+    Returns:
+        Tuple (point cloud, box LineSet or None).
+    """
+    params, categories = box_arrays(boxes)
+    if distance_threshold is not None and len(params):
+        keep = np.hypot(params[:, 0], params[:, 1]) <= distance_threshold
+        params = params[keep]
+        categories = [c for c, k in zip(categories, keep) if k]
+
+    # Find max distance for coloring, assuming forward direction is X
+    max_distance = np.abs(points[:, 0]).max() if len(points) else 1.0
+    colors = create_colormap(points[:, :3], max_distance)
+
+    box_colors = np.array([CATEGORY_COLORS.get(c, DEFAULT_COLOR) for c in categories],
+                          dtype=np.float64).reshape(-1, 3)
+    box_ids = points_in_boxes(points, params)
+    inside = box_ids >= 0
+    colors[inside] = box_colors[box_ids[inside]]
+
     pcd = o3d.geometry.PointCloud()
     pcd.points = o3d.utility.Vector3dVector(points[:, :3])
+    pcd.colors = o3d.utility.Vector3dVector(colors)
+    line_set = create_box_lines(params, box_colors) if len(params) else None
+    return pcd, line_set
+
+
+def default_pose(points):
+    # Look at the center of the points from above and behind the sensor
+    center = np.mean(points[:, :3], axis=0) if len(points) else np.zeros(3)
+    scale = np.max(np.linalg.norm(points[:, :3] - center, axis=1)) if len(points) else 10.0
+    eye = center + np.array([-1.0, 0.0, 0.8]) * scale
+    return center, eye, np.array([0.0, 0.0, 1.0]), 60.0
+
 
-    # Find max distance for coloring
-    max_distance = np.abs(points[:, 0]).max()  # Assuming forward direction is X
-
-    # Create a colormap for all points initially
-    colormap = create_colormap(points[:, :3], max_distance)
-
-    # Apply the category-based colors to points inside bounding boxes
-    category_colors = {
-        'Car': [1, 0, 0],  # Red
-        'Pedestrian': [0, 0, 1],  # Blue
-        'Misc': [0, 1, 0]
-    }
-    for box in boxes:
-        obb = create_bounding_box(box)
-        category = box[-1]
-        color = category_colors.get(category, [0.5, 0.5, 0.5])  # Default to gray if category not found
-        indices = obb.get_point_indices_within_bounding_box(o3d.utility.Vector3dVector(points[:, :3]))
-        for idx in indices:
-            colormap[idx] = color  # Color the points based on the category
-
-    pcd.colors = o3d.utility.Vector3dVector(colormap)
-
-    # Initialize the visualizer
+def show(pcd, line_set, pose, point_size=3):
     visualizer = o3d.visualization.Visualizer()
     visualizer.create_window()
     visualizer.add_geometry(pcd)
+    if line_set is not None:
+        visualizer.add_geometry(line_set)
+    visualizer.get_render_option().point_size = point_size
 
-    # Add bounding boxes to the visualizer
-    for box in boxes:
-        obb = create_bounding_box(box)
-        visualizer.add_geometry(obb)
-
-    render_option = visualizer.get_render_option()
-    render_option.point_size = 3
-
-    # visualizer.get_render_option().load_from_json('data/vis_setting.json')
+    center, eye, up, _ = pose
     ctrl = visualizer.get_view_control()
-
-    # Assuming you have calculated the center of your point cloud or bounding boxes
-    center_point = np.mean(points[:, :3], axis=0)
-
-    # Calculate a reasonable scale to set the zoom level
-    scale = np.max(np.linalg.norm(points[:, :3] - center_point, axis=1))
-
-    # Set the camera to focus on the center point and adjust the zoom based on scale
-    lookat = center_point
-    front = np.array([0, 0, 1])  # Adjust based on your data orientation
-    up = np.array([0, -1, 0])  # Adjust up direction if needed
-    zoom = 0.5 * scale  # Adjust this factor based on your preferences
-
-    ctrl.set_lookat(lookat)
-    ctrl.set_front(front)
+    ctrl.set_lookat(center)
+    ctrl.set_front((eye - center) / np.linalg.norm(eye - center))
     ctrl.set_up(up)
-    ctrl.set_zoom(zoom)
 
-    # Run the visualizer
     visualizer.run()
     visualizer.destroy_window()
 
-# Paths to your KITTI dataset files
-num = '000011'
-base_file = 'data/kitti/training'
-bin_path = f'{base_file}/velodyne/{num}.bin'
-txt_path = f'{base_file}/label_2/{num}.txt'
-
-# Load point cloud
-points = load_point_cloud(bin_path)
-
-# Load bounding boxes
-boxes = load_bounding_boxes(txt_path)
 
-# Visualize
-visualize_point_cloud(points, boxes, 5)
+class ImageRenderer:
+    """Renders frames to image files without a window."""
+
+    def __init__(self, width=1280, height=720, point_size=3):
+        self.renderer = o3d.visualization.rendering.OffscreenRenderer(width, height)
+        self.renderer.scene.set_background([1, 1, 1, 1])
+        self.point_material = o3d.visualization.rendering.MaterialRecord()
+        self.point_material.shader = "defaultUnlit"
+        self.point_material.point_size = point_size
+        self.line_material = o3d.visualization.rendering.MaterialRecord()
+        self.line_material.shader = "unlitLine"
+        self.line_material.line_width = 2
+
+    def render(self, pcd, line_set, pose, path):
+        scene = self.renderer.scene
+        scene.clear_geometry()
+        scene.add_geometry("points", pcd, self.point_material)
+        if line_set is not None:
+            scene.add_geometry("boxes", line_set, self.line_material)
+        center, eye, up, field_of_view = pose
+        self.renderer.setup_camera(field_of_view, center, eye, up)
+        o3d.io.write_image(path, self.renderer.render_to_image())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Preview KITTI frames with their labels.")
+    parser.add_argument('frames', help="frame id, range or list, e.g. 11, 0-20 or 3,5,8-10")
+    parser.add_argument('--data-dir', default='data',
+                        help="directory with velodyne/ + label_2/ or 3D/ + Label/")
+    parser.add_argument('-o', '--output', default=None,
+                        help="render to PNG files in this directory instead of showing a window")
+    parser.add_argument('--view', default=None,
+                        help="ViewTrajectory JSON (e.g. data/vis_setting.json) with the camera")
+    parser.add_argument('--max-value', type=float, default=20,
+                        help="drop points with any coordinate beyond this")
+    parser.add_argument('--chunk-points', type=int, default=None,
+                        help="stream the point files in blocks of this many points")
+    parser.add_argument('--max-points', type=int, default=None,
+                        help="with --chunk-points, keep a uniform sample of at most this many points")
+    parser.add_argument('--distance-threshold', type=float, default=None,
+                        help="ignore boxes further than this from the sensor")
+    parser.add_argument('--remove-ground', action='store_true', help="remove ground points")
+    parser.add_argument('--width', type=int, default=1280)
+    parser.add_argument('--height', type=int, default=720)
+    parser.add_argument('--point-size', type=int, default=3)
+    args = parser.parse_args()
+
+    view_pose = None
+    if args.view is not None:
+        # The first keyframe, so every run renders the same viewpoint
+        view_pose = view_to_pose(load_trajectory(args.view)[0][0])
+
+    renderer = None
+    if args.output is not None:
+        os.makedirs(args.output, exist_ok=True)
+        renderer = ImageRenderer(args.width, args.height, args.point_size)
+
+    dataset = DatasetIndex.open(args.data_dir)
+    for frame in parse_frames(args.frames):
+        bin_path = dataset.path(f'{frame:06d}')
+        if bin_path is None:
+            print(f"[WARNING] Frame {frame:06d} is not in {args.data_dir}")
+            continue
+        txt_path = dataset.path(f'{frame:06d}', 'label')
+        points = load_point_cloud(bin_path, args.max_value, args.chunk_points, args.max_points,
+                                  remove_ground=args.remove_ground)
+        boxes = load_bounding_boxes(txt_path) if txt_path is not None else []
+        pcd, line_set = build_geometries(points, boxes, args.distance_threshold)
+        pose = view_pose if view_pose is not None else default_pose(points)
+        if renderer is not None:
+            path = os.path.join(args.output, f'{frame:06d}.png')
+            renderer.render(pcd, line_set, pose, path)
+            print("[Info] Wrote", path)
+        else:
+            show(pcd, line_set, pose, args.point_size)
+
+
+if __name__ == '__main__':
+    main()
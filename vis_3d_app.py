@@ -11,41 +11,128 @@ import open3d as o3d
 import open3d.visualization.gui as gui
 import open3d.visualization.rendering as rendering
 
-from scipy.spatial import distance
 import os
 import platform
 import sys
+import threading
+import time
+
+from utils.aggregation import FrameWindow
+from utils.bev import BEVGrid, render_bev
+from utils.boundingbox import BoundingBox3D
+from utils.colormap import Colormap
+from utils.culling import BlockGrid, FrustumCuller
+from utils.dataset import DatasetIndex, find_root
+from utils.boxregistry import BoxRegistry
+from utils.camerapath import (DEFAULT_INTERVAL, interpolate_poses, load_trajectory,
+                              pose_to_view, save_trajectory, view_to_pose)
+from utils.export import ExportQueue, ImageWriter, VideoWriter
+from utils.framecache import FrameCache
+from utils.ground import segment_ground
+from utils.iou import match_boxes
+from utils.kitti import (DEFAULT_CATEGORY_COLORS, box_arrays, load_bounding_boxes,
+                         load_predictions, points_in_boxes)
+from utils.labellut import LabelLUT
+from utils.palette import PaletteColors
+from utils.picking import PointPicker
+from utils.precompute import SCAN_COVERAGE, PrecomputePool
+from utils.quality import AdaptiveQuality
+from utils.rangeimage import DEFAULT_WIDTH, HDL64_HEIGHT, RangeImage
+from utils.scalarfields import ScalarFields
+from utils.semantic import (SEMANTIC_KITTI_LABELS, SemanticLabels, load_semantic_labels,
+                            semantic_label_path)
+from utils.session import EXTENSION as SESSION_EXTENSION
+from utils.session import open_session, save_session
+from utils.streaming import load_point_cloud_streaming
+from utils.thumbnails import THUMBNAIL_DIR, ThumbnailCache
+from utils.tracking import Tracks
 
 isMacOS = (platform.system() == "Darwin")
 
-def load_bounding_boxes(txt_path):
-    boxes = []
-    with open(txt_path, 'r') as file:
-        for line in file:
-            data = line.split()
-            category = data[0]  # Get the category of the object
-            h, w, l = map(float, data[8:11])
-            y, z, x = map(float, data[11:14])
-            rotation_y = float(data[14])
-            boxes.append((x, -y, -z, h, w, l, rotation_y, category))
-    return boxes
-
-
-def create_bounding_box(box):
-    x, y, z, h, w, l, ry, _ = box  # Ignore category here
-    z = z + h / 2  # Adjust the center for z-coordinate
-    bbox = o3d.geometry.OrientedBoundingBox(center=[x, y, z],
-                                            R=o3d.geometry.get_rotation_matrix_from_axis_angle([0, 0, -ry]),
-                                            extent=[w, l, h])
-    return bbox
-
-
-def get_path_until_data(full_path):
-    # Find the index of 'data/'
-    index = full_path.find('data/') + 5  # add 5 to include 'data/' in the result
-    # Extract the part of the path up to and including 'data/'
-    path_until_data = full_path[:index]
-    return path_until_data
+STREAMING_THRESHOLD_BYTES = 256 * 1024 * 1024
+STREAMING_MAX_POINTS = 8000000
+POINT_FILTER_MAX = 100  # meters, the range of the point filter slider
+BOX_DISTANCE_MAX = 100  # box range slider at its maximum disables culling
+
+# Decoded frames and the arrays derived from them (ground masks, box and
+# semantic labels) are kept up to this size and shared by all windows
+FRAME_CACHE_BYTES = 2 * 1024 * 1024 * 1024
+FRAME_CACHE = FrameCache(FRAME_CACHE_BYTES)
+
+# The next PRECOMPUTE_AHEAD frames are read and processed on
+# PRECOMPUTE_WORKERS processes, with at most PRECOMPUTE_MAX_PENDING frames
+# queued at a time
+PRECOMPUTE_WORKERS = 2
+PRECOMPUTE_MAX_PENDING = 4
+PRECOMPUTE_AHEAD = 2
+
+# Fly mode uploads only the blocks of FLY_BLOCK_SIZE meters that are in view,
+# at most FLY_POINT_BUDGET points
+FLY_BLOCK_SIZE = 10.0
+FLY_POINT_BUDGET = 2000000
+
+# The bird's eye view image covers the KITTI detection range at BEV_RESOLUTION
+# meters per pixel
+BEV_EXTENT = (0.0, 70.4, -40.0, 40.0)
+BEV_RESOLUTION = 0.4
+# Rows of the 64 x 2048 range image are repeated to make it readable
+RANGE_IMAGE_ROW_SCALE = 4
+
+# The frame browser shows BROWSER_PAGE_SIZE thumbnails at a time, rendered on
+# THUMBNAIL_WORKERS processes
+BROWSER_PAGE_SIZE = 6
+THUMBNAIL_WORKERS = 2
+
+# Recording: frames are encoded on EXPORT_WORKERS threads and at most
+# EXPORT_MAX_PENDING captured frames wait for the encoder
+TURNTABLE_FRAMES = 120
+RECORD_FPS = 30
+EXPORT_WORKERS = 2
+EXPORT_MAX_PENDING = 8
+
+# Track trails reach back this many frames
+TRACK_TRAIL_LENGTH = 10
+
+# Box colors of the prediction vs ground truth comparison
+COMPARISON_COLORS = {
+    "matched": [0.0, 0.4, 1.0],  # ground truth found by a prediction
+    "missed": [1.0, 0.5, 0.0],  # ground truth without a matching prediction
+    "true_positive": [0.0, 0.8, 0.0],
+    "false_positive": [1.0, 0.0, 0.0],
+}
+
+def create_bounding_box_3d(box, confidence=-1.0):
+    # A KITTI box as a BoundingBox3D for batched line rendering: the center
+    # is lifted by h / 2 and the arrow points along the heading.
+    x, y, z, h, w, l, ry, category = box
+    c, s = np.cos(ry), np.sin(ry)
+    return BoundingBox3D(center=[x, y, z + h / 2],
+                         front=[-s, -c, 0],
+                         up=[0, 0, 1],
+                         left=[c, -s, 0],
+                         size=[w, h, l],
+                         label_class=category,
+                         confidence=confidence)
+
+
+def read_points(path):
+    if os.path.getsize(path) > STREAMING_THRESHOLD_BYTES:
+        # Large merged maps are streamed in chunks and sampled down to a
+        # bounded number of points instead of being read in full. Points
+        # beyond the reach of the point filter are dropped before sampling,
+        # so the budget only holds points that can be shown.
+        return load_point_cloud_streaming(path, max_range=POINT_FILTER_MAX,
+                                          max_points=STREAMING_MAX_POINTS)
+    return np.fromfile(path, dtype=np.float32).reshape(-1, 4)
+
+
+PRECOMPUTE = PrecomputePool(PRECOMPUTE_WORKERS, PRECOMPUTE_MAX_PENDING, reader=read_points)
+
+
+FRAME_COLORS = [[0.6, 0.6, 0.6], [0.12, 0.47, 0.71], [1.0, 0.5, 0.05],
+                [0.17, 0.63, 0.17], [0.84, 0.15, 0.16], [0.58, 0.4, 0.74],
+                [0.55, 0.34, 0.29], [0.89, 0.47, 0.76], [0.74, 0.74, 0.13],
+                [0.09, 0.75, 0.81]]
 
 
 class Settings:
@@ -175,6 +262,24 @@ class Settings:
         self.show_colormap = False
         self.show_depth_colormap = False
         self.show_label = True
+        self.show_frame_colormap = False
+        self.show_tracks = False
+        self.show_predictions = False
+        self.scalar_field = "None"
+        self.scalar_colormap = "Rainbow"
+        self.scalar_auto_range = True
+        self.scalar_min = 0.0
+        self.scalar_max = 1.0
+        self.min_confidence = 0.0
+        self.box_distance = BOX_DISTANCE_MAX
+        self.ground_mode = "Show"
+        self.aggregate_frames = 1
+        self.keep_camera = True
+        self.sync_camera = False
+        self.show_bev = False
+        self.show_range_image = False
+        self.fly_culling = True
+        self.adaptive_quality = True
         self.use_ibl = True
         self.use_sun = True
         self.new_ibl_name = None  # clear to None after loading
@@ -222,22 +327,55 @@ class AppWindow:
     MENU_OPEN = 1
     MENU_EXPORT = 2
     MENU_QUIT = 3
+    MENU_SAVE_SESSION = 4
+    MENU_RECORD_TURNTABLE = 5
+    MENU_RECORD_SEQUENCE = 6
+    MENU_STOP_RECORDING = 7
+    MENU_RECORD_CAMERA_PATH = 8
+    MENU_NEW_WINDOW = 9
     MENU_SHOW_SETTINGS = 11
     MENU_ABOUT = 21
 
     DEFAULT_IBL = "default"
 
+    GROUND_MODES = ["Show", "Dim", "Hide"]
+    SCALAR_FIELDS = ["None", "Height", "Range", "Azimuth", "Intensity"]
+    SCALAR_COLORMAPS = ["Rainbow", "Greyscale", "Custom"]
+
     MATERIAL_NAMES = ["Lit", "Unlit", "Normals", "Depth"]
     MATERIAL_SHADERS = [
         Settings.LIT, Settings.UNLIT, Settings.NORMALS, Settings.DEPTH
     ]
 
-    def __init__(self, width, height):
-        self.bounding_boxes = None
+    # Open windows, for the camera sync
+    windows = []
+
+    def __init__(self, width, height, frame_cache=None, precompute=None):
+        self.box_registry = None
+        self._box_lines = None
         self.category_colors = {}
         self.category_checked = {}
         self.custom_colormap = []
         self.custom_colormap_range = []
+        self.frame_paths = []
+        self.dataset = None
+        self.frame_index = -1
+        self.frame_window = None
+        self.current_frame_ids = None
+        self.current_path = None
+        self.frame_cache = FRAME_CACHE if frame_cache is None else frame_cache
+        self.precompute = PRECOMPUTE if precompute is None else precompute
+        # Colors of the current cloud as palette indices, see utils/palette.py
+        self.point_colors = None
+        self._point_color_mode = None
+        self._label_palette_offset = None
+        # Per-point semantic labels, colored through a LabelLUT
+        self.semantic_lut = LabelLUT(SEMANTIC_KITTI_LABELS)
+        self.semantic_labels = None
+        self.semantic_checked = {}
+        self._semantic_palette_offset = None
+        self._pre_semantic_indices = None
+        self._pre_label_indices = None
 
         self.settings = Settings()
         resource_path = gui.Application.instance.resource_path
@@ -246,11 +384,21 @@ class AppWindow:
         self.window = gui.Application.instance.create_window(
             "Open3D", width, height)
         w = self.window  # to make the code more concise
+        AppWindow.windows.append(self)
+        w.set_on_close(self._on_close)
 
         # 3D widget
         self._scene = gui.SceneWidget()
         self._scene.scene = rendering.Open3DScene(w.renderer)
         self._scene.set_on_sun_direction_changed(self._on_sun_dir)
+        self._scene.set_on_mouse(self._on_scene_mouse)
+
+        # Ctrl + click (or Ctrl + move to hover) shows what is under the mouse
+        self._pick_info = gui.Label("")
+        self._pick_info.visible = False
+        self._picker = None
+        self._pick_pending = False
+        self._scalar_fields = None
 
         # ---- Settings panel ----
         # Rather than specifying sizes in pixels, which may vary in size based
@@ -319,6 +467,16 @@ class AppWindow:
         h.add_stretch()
         view_ctrls.add_child(h)
 
+        self._fly_culling = gui.Checkbox("Cull hidden points in fly mode")
+        self._fly_culling.checked = self.settings.fly_culling
+        self._fly_culling.set_on_checked(self._on_fly_culling)
+        view_ctrls.add_child(self._fly_culling)
+
+        self._adaptive_quality = gui.Checkbox("Fewer points while moving")
+        self._adaptive_quality.checked = self.settings.adaptive_quality
+        self._adaptive_quality.set_on_checked(self._on_adaptive_quality)
+        view_ctrls.add_child(self._adaptive_quality)
+
         self._show_skybox = gui.Checkbox("Show skymap")
         self._show_skybox.set_on_checked(self._on_show_skybox)
         view_ctrls.add_fixed(separation_height)
@@ -360,11 +518,48 @@ class AppWindow:
 
         view_ctrls.add_child(self._show_depth_colormap)
 
+        # Scalar field coloring through Colormap lookup tables
+        self._scalar_field = gui.Combobox()
+        for name in AppWindow.SCALAR_FIELDS:
+            self._scalar_field.add_item(name)
+        self._scalar_field.set_on_selection_changed(self._on_scalar_field)
+        self._scalar_colormap = gui.Combobox()
+        for name in AppWindow.SCALAR_COLORMAPS:
+            self._scalar_colormap.add_item(name)
+        self._scalar_colormap.set_on_selection_changed(self._on_scalar_colormap)
+        self._scalar_auto_range = gui.Checkbox("Auto range")
+        self._scalar_auto_range.checked = True
+        self._scalar_auto_range.set_on_checked(self._on_scalar_auto_range)
+        self._scalar_min = gui.NumberEdit(gui.NumberEdit.DOUBLE)
+        self._scalar_min.set_on_value_changed(self._on_scalar_range)
+        self._scalar_max = gui.NumberEdit(gui.NumberEdit.DOUBLE)
+        self._scalar_max.set_on_value_changed(self._on_scalar_range)
+        grid = gui.VGrid(2, 0.25 * em)
+        grid.add_child(gui.Label("Color by"))
+        grid.add_child(self._scalar_field)
+        grid.add_child(gui.Label("Colormap"))
+        grid.add_child(self._scalar_colormap)
+        grid.add_child(gui.Label("Min"))
+        grid.add_child(self._scalar_min)
+        grid.add_child(gui.Label("Max"))
+        grid.add_child(self._scalar_max)
+        view_ctrls.add_child(grid)
+        view_ctrls.add_child(self._scalar_auto_range)
+
         self._show_label = gui.Checkbox("Label Category")
         self._show_label.checked = True
         self._show_label.set_on_checked(self._on_show_label)
         view_ctrls.add_child(self._show_label)
 
+        self._ground_mode = gui.Combobox()
+        for name in AppWindow.GROUND_MODES:
+            self._ground_mode.add_item(name)
+        self._ground_mode.set_on_selection_changed(self._on_ground_mode)
+        grid = gui.VGrid(2, 0.25 * em)
+        grid.add_child(gui.Label("Ground"))
+        grid.add_child(self._ground_mode)
+        view_ctrls.add_child(grid)
+
         self._profiles = gui.Combobox()
         for name in sorted(Settings.LIGHTING_PROFILES.keys()):
             self._profiles.add_item(name)
@@ -451,8 +646,8 @@ class AppWindow:
         self._point_size.set_on_value_changed(self._on_point_size)
         # Point Filter
         self._point_filter = gui.Slider(gui.Slider.INT)
-        self._point_filter.int_value = 100
-        self._point_filter.set_limits(1, 100)
+        self._point_filter.int_value = POINT_FILTER_MAX
+        self._point_filter.set_limits(1, POINT_FILTER_MAX)
         self._point_filter.set_on_value_changed(self._on_point_filter)
 
         grid = gui.VGrid(2, 0.25 * em)
@@ -477,8 +672,31 @@ class AppWindow:
 
         # List for 3D bounding boxes with RGB for each
         label_3d_settings = gui.CollapsableVert("3D Labels", 0, gui.Margins(em, 0, 0, 0))
+        self._show_predictions = gui.Checkbox("Compare with predictions")
+        self._show_predictions.checked = False
+        self._show_predictions.set_on_checked(self._on_show_predictions)
+        label_3d_settings.add_child(self._show_predictions)
+        self._prediction_stats = gui.Label("")
+        label_3d_settings.add_child(self._prediction_stats)
+
+        # Box culling only rebuilds the line indices of the box LineSet
+        self._min_confidence = gui.Slider(gui.Slider.DOUBLE)
+        self._min_confidence.set_limits(0.0, 1.0)
+        self._min_confidence.double_value = self.settings.min_confidence
+        self._min_confidence.set_on_value_changed(self._on_min_confidence)
+        self._box_distance = gui.Slider(gui.Slider.INT)
+        self._box_distance.set_limits(1, BOX_DISTANCE_MAX)
+        self._box_distance.int_value = self.settings.box_distance
+        self._box_distance.set_on_value_changed(self._on_box_distance)
+        grid = gui.VGrid(2, 0.25 * em)
+        grid.add_child(gui.Label("Min score"))
+        grid.add_child(self._min_confidence)
+        grid.add_child(gui.Label("Box range"))
+        grid.add_child(self._box_distance)
+        label_3d_settings.add_child(grid)
         label_tree = gui.TreeView()
         label_3d_settings.add_child(label_tree)
+        self._label_tree = label_tree
 
         # lv.set_items[("Car", "Pedestrian", "Misc")]
         self._settings_panel.add_fixed(separation_height)
@@ -487,10 +705,152 @@ class AppWindow:
         custom_colormap_settings = gui.CollapsableVert("Custom Colormap", 0, gui.Margins(em, 0, 0, 0))
         custom_colormap_tree = gui.TreeView()
         custom_colormap_settings.add_child(custom_colormap_tree)
+        self._custom_colormap_tree = custom_colormap_tree
 
         self._settings_panel.add_fixed(separation_height)
         self._settings_panel.add_child(custom_colormap_settings)
 
+        # Frame stepping and multi-frame aggregation
+        frame_settings = gui.CollapsableVert("Frames", 0.25 * em, gui.Margins(em, 0, 0, 0))
+        self._prev_frame_button = gui.Button("Prev")
+        self._prev_frame_button.horizontal_padding_em = 0.5
+        self._prev_frame_button.vertical_padding_em = 0
+        self._prev_frame_button.set_on_clicked(self._on_prev_frame)
+        self._next_frame_button = gui.Button("Next")
+        self._next_frame_button.horizontal_padding_em = 0.5
+        self._next_frame_button.vertical_padding_em = 0
+        self._next_frame_button.set_on_clicked(self._on_next_frame)
+        self._frame_label = gui.Label("No frame")
+        h = gui.Horiz(0.25 * em)
+        h.add_child(self._prev_frame_button)
+        h.add_child(self._next_frame_button)
+        h.add_stretch()
+        h.add_child(self._frame_label)
+        frame_settings.add_child(h)
+
+        self._aggregate_frames = gui.Slider(gui.Slider.INT)
+        self._aggregate_frames.set_limits(1, 10)
+        self._aggregate_frames.int_value = self.settings.aggregate_frames
+        self._aggregate_frames.set_on_value_changed(self._on_aggregate_frames)
+        grid = gui.VGrid(2, 0.25 * em)
+        grid.add_child(gui.Label("Aggregate"))
+        grid.add_child(self._aggregate_frames)
+        frame_settings.add_child(grid)
+
+        self._show_frame_colormap = gui.Checkbox("Color by frame")
+        self._show_frame_colormap.checked = False
+        self._show_frame_colormap.set_on_checked(self._on_show_frame_colormap)
+        frame_settings.add_child(self._show_frame_colormap)
+
+        # Boxes associated across frames, see utils/tracking.py
+        self._show_tracks = gui.Checkbox("Show track trails")
+        self._show_tracks.checked = self.settings.show_tracks
+        self._show_tracks.set_on_checked(self._on_show_tracks)
+        frame_settings.add_child(self._show_tracks)
+        self._current_track_ids = None
+
+        self._settings_panel.add_fixed(separation_height)
+        self._settings_panel.add_child(frame_settings)
+
+        # Frame browser: BEV thumbnails of the frames of the directory, a page
+        # at a time, cached on disk next to the frames (see utils/thumbnails.py)
+        self._browser = gui.CollapsableVert("Frame browser", 0.25 * em, gui.Margins(em, 0, 0, 0))
+        self._browser.set_is_open(False)
+        grid = gui.VGrid(2, 0.25 * em)
+        self._browser_slots = []
+        for slot in range(BROWSER_PAGE_SIZE):
+            cell = gui.Vert()
+            image = gui.ImageWidget()
+            image.set_on_mouse(lambda event, s=slot: self._on_browser_click(s, event))
+            label = gui.Label("")
+            cell.add_child(image)
+            cell.add_child(label)
+            grid.add_child(cell)
+            self._browser_slots.append((image, label))
+        self._browser.add_child(grid)
+        h = gui.Horiz(0.25 * em)
+        for text, step in (("<", -1), (">", 1)):
+            button = gui.Button(text)
+            button.horizontal_padding_em = 0.5
+            button.vertical_padding_em = 0
+            button.set_on_clicked(lambda s=step: self._on_browser_page(s))
+            h.add_child(button)
+        h.add_stretch()
+        self._browser_page_label = gui.Label("")
+        h.add_child(self._browser_page_label)
+        self._browser.add_child(h)
+        self._browser_page = 0
+        self._browser_frames = [None] * BROWSER_PAGE_SIZE
+        self._browser_dirty = False
+        self._thumbnails = None
+
+        self._settings_panel.add_fixed(separation_height)
+        self._settings_panel.add_child(self._browser)
+
+        # Camera bookmarks, replayed as a path in the ViewTrajectory format of
+        # data/vis_setting.json
+        camera_settings = gui.CollapsableVert("Camera", 0.25 * em, gui.Margins(em, 0, 0, 0))
+        self._keep_camera = gui.Checkbox("Keep view across frames")
+        self._keep_camera.checked = self.settings.keep_camera
+        self._keep_camera.set_on_checked(self._on_keep_camera)
+        camera_settings.add_child(self._keep_camera)
+        self._sync_camera = gui.Checkbox("Sync camera with other windows")
+        self._sync_camera.checked = self.settings.sync_camera
+        self._sync_camera.set_on_checked(self._on_sync_camera)
+        camera_settings.add_child(self._sync_camera)
+        self._last_sync_view = None
+
+        self.camera_views = []
+        self.camera_interval = DEFAULT_INTERVAL
+        self.camera_loop = False
+        self._camera_playing = None
+        self._camera_view_list = gui.ListView()
+        self._camera_view_list.set_max_visible_items(5)
+        self._camera_view_list.set_on_selection_changed(self._on_camera_view_selected)
+        camera_settings.add_child(self._camera_view_list)
+
+        h = gui.Horiz(0.25 * em)
+        for text, callback in (("Add", self._on_add_camera_view),
+                               ("Remove", self._on_remove_camera_view),
+                               ("Play", self._on_play_camera_path)):
+            button = gui.Button(text)
+            button.horizontal_padding_em = 0.5
+            button.vertical_padding_em = 0
+            button.set_on_clicked(callback)
+            h.add_child(button)
+        camera_settings.add_child(h)
+        h = gui.Horiz(0.25 * em)
+        for text, callback in (("Load...", self._on_load_camera_path),
+                               ("Save...", self._on_save_camera_path)):
+            button = gui.Button(text)
+            button.horizontal_padding_em = 0.5
+            button.vertical_padding_em = 0
+            button.set_on_clicked(callback)
+            h.add_child(button)
+        camera_settings.add_child(h)
+
+        self._settings_panel.add_fixed(separation_height)
+        self._settings_panel.add_child(camera_settings)
+
+        # Top-down raster and spherical projection of the frame, computed in
+        # numpy without the renderer
+        bev_settings = gui.CollapsableVert("2D views", 0.25 * em, gui.Margins(em, 0, 0, 0))
+        self._show_range_image = gui.Checkbox("Show range image")
+        self._show_range_image.checked = self.settings.show_range_image
+        self._show_range_image.set_on_checked(self._on_show_range_image)
+        bev_settings.add_child(self._show_range_image)
+        self._show_bev = gui.Checkbox("Show BEV image")
+        self._show_bev.checked = self.settings.show_bev
+        self._show_bev.set_on_checked(self._on_show_bev)
+        bev_settings.add_child(self._show_bev)
+        self._bev_grid = BEVGrid(BEV_EXTENT, BEV_RESOLUTION)
+        self._bev_image = gui.ImageWidget()
+        self._bev_image.visible = False
+        bev_settings.add_child(self._bev_image)
+
+        self._settings_panel.add_fixed(separation_height)
+        self._settings_panel.add_child(bev_settings)
+
 
         # ----
 
@@ -504,6 +864,31 @@ class AppWindow:
         w.set_on_layout(self._on_layout)
         w.add_child(self._scene)
         w.add_child(self._settings_panel)
+        w.add_child(self._pick_info)
+
+        # Range image along the bottom of the 3D view
+        self._range_image_view = gui.ImageWidget()
+        self._range_image_view.visible = False
+        w.add_child(self._range_image_view)
+
+        # Progress of a running recording
+        self._export_info = gui.Label("")
+        self._export_info.visible = False
+        w.add_child(self._export_info)
+        self._recording = None
+
+        # Culling statistics, shown while culling in fly mode
+        self._stats_info = gui.Label("")
+        self._stats_info.visible = False
+        w.add_child(self._stats_info)
+        self._fly_mode = False
+        self._culler = None
+        self._last_cull_view = None
+        self._filter_mask = None
+        # Points of the last upload before decimation, None for all
+        self._display_mask = None
+        self._quality = AdaptiveQuality()
+        w.set_on_tick_event(self._on_tick)
 
         # ---- Menu ----
         # The menu is global (because the macOS menu is global), so only create
@@ -516,7 +901,14 @@ class AppWindow:
                 app_menu.add_item("Quit", AppWindow.MENU_QUIT)
             file_menu = gui.Menu()
             file_menu.add_item("Open...", AppWindow.MENU_OPEN)
+            file_menu.add_item("New Window", AppWindow.MENU_NEW_WINDOW)
             file_menu.add_item("Export Current Image...", AppWindow.MENU_EXPORT)
+            file_menu.add_item("Save Session...", AppWindow.MENU_SAVE_SESSION)
+            file_menu.add_separator()
+            file_menu.add_item("Record Turntable...", AppWindow.MENU_RECORD_TURNTABLE)
+            file_menu.add_item("Record Frame Sequence...", AppWindow.MENU_RECORD_SEQUENCE)
+            file_menu.add_item("Record Camera Path...", AppWindow.MENU_RECORD_CAMERA_PATH)
+            file_menu.add_item("Stop Recording", AppWindow.MENU_STOP_RECORDING)
             if not isMacOS:
                 file_menu.add_separator()
                 file_menu.add_item("Quit", AppWindow.MENU_QUIT)
@@ -548,8 +940,19 @@ class AppWindow:
         # window, so that the window can call the appropriate function when the
         # menu item is activated.
         w.set_on_menu_item_activated(AppWindow.MENU_OPEN, self._on_menu_open)
+        w.set_on_menu_item_activated(AppWindow.MENU_NEW_WINDOW, self._on_menu_new_window)
         w.set_on_menu_item_activated(AppWindow.MENU_EXPORT,
                                      self._on_menu_export)
+        w.set_on_menu_item_activated(AppWindow.MENU_SAVE_SESSION,
+                                     self._on_menu_save_session)
+        w.set_on_menu_item_activated(AppWindow.MENU_RECORD_TURNTABLE,
+                                     lambda: self._on_menu_record("turntable"))
+        w.set_on_menu_item_activated(AppWindow.MENU_RECORD_SEQUENCE,
+                                     lambda: self._on_menu_record("sequence"))
+        w.set_on_menu_item_activated(AppWindow.MENU_RECORD_CAMERA_PATH,
+                                     lambda: self._on_menu_record("camera path"))
+        w.set_on_menu_item_activated(AppWindow.MENU_STOP_RECORDING,
+                                     self._on_menu_stop_recording)
         w.set_on_menu_item_activated(AppWindow.MENU_QUIT, self._on_menu_quit)
         w.set_on_menu_item_activated(AppWindow.MENU_SHOW_SETTINGS,
                                      self._on_menu_toggle_settings_panel)
@@ -557,6 +960,11 @@ class AppWindow:
         # ----
 
         self.current_point_cloud = None
+        self.current_points = None
+        # Separate (N,) intensities of sessions, whose points are (N, 3)
+        self.current_intensity = None
+        self.current_boxes = []
+        self.current_box_ids = None
 
         self._apply_settings()
 
@@ -621,21 +1029,143 @@ class AppWindow:
                 layout_context, gui.Widget.Constraints()).height)
         self._settings_panel.frame = gui.Rect(r.get_right() - width, r.y, width,
                                               height)
+        bottom = r.get_bottom()
+        if self._range_image_view.visible:
+            # Full width left of the settings panel, at the image's aspect
+            view_width = r.width - (width if self._settings_panel.visible else 0)
+            view_height = min(r.height // 3, view_width * RANGE_IMAGE_ROW_SCALE * HDL64_HEIGHT
+                              // DEFAULT_WIDTH)
+            bottom -= view_height
+            self._range_image_view.frame = gui.Rect(r.x, bottom, view_width, view_height)
+        pref = self._pick_info.calc_preferred_size(layout_context, gui.Widget.Constraints())
+        self._pick_info.frame = gui.Rect(r.x, bottom - pref.height, pref.width,
+                                         pref.height)
+        pref = self._stats_info.calc_preferred_size(layout_context, gui.Widget.Constraints())
+        self._stats_info.frame = gui.Rect(r.x, r.y, pref.width, pref.height)
+        top = r.y + (pref.height if self._stats_info.visible else 0)
+        pref = self._export_info.calc_preferred_size(layout_context, gui.Widget.Constraints())
+        self._export_info.frame = gui.Rect(r.x, top, pref.width, pref.height)
 
     def _set_mouse_mode_rotate(self):
         self._scene.set_view_controls(gui.SceneWidget.Controls.ROTATE_CAMERA)
+        self._set_fly_mode(False)
 
     def _set_mouse_mode_fly(self):
         self._scene.set_view_controls(gui.SceneWidget.Controls.FLY)
+        self._set_fly_mode(True)
 
     def _set_mouse_mode_sun(self):
         self._scene.set_view_controls(gui.SceneWidget.Controls.ROTATE_SUN)
+        self._set_fly_mode(False)
 
     def _set_mouse_mode_ibl(self):
         self._scene.set_view_controls(gui.SceneWidget.Controls.ROTATE_IBL)
+        self._set_fly_mode(False)
 
     def _set_mouse_mode_model(self):
         self._scene.set_view_controls(gui.SceneWidget.Controls.ROTATE_MODEL)
+        self._set_fly_mode(False)
+
+    def _set_fly_mode(self, fly):
+        was_culling = self._culling_active()
+        self._fly_mode = fly
+        self._on_culling_changed(was_culling)
+
+    def _on_fly_culling(self, enabled):
+        was_culling = self._culling_active()
+        self.settings.fly_culling = enabled
+        self._on_culling_changed(was_culling)
+
+    def _on_culling_changed(self, was_culling):
+        # The next tick culls for the current camera
+        self._last_cull_view = None
+        if was_culling and not self._culling_active():
+            # Back to the whole cloud
+            self._stats_info.visible = False
+            self._on_point_filter(self._point_filter.int_value)
+            self.window.set_needs_layout()
+
+    def _on_adaptive_quality(self, enabled):
+        self.settings.adaptive_quality = enabled
+        if not enabled and self._quality.decimated:
+            self._quality.moving = False
+            self._upload_point_cloud(self._display_mask)
+
+    def _culling_active(self):
+        return self._fly_mode and self.settings.fly_culling and self.current_point_cloud is not None
+
+    def _on_tick(self):
+        # The browser is filled once it is opened, not on every load
+        browsed = self._browser_dirty and self._browser.get_is_open()
+        if browsed:
+            self._update_browser()
+        synced = self._sync_camera_pose()
+        culled = self._update_culling()
+        adapted = self._update_quality()
+        return browsed or synced or culled or adapted
+
+    def _sync_camera_pose(self):
+        # Copies this window's camera to the other synced windows when it
+        # moved. The view they end up with is remembered as theirs, so the
+        # copy is not sent back.
+        if not self.settings.sync_camera or self.current_point_cloud is None:
+            return False
+        view = np.asarray(self._scene.scene.camera.get_view_matrix())
+        if self._last_sync_view is not None and np.allclose(view, self._last_sync_view):
+            return False
+        self._last_sync_view = view
+        pose = self._camera_pose()
+        for other in AppWindow.windows:
+            if other is self or not other.settings.sync_camera or other.current_point_cloud is None:
+                continue
+            other.apply_camera_pose(*pose)
+            other._last_sync_view = np.asarray(other._scene.scene.camera.get_view_matrix())
+            other.window.post_redraw()
+        return True
+
+    def _update_culling(self):
+        # Re-cull when the camera moved, the culler decides whether the
+        # uploaded blocks still cover the view
+        if not self._culling_active():
+            return False
+        camera = self._scene.scene.camera
+        view = np.asarray(camera.get_view_matrix())
+        if self._last_cull_view is not None and np.array_equal(view, self._last_cull_view):
+            return False
+        self._last_cull_view = view
+        if self._culler is None:
+            grid = BlockGrid(np.asarray(self.current_point_cloud.points), FLY_BLOCK_SIZE)
+            self._culler = FrustumCuller(grid, FLY_POINT_BUDGET)
+        eye = np.asarray(camera.get_model_matrix())[:3, 3]
+        cull_mask = self._culler.update(view, np.asarray(camera.get_projection_matrix()), eye)
+        if cull_mask is not None:
+            if self._filter_mask is not None:
+                cull_mask &= self._filter_mask
+            self._upload_point_cloud(cull_mask)
+        self._update_stats_overlay()
+        return True
+
+    def _update_quality(self):
+        # Decimates the cloud when the camera starts moving and uploads the
+        # whole cloud again once it rests
+        if not self.settings.adaptive_quality or self.current_point_cloud is None:
+            return False
+        if not self._quality.update(self._scene.scene.camera.get_view_matrix()):
+            return False
+        self._upload_point_cloud(self._display_mask)
+        return True
+
+    def _update_stats_overlay(self):
+        stats = self._culler.stats()
+        self._stats_info.text = (
+            f"Culling: {stats['uploaded_blocks']}/{stats['blocks']} blocks, "
+            f"{stats['uploaded_points']:,}/{stats['points']:,} points "
+            f"(budget {stats['point_budget']:,})\n"
+            f"{stats['needed_points']:,} in view, {stats['cull_ms']:.1f} ms, "
+            f"{stats['refreshes']} uploads")
+        if not self._stats_info.visible:
+            self._stats_info.visible = True
+            self.window.set_needs_layout()
 
     def _on_bg_color(self, new_color):
         self.settings.bg_color = new_color
@@ -643,11 +1173,43 @@ class AppWindow:
 
     def _on_label_checked_changed(self, label, is_checked):
         self.category_checked[label] = is_checked
-        self._update_point_cloud_display()
+        if (self.point_colors is None or self._label_palette_offset is None
+                or label not in self.box_registry.categories or self.settings.ground_mode == "Dim"):
+            self._update_point_cloud_display()
+            return
+        # Only the points of this category change, through its bitset
+        registry = self.box_registry
+        points = np.flatnonzero(registry.mask([label]))
+        if is_checked:
+            entry = self._label_palette_offset + registry.category_id(label)
+            # The entry was made before the category got its color in load()
+            self.point_colors.set_color(entry, self.category_colors[label])
+            indices = np.full(len(points), entry)
+        else:
+            indices = self._pre_label_indices[points]
+        if self._semantic_palette_offset is not None:
+            # Shown semantic classes stay on top, only the colors below them
+            # change
+            self._pre_semantic_indices[points] = indices
+            semantic = self.semantic_labels
+            shown = np.array([self.semantic_checked.get(int(v), True) for v in semantic.values], dtype=bool)
+            below = ~shown[semantic.class_index[points]]
+            points, indices = points[below], indices[below]
+        self.point_colors.assign(points, indices)
+        self._on_point_filter(self._point_filter.int_value)
 
     def _on_label_color_changed(self, label, color):
         self.category_colors[label] = [color.red, color.green, color.blue]
-        self._update_point_cloud_display()
+        if (self.point_colors is not None and self._label_palette_offset is not None
+                and label in self.box_registry.categories):
+            # Every category is one palette entry, no per-point recoloring
+            self.point_colors.set_color(self._label_palette_offset + self.box_registry.category_id(label),
+                                        self.category_colors[label])
+            self._on_point_filter(self._point_filter.int_value)
+        else:
+            self._update_point_cloud_display()
+        self._update_box_geometry()
+        self._update_bev_image()
 
     def _on_show_skybox(self, show):
         self.settings.show_skybox = show
@@ -662,27 +1224,78 @@ class AppWindow:
             points = np.asarray(self.current_point_cloud.points)
             if self.settings.show_colormap:
                 # Apply colormap to all points initially
-                colormap = self.create_colormap(points, 'red-blue')
+                mode = 'red-blue'
             elif self.settings.show_depth_colormap:
-                colormap = self.create_colormap(points, 'depth')
+                mode = 'depth'
+            elif self.settings.scalar_field != "None":
+                mode = 'scalar'
+            elif self.settings.show_frame_colormap and self.current_frame_ids is not None:
+                mode = 'frame'
             else:
                 # Use a default gray color if colormap is disabled
-                colormap = np.tile([0.5, 0.5, 0.5], (len(points), 1))
+                mode = None
+            colormap = self.create_colormap(points, mode)
+            self._point_color_mode = mode
+            self._label_palette_offset = None
+            self._semantic_palette_offset = None
 
             # Ensure category-specific colors are maintained within bounding boxes
-            if self.settings.show_label:
-                for name, obb in self.bounding_boxes:
-                    if self.category_checked[name.split('_')[1]]:
-                        # Indices of points within this bounding box
-                        indices = obb.get_point_indices_within_bounding_box(o3d.utility.Vector3dVector(points))
-                        # Apply the specific category color to points within the bounding box
-                        for idx in indices:
-                            colormap[idx] = self.category_colors.get(name.split('_')[1], [0.5, 0.5, 0.5])
-                    else:
-                        continue
+            if self.settings.show_label and self.box_registry is not None:
+                self._apply_label_colors(colormap)
+            if self.settings.show_label and self.semantic_labels is not None:
+                self._apply_semantic_colors(colormap)
+
+            if self.settings.ground_mode == "Dim":
+                # Blend ground points towards the background color
+                ground = self._ground_mask()
+                bg = [self.settings.bg_color.red, self.settings.bg_color.green, self.settings.bg_color.blue]
+                colormap.blend(ground, bg, 0.75)
 
             # Update the point cloud colors
-            self.current_point_cloud.colors = o3d.utility.Vector3dVector(colormap)
+            self.point_colors = colormap
+            self._on_point_filter(self._point_filter.int_value)
+
+    def _apply_label_colors(self, colormap):
+        # One OR over the packed category masks, one palette entry per category.
+        # The indices before this step are kept so unchecking a category can
+        # restore just its points.
+        self._pre_label_indices = colormap.indices.copy()
+        checked = [name for name, is_checked in self.category_checked.items() if is_checked]
+        self._label_palette_offset = self.box_registry.colorize(colormap, checked, self.category_colors)
+        return colormap
+
+    def _apply_semantic_colors(self, colormap):
+        # One palette entry per class of the frame. The indices before this
+        # step are kept so hiding a class can restore just its points.
+        semantic = self.semantic_labels
+        self._pre_semantic_indices = colormap.indices.copy()
+        self._semantic_palette_offset = colormap.extend(self.semantic_lut.colorize(semantic.values))
+        shown = [int(v) for v in semantic.values if self.semantic_checked.get(int(v), True)]
+        mask = semantic.mask(shown)
+        colormap.assign(mask, self._semantic_palette_offset + semantic.class_index[mask])
+        return colormap
+
+    def _on_semantic_checked_changed(self, value, is_checked):
+        self.semantic_checked[value] = is_checked
+        if (self.point_colors is None or self._semantic_palette_offset is None
+                or self.settings.ground_mode == "Dim"):
+            self._update_point_cloud_display()
+            return
+        # Only the points of this class change, through the cached class index
+        semantic = self.semantic_labels
+        points = semantic.points(value)
+        if is_checked:
+            self.point_colors.assign(points, self._semantic_palette_offset + semantic.class_id(value))
+        else:
+            self.point_colors.assign(points, self._pre_semantic_indices[points])
+        self._on_point_filter(self._point_filter.int_value)
+
+    def _on_semantic_color_changed(self, value, color):
+        name = self.semantic_lut.labels[value].name if value in self.semantic_lut.labels else str(value)
+        self.semantic_lut.add_label(name, value, [color.red, color.green, color.blue])
+        if self.point_colors is not None and self._semantic_palette_offset is not None:
+            self.point_colors.set_color(self._semantic_palette_offset + self.semantic_labels.class_id(value),
+                                        [color.red, color.green, color.blue])
             self._on_point_filter(self._point_filter.int_value)
 
     def _on_show_colormap(self, show):
@@ -725,6 +1338,447 @@ class AppWindow:
         self.settings.show_label = show
         self._update_point_cloud_display()
 
+    def _on_scene_mouse(self, event):
+        if not event.is_modifier_down(gui.KeyModifier.CTRL) or self.current_point_cloud is None:
+            return gui.Widget.EventCallbackResult.IGNORED
+        if event.type == gui.MouseEvent.Type.BUTTON_DOWN or (
+                event.type == gui.MouseEvent.Type.MOVE and not self._pick_pending):
+            # Hovering only asks for a new depth image once the previous one
+            # came back, so the renderer is never flooded with requests
+            self._pick_pending = True
+            x = event.x - self._scene.frame.x
+            y = event.y - self._scene.frame.y
+
+            def on_depth(depth_image):
+                depth = np.asarray(depth_image)[y, x]
+                text = None
+                if depth < 1.0:
+                    frame = self._scene.frame
+                    world = self._scene.scene.camera.unproject(x, y, depth, frame.width, frame.height)
+                    text = self._describe_point(world)
+
+                def update_label():
+                    self._pick_pending = False
+                    self._pick_info.visible = text is not None
+                    if text is not None:
+                        self._pick_info.text = text
+                    self.window.set_needs_layout()
+
+                gui.Application.instance.post_to_main_thread(self.window, update_label)
+
+            self._scene.scene.scene.render_to_depth_image(on_depth)
+            return gui.Widget.EventCallbackResult.HANDLED
+        return gui.Widget.EventCallbackResult.IGNORED
+
+    def _describe_point(self, world):
+        if self._picker is None:
+            points = self.current_points if self.current_points is not None else \
+                np.asarray(self.current_point_cloud.points)
+            self._picker = PointPicker(points)
+        index, _ = self._picker.query(world, max_distance=0.5)
+        if index is None:
+            return None
+        x, y, z = np.asarray(self.current_point_cloud.points)[index]
+        lines = [f"Point {index}",
+                 f"xyz: {x:.2f}, {y:.2f}, {z:.2f}",
+                 f"range: {np.sqrt(x * x + y * y + z * z):.2f} m"]
+        if self.current_points is not None:
+            lines[-1] += f"  intensity: {self._intensity()[index]:.2f}"
+        if self.current_box_ids is not None and self.current_box_ids[index] >= 0:
+            box_index = int(self.current_box_ids[index])
+            bx, by, bz, h, w, l, ry, category = self.current_boxes[box_index]
+            lines.append(f"Box {box_index}: {category}")
+            if self._current_track_ids is not None and box_index < len(self._current_track_ids):
+                lines.append(f"track: {self._current_track_ids[box_index]}")
+            lines.append(f"center: {bx:.2f}, {by:.2f}, {bz + h / 2:.2f}")
+            lines.append(f"size (h, w, l): {h:.2f}, {w:.2f}, {l:.2f}  ry: {ry:.2f}")
+        return "\n".join(lines)
+
+    def _on_min_confidence(self, value):
+        self.settings.min_confidence = value
+        self._update_box_geometry()
+
+    def _on_box_distance(self, value):
+        self.settings.box_distance = int(value)
+        self._update_box_geometry()
+
+    def _build_box_lines(self, gt_match=None):
+        # All ground truth and predicted boxes go into one LineSet. The vertex
+        # positions are built once per frame, culling only selects lines.
+        boxes = [create_bounding_box_3d(box) for box in self.current_boxes]
+        # Ground truth takes its category color when the LineSet is made,
+        # NaN marks these boxes
+        colors = np.full((len(boxes), 3), np.nan)
+        if gt_match is not None:
+            compared = np.array([box[-1] != 'DontCare' for box in self.current_boxes], dtype=bool)
+            matched = np.asarray(gt_match) >= 0
+            colors[compared & matched] = COMPARISON_COLORS["matched"]
+            colors[compared & ~matched] = COMPARISON_COLORS["missed"]
+        if self.current_predictions is not None:
+            pred_boxes, scores, pred_match = self.current_predictions
+            boxes.extend(create_bounding_box_3d(box, float(score)) for box, score in zip(pred_boxes, scores))
+            colors = np.concatenate([colors, np.where(
+                (np.asarray(pred_match) >= 0)[:, None], COMPARISON_COLORS["true_positive"],
+                COMPARISON_COLORS["false_positive"]).reshape(-1, 3)])
+        if not boxes:
+            self._box_lines = None
+            return
+        lines = BoundingBox3D.create_lines(boxes, out_format="dict")
+        centers = np.array([box.center for box in boxes])
+        self._box_lines = {
+            "points": o3d.utility.Vector3dVector(lines["vertex_positions"]),
+            "indices": lines["line_indices"].reshape(len(boxes), -1, 2),
+            "colors": colors,
+            "confidences": np.array(lines["bbox_confidences"], dtype=np.float32),
+            "distances": np.hypot(centers[:, 0], centers[:, 1]),
+        }
+
+    def _update_box_geometry(self):
+        if self._scene.scene.has_geometry("__boxes__"):
+            self._scene.scene.remove_geometry("__boxes__")
+        if self._box_lines is None:
+            return
+        box_lines = self._box_lines
+        # Ground truth has a confidence of -1 and is never filtered by score
+        confidences = box_lines["confidences"]
+        keep = (confidences < 0) | (confidences >= self.settings.min_confidence)
+        if self.settings.box_distance < BOX_DISTANCE_MAX:
+            keep &= box_lines["distances"] <= self.settings.box_distance
+        line_set = o3d.geometry.LineSet()
+        line_set.points = box_lines["points"]
+        line_set.lines = o3d.utility.Vector2iVector(box_lines["indices"][keep].reshape(-1, 2))
+        colors = box_lines["colors"].copy()
+        num_gt = len(self.current_boxes)
+        category_colored = np.isnan(colors[:num_gt, 0])
+        colors[:num_gt][category_colored] = \
+            self.box_registry.box_colors(self.category_colors)[category_colored]
+        # One color per line of every kept box
+        lines_per_box = box_lines["indices"].shape[1]
+        line_set.colors = o3d.utility.Vector3dVector(np.repeat(colors[keep], lines_per_box, axis=0))
+        self._scene.scene.add_geometry("__boxes__", line_set, self.settings.material)
+
+    def _on_scalar_field(self, name, index):
+        self.settings.scalar_field = name
+        self._update_scalar_range_edits()
+        self._update_point_cloud_display()
+
+    def _on_scalar_colormap(self, name, index):
+        self.settings.scalar_colormap = name
+        self._update_point_cloud_display()
+
+    def _on_scalar_auto_range(self, checked):
+        self.settings.scalar_auto_range = checked
+        self._update_scalar_range_edits()
+        self._update_point_cloud_display()
+
+    def _on_scalar_range(self, value):
+        self.settings.scalar_min = self._scalar_min.double_value
+        self.settings.scalar_max = self._scalar_max.double_value
+        self.settings.scalar_auto_range = False
+        self._scalar_auto_range.checked = False
+        self._update_point_cloud_display()
+
+    def _update_scalar_range_edits(self):
+        # Show the automatic range so it can be used as a starting point
+        if (self.settings.scalar_auto_range and self.settings.scalar_field != "None"
+                and self._scalar_fields is not None):
+            low, high = self._scalar_fields.auto_range(self.settings.scalar_field.lower())
+            self._scalar_min.double_value = low
+            self._scalar_max.double_value = high
+
+    def _scalar_colormap_object(self):
+        if self.settings.scalar_colormap == "Greyscale":
+            return Colormap.make_greyscale()
+        if self.settings.scalar_colormap == "Custom":
+            # The custom colormap colors as evenly spaced control points
+            return Colormap.make_from_colors(self.custom_colormap)
+        return Colormap.make_rainbow()
+
+    def _on_show_predictions(self, show):
+        self.settings.show_predictions = show
+        if self.current_path is not None:
+            self.load(self.current_path)
+
+    def _match_predictions(self, pred_path, gt_boxes):
+        if pred_path is None or not os.path.exists(pred_path):
+            self._prediction_stats.text = "No predictions for this frame"
+            return None
+        pred_boxes, scores = load_predictions(pred_path)
+        gt_params, gt_categories = box_arrays(gt_boxes)
+        pred_params, pred_categories = box_arrays(pred_boxes)
+        # The whole GT x prediction IoU matrix is computed in one call
+        gt_match, pred_match, _ = match_boxes(gt_params, gt_categories, pred_params,
+                                              pred_categories, scores)
+        self.current_predictions = (pred_boxes, scores, pred_match)
+
+        tp = int((pred_match >= 0).sum())
+        fn = sum(1 for c, m in zip(gt_categories, gt_match) if m < 0 and c != 'DontCare')
+        self._prediction_stats.text = f"TP {tp}  FP {len(pred_boxes) - tp}  missed {fn}"
+        return gt_match
+
+    def _on_ground_mode(self, name, index):
+        self.settings.ground_mode = name
+        self._update_point_cloud_display()
+
+    def _ground_mask(self):
+        # The mask is computed once per frame (and aggregation window) and
+        # kept in the frame cache, so switching modes, stepping back or
+        # opening the frame in another window is free
+        points = np.asarray(self.current_point_cloud.points)
+        return self.frame_cache.get(self.current_path, ('ground', self.settings.aggregate_frames),
+                                    lambda: segment_ground(points)[0])
+
+    def _on_show_frame_colormap(self, show):
+        self.settings.show_frame_colormap = show
+        self._update_point_cloud_display()
+
+    def _on_show_tracks(self, show):
+        self.settings.show_tracks = show
+        self._update_track_geometry()
+
+    def _update_track_geometry(self):
+        # The trails of all tracks are one LineSet. The association is kept
+        # per dataset, so stepping through frames only builds the lines.
+        if self._scene.scene.has_geometry("__tracks__"):
+            self._scene.scene.remove_geometry("__tracks__")
+        self._current_track_ids = None
+        if not self.settings.show_tracks or self.dataset is None or self.current_path is None:
+            return
+        # Only frames of the dataset, not e.g. a session file opened after it
+        frame_id = os.path.splitext(os.path.basename(self.current_path))[0]
+        if self.dataset.path(frame_id) != self.current_path:
+            return
+        position = self.dataset.position(frame_id)
+        tracks = Tracks.for_dataset(self.dataset)
+        self._current_track_ids = tracks.ids(position)
+        vertices, lines, track_ids = tracks.trails(position, TRACK_TRAIL_LENGTH)
+        if len(lines) == 0:
+            return
+        line_set = o3d.geometry.LineSet()
+        line_set.points = o3d.utility.Vector3dVector(vertices)
+        line_set.lines = o3d.utility.Vector2iVector(lines)
+        colors = np.asarray(FRAME_COLORS[1:], dtype=np.float64)
+        line_set.colors = o3d.utility.Vector3dVector(colors[track_ids % len(colors)])
+        self._scene.scene.add_geometry("__tracks__", line_set, self.settings.material)
+
+    def _on_aggregate_frames(self, value):
+        self.settings.aggregate_frames = int(value)
+        if 0 <= self.frame_index < len(self.frame_paths):
+            self.load(self.frame_paths[self.frame_index])
+
+    def _on_prev_frame(self):
+        if self.frame_index > 0:
+            self.load(self.frame_paths[self.frame_index - 1])
+
+    def _on_next_frame(self):
+        if 0 <= self.frame_index < len(self.frame_paths) - 1:
+            self.load(self.frame_paths[self.frame_index + 1])
+
+    def _on_browser_page(self, step):
+        pages = max(1, -(-len(self.frame_paths) // BROWSER_PAGE_SIZE))
+        self._browser_page = min(max(self._browser_page + step, 0), pages - 1)
+        self._update_browser()
+
+    def _thumbnail_cache(self):
+        # One cache per frame directory, kept in the dataset root
+        root = self.dataset.root if self.dataset is not None else os.path.dirname(self.frame_paths[0])
+        directory = os.path.join(root, THUMBNAIL_DIR)
+        if self._thumbnails is None or os.path.dirname(self._thumbnails.directory) != directory:
+            if self._thumbnails is not None:
+                self._thumbnails.close()
+            self._thumbnails = ThumbnailCache(directory, BEV_EXTENT, workers=THUMBNAIL_WORKERS)
+        return self._thumbnails
+
+    def _update_browser(self):
+        # Shows the cached thumbnails of the page and requests the missing
+        # ones, then the ones of the next page so paging forward is instant
+        self._browser_dirty = False
+        if not self.frame_paths:
+            return
+        cache = self._thumbnail_cache()
+        cache.cancel()
+        first = self._browser_page * BROWSER_PAGE_SIZE
+        pages = -(-len(self.frame_paths) // BROWSER_PAGE_SIZE)
+        self._browser_page_label.text = f"{self._browser_page + 1}/{pages}"
+        for slot, (_, label) in enumerate(self._browser_slots):
+            index = first + slot
+            path = self.frame_paths[index] if index < len(self.frame_paths) else None
+            self._browser_frames[slot] = path
+            label.text = os.path.splitext(os.path.basename(path))[0] if path is not None else ""
+            self._show_thumbnail(slot)
+            if path is not None:
+                cache.request(path, self._label_path(path), self._on_thumbnail_ready)
+        for path in self.frame_paths[first + BROWSER_PAGE_SIZE:first + 2 * BROWSER_PAGE_SIZE]:
+            cache.request(path, self._label_path(path))
+        self.window.set_needs_layout()
+
+    def _show_thumbnail(self, slot):
+        path = self._browser_frames[slot]
+        thumbnail = None
+        if path is not None:
+            thumbnail = self._thumbnails.load(path, self._label_path(path))
+        if thumbnail is None:
+            # Grey until the worker is done
+            thumbnail = np.full(self._thumbnails.shape + (3,), 64, dtype=np.uint8)
+        self._browser_slots[slot][0].update_image(o3d.geometry.Image(thumbnail))
+
+    def _on_thumbnail_ready(self, path):
+        # Called on a worker thread
+        def show():
+            if path in self._browser_frames:
+                self._show_thumbnail(self._browser_frames.index(path))
+
+        gui.Application.instance.post_to_main_thread(self.window, show)
+
+    def _on_browser_click(self, slot, event):
+        path = self._browser_frames[slot]
+        if event.type == gui.MouseEvent.Type.BUTTON_DOWN and path is not None:
+            # Goes through the frame cache, so frames that were shown before
+            # or precomputed open without reading the file
+            self.load(path)
+            return gui.ImageWidget.EventCallbackResult.HANDLED
+        return gui.ImageWidget.EventCallbackResult.IGNORED
+
+    def _on_keep_camera(self, keep):
+        self.settings.keep_camera = keep
+
+    def _on_sync_camera(self, sync):
+        self.settings.sync_camera = sync
+        self._last_sync_view = None
+
+    def _on_show_bev(self, show):
+        self.settings.show_bev = show
+        self._bev_image.visible = show
+        self._update_bev_image()
+        self.window.set_needs_layout()
+
+    def _on_show_range_image(self, show):
+        self.settings.show_range_image = show
+        self._range_image_view.visible = show
+        self._update_range_image_view()
+        self.window.set_needs_layout()
+
+    def _range_image(self):
+        # Projected once per frame, shared by the view and the normals
+        return self.frame_cache.get(self.current_path, ('range_image', self.settings.aggregate_frames),
+                                    lambda: RangeImage(self.current_points))
+
+    def _intensity(self):
+        if self.current_intensity is not None:
+            return self.current_intensity
+        return self.current_points[:, 3]
+
+    def _point_array(self):
+        # The (N, 4) points, sessions are only stacked for the consumers that
+        # need them, once per file
+        if self.current_intensity is None:
+            return self.current_points
+        return self.frame_cache.get(self.current_path, 'point_array',
+                                    lambda: np.column_stack([self.current_points, self.current_intensity]))
+
+    def _update_range_image_view(self):
+        if not self.settings.show_range_image or self.current_points is None:
+            return
+        image = np.repeat(self._range_image().image(), RANGE_IMAGE_ROW_SCALE, axis=0)
+        self._range_image_view.update_image(o3d.geometry.Image(image))
+
+    def _update_bev_image(self):
+        if not self.settings.show_bev or self.current_point_cloud is None:
+            return
+        points = self._point_array() if self.current_points is not None \
+            else np.asarray(self.current_point_cloud.points)
+        image = render_bev(points, self.current_boxes, self._bev_grid, self.category_colors)
+        self._bev_image.update_image(o3d.geometry.Image(image))
+
+    def _update_camera_view_list(self):
+        self._camera_view_list.set_items([f"View {i + 1}" for i in range(len(self.camera_views))])
+
+    def _on_add_camera_view(self):
+        self.camera_views.append(self.current_view())
+        self._update_camera_view_list()
+
+    def _on_remove_camera_view(self):
+        index = self._camera_view_list.selected_index
+        if 0 <= index < len(self.camera_views):
+            del self.camera_views[index]
+            self._update_camera_view_list()
+
+    def _on_camera_view_selected(self, name, is_double_click):
+        index = self._camera_view_list.selected_index
+        if 0 <= index < len(self.camera_views):
+            self.apply_camera_pose(*view_to_pose(self.camera_views[index]))
+
+    def _on_load_camera_path(self):
+        dlg = gui.FileDialog(gui.FileDialog.OPEN, "Choose camera path to load",
+                             self.window.theme)
+        dlg.add_filter(".json", "Open3D view trajectories (.json)")
+        dlg.set_on_cancel(self._on_file_dialog_cancel)
+        dlg.set_on_done(self._on_load_camera_path_done)
+        self.window.show_dialog(dlg)
+
+    def _on_load_camera_path_done(self, filename):
+        self.window.close_dialog()
+        self.load_camera_path(filename)
+
+    def _on_save_camera_path(self):
+        dlg = gui.FileDialog(gui.FileDialog.SAVE, "Choose file to save",
+                             self.window.theme)
+        dlg.add_filter(".json", "Open3D view trajectories (.json)")
+        dlg.set_on_cancel(self._on_file_dialog_cancel)
+        dlg.set_on_done(self._on_save_camera_path_done)
+        self.window.show_dialog(dlg)
+
+    def _on_save_camera_path_done(self, filename):
+        self.window.close_dialog()
+        save_trajectory(filename, self.camera_views, self.camera_interval, self.camera_loop)
+
+    def _on_play_camera_path(self):
+        if self._camera_playing is not None:
+            self._camera_playing.set()
+            return
+        poses = interpolate_poses(self.camera_views, self.camera_interval, self.camera_loop)
+        if not poses:
+            return
+        stop = self._camera_playing = threading.Event()
+        app = gui.Application.instance
+
+        def run():
+            # One pose per RECORD_FPS tick, Play again stops the replay
+            for pose in poses:
+                if stop.is_set():
+                    break
+                app.post_to_main_thread(self.window, lambda p=pose: self.apply_camera_pose(*p))
+                time.sleep(1.0 / RECORD_FPS)
+
+            def finish():
+                self._camera_playing = None
+
+            app.post_to_main_thread(self.window, finish)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def load_camera_path(self, path):
+        """Replaces the camera bookmarks with the keyframes of a ViewTrajectory file."""
+        try:
+            self.camera_views, self.camera_interval, self.camera_loop = load_trajectory(path)
+        except (OSError, ValueError, KeyError) as e:
+            print("[WARNING] Failed to read camera path", path, e)
+            return
+        self._update_camera_view_list()
+        if self.camera_views:
+            self.apply_camera_pose(*view_to_pose(self.camera_views[0]))
+
+    def current_view(self):
+        """Returns the current camera as a ViewTrajectory keyframe."""
+        bounds = self._scene.scene.bounding_box
+        return pose_to_view(*self._camera_pose(), bounds.min_bound, bounds.max_bound)
+
+    def apply_camera_pose(self, center, eye, up, field_of_view):
+        camera = self._scene.scene.camera
+        if abs(camera.get_field_of_view() - field_of_view) > 1e-3:
+            self._scene.setup_camera(field_of_view, self._scene.scene.bounding_box, center)
+        self._scene.look_at(center, eye, up)
+
     def _on_use_ibl(self, use):
         self.settings.use_ibl = use
         self._profiles.selected_text = Settings.CUSTOM_PROFILE_NAME
@@ -788,37 +1842,60 @@ class AppWindow:
     def _on_point_filter(self, filter_range):
         if self.current_point_cloud:
             points = np.asarray(self.current_point_cloud.points)
-            original_colors = np.asarray(self.current_point_cloud.colors)
 
             filter_mask = (points[:, 0] ** 2 + points[:, 1] ** 2 + points[:, 2] ** 2) <= filter_range ** 2
-            filtered_points = points[filter_mask]
-            filtered_colors = original_colors[filter_mask]
-
-            new_cloud = o3d.geometry.PointCloud()
-            new_cloud.points = o3d.utility.Vector3dVector(filtered_points)
-            new_cloud.colors = o3d.utility.Vector3dVector(filtered_colors)
-
-            if self.current_point_cloud.has_normals():
-                normals = np.asarray(self.current_point_cloud.normals)
-                new_cloud.normals = o3d.utility.Vector3dVector(normals[:len(filtered_points)])
-
-            self._scene.scene.clear_geometry()
-            self._scene.scene.add_geometry("__model__", new_cloud, self.settings.material)
-
-            for name, obb in self.bounding_boxes:
-                self._scene.scene.add_geometry(name, obb, self.settings.material)
-                # Check and color points within this bounding box
-                indices = obb.get_point_indices_within_bounding_box(o3d.utility.Vector3dVector(filtered_points))
-                for idx in indices:
-                    filtered_colors[idx] = self.category_colors.get(name.split('_')[1], [0.5, 0.5, 0.5])
-
-                # Update cloud colors with possibly updated colors inside bounding boxes
-            new_cloud.colors = o3d.utility.Vector3dVector(filtered_colors)
+            if self.settings.ground_mode == "Hide":
+                filter_mask &= ~self._ground_mask()
+            self._filter_mask = filter_mask
+            if self._culling_active() and self._culler is not None and self._culler.uploaded is not None:
+                # Keep showing only the blocks in view
+                filter_mask = filter_mask & self._culler.grid.point_mask(self._culler.uploaded)
+            self._upload_point_cloud(filter_mask)
+
+    def _upload_point_cloud(self, mask=None):
+        # Per-point colors only exist here, expanded from the palette as
+        # float32 next to float32 positions instead of two float64 copies
+        cloud = self.current_point_cloud
+        points = np.asarray(cloud.points)
+        self._display_mask = mask
+        if len(self._quality) != len(points):
+            # A new cloud, the permutation is drawn once here
+            self._quality.reset(len(points))
+        if self._quality.decimated:
+            # A slice of the permutation, filtered by the mask
+            mask = self._quality.subset(mask)
+        if mask is not None:
+            points = points[mask]
+        new_cloud = o3d.t.geometry.PointCloud(o3d.core.Tensor(points.astype(np.float32)))
+        if self.point_colors is not None:
+            new_cloud.point.colors = o3d.core.Tensor(self.point_colors.expand(mask))
+        elif cloud.has_colors():
+            colors = np.asarray(cloud.colors)
+            new_cloud.point.colors = o3d.core.Tensor(
+                (colors if mask is None else colors[mask]).astype(np.float32))
+        if cloud.has_normals():
+            normals = np.asarray(cloud.normals)
+            new_cloud.point.normals = o3d.core.Tensor(
+                (normals if mask is None else normals[mask]).astype(np.float32))
+
+        # Only the cloud is replaced, the box LineSet stays in the scene
+        if self._scene.scene.has_geometry("__model__"):
+            self._scene.scene.remove_geometry("__model__")
+        self._scene.scene.add_geometry("__model__", new_cloud, self.settings.material)
+        point_size = self._quality.point_size(self.settings.material.point_size)
+        if point_size != self.settings.material.point_size:
+            # Smaller points while moving, the setting itself is kept
+            material = self.settings.material
+            full_size = material.point_size
+            material.point_size = point_size
+            self._scene.scene.update_material(material)
+            material.point_size = full_size
 
     def _on_menu_open(self):
         dlg = gui.FileDialog(gui.FileDialog.OPEN, "Choose file to load",
                              self.window.theme)
         dlg.add_filter('.bin', 'Binary Point Cloud Data (.bin)')
+        dlg.add_filter(SESSION_EXTENSION, f'Labeled session files ({SESSION_EXTENSION})')
         dlg.add_filter(
             ".ply .stl .fbx .obj .off .gltf .glb",
             "Triangle mesh files (.ply, .stl, .fbx, .obj, .off, "
@@ -867,9 +1944,63 @@ class AppWindow:
         frame = self._scene.frame
         self.export_image(filename, frame.width, frame.height)
 
+    def _on_menu_save_session(self):
+        dlg = gui.FileDialog(gui.FileDialog.SAVE, "Choose file to save",
+                             self.window.theme)
+        dlg.add_filter(SESSION_EXTENSION, f'Labeled session files ({SESSION_EXTENSION})')
+        dlg.set_on_cancel(self._on_file_dialog_cancel)
+        dlg.set_on_done(self._on_save_session_dialog_done)
+        self.window.show_dialog(dlg)
+
+    def _on_save_session_dialog_done(self, filename):
+        self.window.close_dialog()
+        self.save_session(filename)
+
+    def _on_menu_record(self, kind):
+        dlg = gui.FileDialog(gui.FileDialog.SAVE, "Choose file to save",
+                             self.window.theme)
+        dlg.add_filter(".mp4", "MP4 video, needs ffmpeg (.mp4)")
+        dlg.add_filter(".png", "Numbered PNG files (.png)")
+        dlg.add_filter(".jpg", "Numbered JPEG files (.jpg)")
+        dlg.set_on_cancel(self._on_file_dialog_cancel)
+        dlg.set_on_done(lambda filename: self._on_record_dialog_done(filename, kind))
+        self.window.show_dialog(dlg)
+
+    def _on_record_dialog_done(self, filename, kind):
+        self.window.close_dialog()
+        if kind == "turntable":
+            self.record_turntable(filename)
+        elif kind == "camera path":
+            self.record_camera_path(filename)
+        else:
+            self.record_sequence(filename)
+
+    def _on_menu_stop_recording(self):
+        if self._recording is not None:
+            self._recording.set()
+
     def _on_menu_quit(self):
         gui.Application.instance.quit()
 
+    def _on_menu_new_window(self):
+        # The new window renders with the same engine and reads frames
+        # through the same cache, so a frame open in both is decoded once
+        other = AppWindow(self.window.size.width, self.window.size.height, self.frame_cache,
+                          self.precompute)
+        if self.current_path is not None:
+            other.settings.aggregate_frames = self.settings.aggregate_frames
+            other.load(self.current_path)
+            other.apply_camera_pose(*self._camera_pose())
+
+    def _on_close(self):
+        if self in AppWindow.windows:
+            AppWindow.windows.remove(self)
+        if self._thumbnails is not None:
+            self._thumbnails.close()
+        if self._recording is not None:
+            self._recording.set()
+        return True
+
     def _on_menu_toggle_settings_panel(self):
         self._settings_panel.visible = not self._settings_panel.visible
         gui.Application.instance.menubar.set_checked(
@@ -917,38 +2048,44 @@ class AppWindow:
         # Update the previous range color
 
     def _on_custom_colormap_change(self, new_color, section):
-        curr_color = self.custom_colormap[section]
         self.custom_colormap[section] = [new_color.red, new_color.green, new_color.blue]
-        points = self.current_point_cloud
-
-        points_color = np.array(points.colors)
-        selected_points_color = np.array(curr_color)
-        filtered_index = (points_color == selected_points_color).all(axis=1)
-        points_color[filtered_index] = np.array([new_color.red, new_color.green, new_color.blue])
-        self.current_point_cloud.colors = o3d.utility.Vector3dVector(points_color)
-        self._on_point_filter(self._point_filter.int_value)
+        if self.point_colors is not None and self._point_color_mode == 'depth':
+            # The depth bands are the first palette entries
+            self.point_colors.set_color(section, self.custom_colormap[section])
+            self._on_point_filter(self._point_filter.int_value)
 
 
     def create_colormap(self, points, type=None, rgb_list=None):
         max_distance = 25
-        colors = np.tile([0.5, 0.5, 0.5], (len(points), 1))
+        # Points get uint8 indices into a small palette, see utils/palette.py
+        colors = PaletteColors(len(points))
 
         if self.settings.show_colormap and type == 'red-blue':
-            for i, point in enumerate(points):
-                # Normalize the X-coordinate to the range [-1, 1] and then scale to [0, 1]
-                x_normalized = (point[0] / max_distance + 1) / 2
-                # Apply the colormap: Blue for negative X, Red for positive X, White for near 0
-                colors[i] = [x_normalized, 0.5 * (1 - abs(x_normalized - 0.5)), 1 - x_normalized]
+            # 256 steps of the ramp: Blue for negative X, Red for positive X, White for near 0
+            u = np.linspace(0.0, 1.0, 256)
+            ramp = np.stack([u, 0.5 * (1 - np.abs(u - 0.5)), 1 - u], axis=1)
+            # Quantize the X-coordinate in [-max_distance, max_distance] to the ramp
+            colors = PaletteColors(len(points), ramp,
+                                   Colormap.lut_indices(np.asarray(points)[:, 0], -max_distance, max_distance))
+        elif self.settings.scalar_field != "None" and type == 'scalar':
+            # Fields are cached per frame, so this is a single LUT lookup
+            if self.settings.scalar_auto_range:
+                value_range = (None, None)
+            else:
+                value_range = (self.settings.scalar_min, self.settings.scalar_max)
+            colors = PaletteColors(len(points), self._scalar_colormap_object().calc_lut(256),
+                                   self._scalar_fields.indices(self.settings.scalar_field.lower(),
+                                                               *value_range))
+        elif self.settings.show_frame_colormap and type == 'frame' and self.current_frame_ids is not None:
+            # One color per frame of the aggregation window, newest frame last
+            order = self.current_frame_ids - self.current_frame_ids.min()
+            colors = PaletteColors(len(points), FRAME_COLORS, order % len(FRAME_COLORS))
         elif self.settings.show_depth_colormap and type == 'depth':
-            custom_colormap_settings = self._settings_panel.get_children()[9]
-            custom_colormap_tree = custom_colormap_settings.get_children()[0]
+            custom_colormap_tree = self._custom_colormap_tree
             custom_colormap_tree.clear()
 
-            # Calculate the Euclidean distance between the reference point and all points in the PCD
-            ref_point = np.array([0, 0, 0])
-            points = np.asarray(self.current_point_cloud.points)
-            distances = np.array([distance.euclidean(point, ref_point)
-                                  for point in points])
+            # Euclidean distance of all points to the sensor, cached per frame
+            distances = self._scalar_fields.get("range")
 
             # Find the closest point (smallest distance)
             closest_point_idx = np.argmin(distances)
@@ -958,7 +2095,10 @@ class AppWindow:
             farthest_point_idx = np.argmax(distances)
             max_d = distances[farthest_point_idx]
 
-            # Create a colormap based on the distances
+            # Create a colormap based on the distances, the four bands are
+            # palette entries 0-3 and grey is entry 4
+            colors = PaletteColors(len(points), self.custom_colormap + [[0.5, 0.5, 0.5]],
+                                   np.full(len(points), 4, dtype=np.uint8))
 
             raw_distances = np.linspace(min_d, max_d, num=5)
             self.custom_colormap_range = [round(d, 1) for d in raw_distances]
@@ -979,18 +2119,52 @@ class AppWindow:
                 max_mask = distances < max_range
 
                 filter_mask = np.logical_and(min_mask, max_mask)
-                colors[filter_mask] = self.custom_colormap[i]
+                colors.assign(filter_mask, i)
                 i += 1
 
         return colors
 
     def load(self, path):
+        previous_pose = None
+        if self.settings.keep_camera and self.current_path is not None:
+            previous_pose = self._camera_pose()
         self._scene.scene.clear_geometry()
-        self.bounding_boxes = []
+        self.current_path = os.path.abspath(path)
+        self._culler = None
+        self._last_cull_view = None
+        self._filter_mask = None
+        self._display_mask = None
+        self.box_registry = None
+        self._box_lines = None
         self.custom_colormap = [[1, 0, 0], [1, 0.3, 0.3], [1, 0.7, 0.7], [1, 1, 1]]
 
         self.category_colors = {}
         self.category_checked = {}
+        self.current_points = None
+        self.current_intensity = None
+        self.current_boxes = []
+        self.current_box_ids = None
+        self.current_predictions = None
+        self._prediction_stats.text = ""
+        self._picker = None
+        self._pick_info.visible = False
+        self._scalar_fields = None
+        self.point_colors = None
+        self._label_palette_offset = None
+        self.semantic_labels = None
+        self._semantic_palette_offset = None
+        self._pre_semantic_indices = None
+        self._pre_label_indices = None
+        # Frame ids and the position in the sequence are set again by
+        # _load_frame_points() for .bin frames. Other files leave the
+        # sequence, so stepping and aggregation do not reload its frames.
+        self.current_frame_ids = None
+        self.frame_index = -1
+        if not path.endswith('.bin'):
+            self.frame_paths = []
+            self.dataset = None
+            self.frame_window = None
+        session_colors = {}
 
         geometry = None
         geometry_type = o3d.io.read_file_geometry_type(path)
@@ -1001,34 +2175,73 @@ class AppWindow:
         if mesh is None:
             print("[Info]", path, "appears to be a point cloud")
             cloud = None
-            if path.endswith('.bin'):
-                # Point Cloud Load
-                points = np.fromfile(path, dtype=np.float32).reshape(-1, 4)
+            if path.endswith('.bin') or path.endswith(SESSION_EXTENSION):
+                pred_path = None
+                if path.endswith(SESSION_EXTENSION):
+                    # Session files already hold the labels and the point to
+                    # box membership, nothing has to be recomputed. The
+                    # memory-mapped points and intensities are used as they
+                    # are, without stacking them.
+                    session = open_session(path)
+                    points = session.points
+                    self.current_intensity = session.intensity
+                    boxes = session.box_tuples()
+                    box_ids = session.box_ids
+                    for name, color in zip(session.categories, session.palette):
+                        session_colors[name] = list(color / 255.0)
+                else:
+                    # Point Cloud Load
+                    points = self._load_frame_points(path)
+
+                    # Labeled Boxes Load, the paths come from the dataset index
+                    frame_id = os.path.splitext(os.path.basename(path))[0]
+                    dataset = self.dataset
+                    label_path = dataset.path(frame_id, 'label') if dataset is not None else None
+                    boxes = load_bounding_boxes(label_path) if label_path is not None else []
+                    if label_path is not None:
+                        # Kept per label file, edited labels are recomputed
+                        box_ids = self.frame_cache.get(
+                            label_path, ('box_ids', self.current_path, self.settings.aggregate_frames),
+                            lambda: points_in_boxes(points, box_arrays(boxes)[0]))
+                    else:
+                        box_ids = points_in_boxes(points, box_arrays(boxes)[0])
+                    pred_path = dataset.path(frame_id, 'prediction') if dataset is not None else None
+
+                    # Per-point semantic labels, for single frames only
+                    label_path = (dataset.path(frame_id, 'semantic') if dataset is not None else None) \
+                        or semantic_label_path(path)
+                    if label_path is not None and self.current_frame_ids is None:
+                        try:
+                            self.semantic_labels = self.frame_cache.get(
+                                label_path, ('semantic', len(points)),
+                                lambda: SemanticLabels(load_semantic_labels(label_path, len(points))))
+                        except ValueError as e:
+                            print("[WARNING]", e)
+                self.current_points = points
+                self.current_boxes = boxes
+                self.current_box_ids = box_ids
+                self.box_registry = BoxRegistry(boxes, box_ids, len(points))
+
                 cloud = o3d.geometry.PointCloud()
                 cloud.points = o3d.utility.Vector3dVector(points[:, :3])
-                colormap = self.create_colormap(points[:, :3])
-
-                # Labeled Boxes Load
-                filename = os.path.splitext(os.path.basename(path))[0]
-                before_path = get_path_until_data(path)
-                boxes = load_bounding_boxes(f'{before_path}/Label/{filename[-6:]}.txt')
-                for box in boxes:
-                    obb = create_bounding_box(box)
-                    category = box[-1]
+                colormap = self.create_colormap(points[:, :3], 'frame')
+                self._point_color_mode = 'frame'
+
+                gt_match = None
+                if self.settings.show_predictions:
+                    gt_match = self._match_predictions(pred_path, boxes)
+
+                for category in self.box_registry.categories:
                     if self.category_colors.get(category) is None:
                         self.category_colors[category] = [0.5, 0.5, 0.5]
                         self.category_checked[category] = False
 
-                    color = self.category_colors.get(category, [0.5, 0.5, 0.5])  # Default to gray if category not found
-                    indices = obb.get_point_indices_within_bounding_box(o3d.utility.Vector3dVector(points[:, :3]))
-                    obb_name = f"box_{box[-1]}"
-                    self.bounding_boxes.append((obb_name, obb))
-                    self._scene.scene.add_geometry(obb_name, obb, self.settings.material)
-                    is_checked = self.category_checked[category]
-                    if is_checked is not None and is_checked:
-                        for idx in indices:
-                            colormap[idx] = color
-                cloud.colors = o3d.utility.Vector3dVector(colormap)
+                self._build_box_lines(gt_match)
+                self._update_track_geometry()
+                self._apply_label_colors(colormap)
+                if self.settings.show_label and self.semantic_labels is not None:
+                    self._apply_semantic_colors(colormap)
+                self.point_colors = colormap
             else:
                 try:
                     cloud = o3d.io.read_point_cloud(path)
@@ -1036,10 +2249,35 @@ class AppWindow:
                     pass
             if cloud is not None:
                 print("[Info] Successfully read", path)
+                # Normals and ranges of frames computed by the worker
+                # processes are taken from the frame cache
+                k = self.settings.aggregate_frames
+                normals = self.frame_cache.peek(self.current_path, ('normals', k))
+                ranges = self.frame_cache.peek(self.current_path, ('range', k))
+                if normals is None and self.current_points is not None and self.current_frame_ids is None:
+                    # Single scans get their normals from the neighbors in the
+                    # range image instead of a KNN search
+                    range_image = self._range_image()
+                    if range_image.coverage >= SCAN_COVERAGE:
+                        normals = self.frame_cache.put(self.current_path, ('normals', k), range_image.normals())
                 if not cloud.has_normals():
-                    cloud.estimate_normals()
+                    if normals is not None and len(normals) == len(cloud.points):
+                        cloud.normals = o3d.utility.Vector3dVector(normals.astype(np.float64))
+                    else:
+                        cloud.estimate_normals()
                 cloud.normalize_normals()
                 self.current_point_cloud = cloud
+                # The pick tree is built while the frame is looked at, so the
+                # first picks do not scan every point
+                self._picker = PointPicker(self.current_points if self.current_points is not None
+                                           else np.asarray(cloud.points))
+                self._picker.build_async()
+                fields = {'range': ranges} if ranges is not None and len(ranges) == len(cloud.points) else {}
+                if self.current_intensity is not None:
+                    fields['intensity'] = self.current_intensity
+                self._scalar_fields = ScalarFields(
+                    self.current_points if self.current_points is not None else np.asarray(cloud.points),
+                    fields)
                 geometry = cloud
             else:
                 print("[WARNING] Failed to read points", path)
@@ -1051,22 +2289,25 @@ class AppWindow:
                     self._scene.scene.add_model("__model__", mesh)
                 else:
                     # Point cloud
-                    self._scene.scene.add_geometry("__model__", geometry,
-                                                   self.settings.material)
+                    self._upload_point_cloud()
                 bounds = self._scene.scene.bounding_box
                 self._scene.setup_camera(60, bounds, bounds.get_center())
+                if previous_pose is not None:
+                    self.apply_camera_pose(*previous_pose)
             except Exception as e:
                 print(e)
 
         # Label 3D Settings
-        label_3d_settings = self._settings_panel.get_children()[7]
-        label_tree = label_3d_settings.get_children()[0]
+        label_tree = self._label_tree
         label_tree.clear()
 
-        default_colors = [[1,0,0], [0,1,0], [0,0,1], [1,1,0], [1,0,1], [0,1,1]]
+        default_colors = DEFAULT_CATEGORY_COLORS
         color_num = 0
         for name, color in self.category_colors.items():
-            if color_num < len(default_colors):
+            if name in session_colors:
+                color = session_colors[name]
+                self.category_colors[name] = color
+            elif color_num < len(default_colors):
                 color = default_colors[color_num]
                 self.category_colors[name] = color
                 color_num += 1
@@ -1074,19 +2315,240 @@ class AppWindow:
                                  lambda is_checked, n=name: self._on_label_checked_changed(n, is_checked),
                                  lambda new_color, n=name: self._on_label_color_changed(n, new_color))
             label_tree.add_item(0, lv)
+        # Drawn once the categories have their colors
+        if self.box_registry is not None:
+            self._update_box_geometry()
+
+        if self.semantic_labels is not None:
+            # Semantic classes present in the frame, shown unless unchecked
+            colors = self.semantic_lut.colorize(self.semantic_labels.values)
+            for value, color in zip(self.semantic_labels.values.tolist(), colors):
+                label = self.semantic_lut.labels.get(value)
+                name = label.name if label is not None else f"label {value}"
+                lv = gui.LUTTreeCell(name, self.semantic_checked.get(value, True),
+                                     gui.Color(*[float(c) for c in color]),
+                                     lambda is_checked, v=value: self._on_semantic_checked_changed(v, is_checked),
+                                     lambda new_color, v=value: self._on_semantic_color_changed(v, new_color))
+                label_tree.add_item(0, lv)
+
+        self._update_scalar_range_edits()
+        if geometry is not None and (self.settings.ground_mode != "Show" or self.settings.scalar_field != "None"):
+            self._update_point_cloud_display()
+        self._update_bev_image()
+        self._update_range_image_view()
+
+    def _load_frame_points(self, path):
+        path = os.path.abspath(path)
+        directory = os.path.dirname(path)
+        if not self.frame_paths or os.path.dirname(self.frame_paths[0]) != directory:
+            # Frames of a dataset root come from its index manifest, other
+            # directories are listed once
+            root = find_root(path)
+            self.dataset = DatasetIndex.open(root) if root is not None else None
+            if self.dataset is not None and len(self.dataset):
+                self.frame_paths = [self.dataset.path(frame_id) for frame_id in self.dataset.frame_ids]
+            else:
+                self.frame_paths = sorted(glob.glob(os.path.join(directory, '*.bin')))
+            self.frame_window = None
+        if self.dataset is not None and len(self.dataset):
+            self.frame_index = self.dataset.position(os.path.splitext(os.path.basename(path))[0])
+        else:
+            self.frame_index = self.frame_paths.index(path) if path in self.frame_paths else -1
+        self._frame_label.text = os.path.basename(path)
+        if self.frame_index >= 0:
+            self._browser_page = self.frame_index // BROWSER_PAGE_SIZE
+        self._browser_dirty = True
+
+        self._prefetch_frames()
+        k = self.settings.aggregate_frames
+        if k <= 1 or self.frame_index < 0:
+            self.current_frame_ids = None
+            return self._read_points(path)
+
+        # Frames already in the window are reused, so stepping by one frame
+        # only reads one new file.
+        if self.frame_window is None or self.frame_window.size != k:
+            self.frame_window = FrameWindow(k)
+        first = max(0, self.frame_index - k + 1)
+        self.frame_window.update(range(first, self.frame_index + 1),
+                                 lambda i: self._read_points(self.frame_paths[i]))
+        points, self.current_frame_ids = self.frame_window.gather()
+        return points
+
+    def _read_points(self, path):
+        self._take_precomputed(path)
+        return self.frame_cache.get(path, 'points', lambda: read_points(path))
+
+    def _prefetch_frames(self):
+        # The frames after the current one are computed in worker processes
+        # while it is shown, stepping forward then only maps their results
+        if self.frame_index < 0:
+            return
+        # Frames that were not done when they were loaded still free their
+        # slot and land in the cache
+        for shared in self.precompute.finished():
+            self._cache_precomputed(shared)
+        for path in self.frame_paths[self.frame_index + 1:self.frame_index + 1 + PRECOMPUTE_AHEAD]:
+            if path in self.precompute or self.frame_cache.peek(path, 'points') is not None:
+                continue
+            self.precompute.request(path, self._label_path(path))
+
+    def _label_path(self, path):
+        frame_id = os.path.splitext(os.path.basename(path))[0]
+        return self.dataset.path(frame_id, 'label') if self.dataset is not None else None
+
+    def _take_precomputed(self, path):
+        # Moves the arrays of a requested frame into the frame cache if the
+        # worker is done. Waiting on the GUI thread would take longer than
+        # reading the points directly.
+        shared = self.precompute.result(path, wait=False)
+        if shared is not None:
+            self._cache_precomputed(shared)
+
+    def _cache_precomputed(self, shared):
+        # The arrays stay in the shared memory block, nothing is copied
+        path = shared.path
+        self.frame_cache.put(path, 'points', shared['points'])
+        for kind in ('ground', 'normals', 'range'):
+            if kind in shared:
+                self.frame_cache.put(path, (kind, 1), shared[kind])
+        if 'box_ids' in shared and shared.label_path is not None:
+            self.frame_cache.put(shared.label_path, ('box_ids', path, 1), shared['box_ids'])
+
+    def save_session(self, path):
+        if self.current_points is None:
+            print("[WARNING] No labeled point cloud to save")
+            return
+        if not path.endswith(SESSION_EXTENSION):
+            path += SESSION_EXTENSION
+        categories = list(self.category_colors.keys())
+        palette = [self.category_colors[name] for name in categories]
+        save_session(path, self._point_array(), self.current_boxes,
+                     box_ids=self.current_box_ids, palette=palette,
+                     categories=categories)
+        print("[Info] Saved session", path)
 
     def export_image(self, path, width, height):
+        # The capture is on the GUI thread, the encoding is not
+        export_queue = ExportQueue(ImageWriter(path), workers=1, max_pending=1)
 
         def on_image(image):
-            img = image
-
-            quality = 9  # png
-            if path.endswith(".jpg"):
-                quality = 100
-            o3d.io.write_image(path, img, quality)
+            export_queue.submit(0, image)
+            threading.Thread(target=export_queue.close, daemon=True).start()
 
         self._scene.scene.scene.render_to_image(on_image)
 
+    def _camera_pose(self):
+        # Look-at center, eye, up vector and field of view of the camera. The
+        # center is the point on the viewing axis closest to the scene center.
+        camera = self._scene.scene.camera
+        model = np.asarray(camera.get_model_matrix())
+        eye, forward = model[:3, 3], -model[:3, 2]
+        distance = np.dot(self._scene.scene.bounding_box.get_center() - eye, forward)
+        center = eye + forward * max(distance, 1e-3)
+        return center, eye, model[:3, 1], camera.get_field_of_view()
+
+    def record_turntable(self, path, num_frames=TURNTABLE_FRAMES):
+        """Records a full orbit of the camera around the look-at point."""
+        center, eye, _, _ = self._camera_pose()
+        offset = eye - center
+
+        def apply_step(i):
+            angle = 2 * np.pi * i / num_frames
+            c, s = np.cos(angle), np.sin(angle)
+            rotation = np.array([[c, -s, 0], [s, c, 0], [0, 0, 1]])
+            self._scene.look_at(center, center + rotation @ offset, [0, 0, 1])
+
+        self._record(path, num_frames, apply_step)
+
+    def record_sequence(self, path):
+        """Records the frames of the current directory from the current one on."""
+        if self.frame_index < 0:
+            print("[WARNING] Frame sequences can only be recorded from .bin frames")
+            return
+        paths = self.frame_paths[self.frame_index:]
+        pose = self._camera_pose()
+
+        def apply_step(i):
+            self.load(paths[i])
+            # Every frame uses the same view, even without "Keep view"
+            self.apply_camera_pose(*pose)
+
+        self._record(path, len(paths), apply_step)
+
+    def record_camera_path(self, path):
+        """Records the interpolated camera bookmarks, one image per pose."""
+        poses = interpolate_poses(self.camera_views, self.camera_interval, self.camera_loop)
+        if not poses:
+            print("[WARNING] There are no camera bookmarks to record")
+            return
+        self._record(path, len(poses), lambda i: self.apply_camera_pose(*poses[i]))
+
+    def _record(self, path, num_frames, apply_step):
+        if self._recording is not None:
+            print("[WARNING] A recording is already running")
+            return
+        try:
+            if path.lower().endswith(".mp4"):
+                writer = VideoWriter(path, RECORD_FPS)
+            else:
+                writer = ImageWriter(path, numbered=True)
+        except RuntimeError as e:
+            print("[WARNING]", e)
+            return
+        export_queue = ExportQueue(writer, EXPORT_WORKERS, EXPORT_MAX_PENDING)
+        stop = self._recording = threading.Event()
+        app = gui.Application.instance
+
+        def show_progress(text):
+            self._export_info.text = text
+            self._export_info.visible = bool(text)
+            self.window.set_needs_layout()
+
+        def run():
+            # Runs off the GUI thread and waits for a free encoder slot before
+            # asking for the next frame, the GUI thread only moves the camera
+            # and captures.
+            for i in range(num_frames):
+                export_queue.acquire()
+                if stop.is_set():
+                    break
+                captured = threading.Event()
+
+                def capture(i=i):
+                    try:
+                        apply_step(i)
+                        show_progress(f"Recording frame {i + 1}/{num_frames}")
+
+                        def on_image(image):
+                            export_queue.put(i, image)
+                            captured.set()
+
+                        self._scene.scene.scene.render_to_image(on_image)
+                    except Exception as e:
+                        print(f"[WARNING] Recording frame {i + 1} failed:", e)
+                        stop.set()
+                        captured.set()
+
+                app.post_to_main_thread(self.window, capture)
+                # A closed window never captures, so stop ends the wait too
+                while not captured.wait(0.1) and not stop.is_set():
+                    pass
+
+            errors = export_queue.close()
+            for e in errors:
+                print("[WARNING] Export failed:", e)
+            print(f"[Info] Recorded {export_queue.written} frames to {path}")
+            # Not left to finish(), which never runs once the window is closed
+            self._recording = None
+
+            def finish():
+                show_progress("")
+
+            app.post_to_main_thread(self.window, finish)
+
+        threading.Thread(target=run, daemon=True).start()
+
 
 def main():
     # We need to initialize the application, which finds the necessary shaders
@@ -1105,6 +2567,7 @@ def main():
 
     # Run the event loop. This will not return until the last window is closed.
     gui.Application.instance.run()
+    PRECOMPUTE.close()
 
 
 if __name__ == "__main__":